@@ -0,0 +1,72 @@
+"""
+Micro-benchmark for the ACL authorization of the schema registry.
+
+Authorizes the reading of every subject, as ``schemas_list`` does, with a linear
+scan of the ACL entries, as before, and with the ``ACLAuthorizer`` indexing the
+entries per user and operation. The second pass over the subjects is served by
+the memoized decisions.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.auth import ACLAuthorizer, ACLEntry, HashAlgorithm, Operation, User
+from typing import Callable
+
+import argparse
+import re
+import time
+
+
+def _linear_scan(permissions: list[ACLEntry], user: User, operation: Operation, resource: str) -> bool:
+    for aclentry in permissions:
+        if (
+            aclentry.username == user.username
+            and (operation == Operation.Read or aclentry.operation == Operation.Write)
+            and aclentry.resource.match(resource) is not None
+        ):
+            return True
+    return False
+
+
+def _authorize(check: Callable[[str], bool], subjects: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    authorized = sum(check(f"Subject:{subject}") for subject in subjects)
+    return time.perf_counter() - start, authorized
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subjects", type=int, default=100_000)
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--users", type=int, default=5)
+    args = parser.parse_args()
+
+    permissions = [
+        ACLEntry(
+            username=f"user-{i % args.users}",
+            operation=Operation.Write if i % 2 else Operation.Read,
+            resource=re.compile(f"Subject:team-{i}-.*"),
+        )
+        for i in range(args.entries)
+    ]
+    user = User(username="user-0", algorithm=HashAlgorithm.SHA256, salt="salt", password_hash="")
+    subjects = [f"team-{i % (args.entries * 2)}-subject-{i}" for i in range(args.subjects)]
+
+    authorizer = ACLAuthorizer(permissions=permissions)
+
+    def check(resource: str) -> bool:
+        return authorizer.check_authorization(user, Operation.Read, resource)
+
+    linear, expected = _authorize(lambda resource: _linear_scan(permissions, user, Operation.Read, resource), subjects)
+    indexed, authorized = _authorize(check, subjects)
+    memoized, _ = _authorize(check, subjects)
+    assert authorized == expected
+
+    print(
+        f"{args.subjects} subjects, {args.entries} entries: linear scan {linear:.3f}s, "
+        f"indexed {indexed:.3f}s, memoized {memoized:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Micro-benchmark for the Avro serialization of the REST proxy.
+
+Writes records of nested records with unions, in the tagged JSON encoding of
+unions and without the tags, as before with a validation pass, a union
+flattening pass and a new writer for every record, with the ``AvroCodec``
+cached for the schema, and with the ``CompiledAvroCodec`` enabled by
+``avro_compiled_codec``.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from avro.io import BinaryEncoder, DatumWriter, validate
+from avro.schema import Schema
+from karapace.schema_models import ValidatedTypedSchema
+from karapace.schema_type import SchemaType
+from karapace.serialization import AvroCodec, CompiledAvroCodec, flatten_unions
+from typing import Any
+
+import argparse
+import io
+import json
+import time
+
+SCHEMA = {
+    "type": "record",
+    "name": "Order",
+    "fields": [
+        {"name": "id", "type": "long"},
+        {"name": "note", "type": ["null", "string"]},
+        {
+            "name": "customer",
+            "type": [
+                "null",
+                {
+                    "type": "record",
+                    "name": "Customer",
+                    "fields": [
+                        {"name": "name", "type": "string"},
+                        {"name": "email", "type": ["null", "string"]},
+                    ],
+                },
+            ],
+        },
+        {
+            "name": "lines",
+            "type": {
+                "type": "array",
+                "items": {
+                    "type": "record",
+                    "name": "Line",
+                    "fields": [
+                        {"name": "sku", "type": "string"},
+                        {"name": "quantity", "type": "int"},
+                        {"name": "discount", "type": ["null", "double"]},
+                    ],
+                },
+            },
+        },
+    ],
+}
+
+
+def _record(i: int, *, tagged: bool) -> dict[str, Any]:
+    def union(tag: str, value: Any) -> Any:
+        return {tag: value} if tagged else value
+
+    return {
+        "id": i,
+        "note": union("string", f"note {i}") if i % 2 else None,
+        "customer": union("Customer", {"name": f"customer-{i}", "email": union("string", f"c{i}@example.com")}),
+        "lines": [
+            {"sku": f"sku-{j}", "quantity": j, "discount": union("double", j / 10) if j % 2 else None} for j in range(5)
+        ],
+    }
+
+
+def _write_per_record(schema: Schema, data: list[dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    for datum in data:
+        if not validate(schema, datum):
+            datum = flatten_unions(schema, datum)
+        DatumWriter(writers_schema=schema).write(datum, BinaryEncoder(io.BytesIO()))
+    return time.perf_counter() - start
+
+
+def _write_codec(codec_class: type[AvroCodec | CompiledAvroCodec], schema: Schema, data: list[dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    codec = codec_class(schema)
+    for datum in data:
+        codec.write(io.BytesIO(), datum)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10_000)
+    args = parser.parse_args()
+
+    schema = ValidatedTypedSchema.parse(SchemaType.AVRO, json.dumps(SCHEMA)).schema
+    for tagged in (False, True):
+        data = [_record(i, tagged=tagged) for i in range(args.records)]
+        encoding = "tagged unions:  " if tagged else "untagged unions:"
+        per_record = _write_per_record(schema, data)
+        codec = _write_codec(AvroCodec, schema, data)
+        compiled = _write_codec(CompiledAvroCodec, schema, data)
+        print(
+            f"{encoding} {args.records / per_record:10.0f} records/s per record writer, "
+            f"{args.records / codec:10.0f} records/s cached codec, "
+            f"{args.records / compiled:10.0f} records/s compiled codec"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for the encoding of the large listings of the schema registry.
+
+Encodes a ``GET /schemas`` like listing in one ``json_encode`` call, as before,
+and as the chunks of a ``JSONArrayStream``. Reports the peak of the memory
+allocated while encoding and the longest run without yielding to the event loop.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from collections.abc import Iterator
+from karapace.rapu import JSONArrayStream
+from karapace.utils import json_encode
+
+import argparse
+import time
+import tracemalloc
+
+
+def _entries(count: int, schema: str) -> Iterator[dict]:
+    for i in range(count):
+        yield {"subject": f"subject-{i}", "version": 1, "id": i, "schemaType": "AVRO", "schema": schema}
+
+
+def _encode_at_once(count: int, schema: str) -> tuple[int, float]:
+    start = time.perf_counter()
+    body = json_encode(list(_entries(count, schema)), sort_keys=True, binary=True)
+    return len(body), time.perf_counter() - start
+
+
+def _encode_chunks(count: int, schema: str) -> tuple[int, float]:
+    size = 0
+    longest = 0.0
+    start = time.perf_counter()
+    for chunk in JSONArrayStream(_entries(count, schema)).chunks():
+        size += len(chunk)
+        now = time.perf_counter()
+        longest = max(longest, now - start)
+        start = now
+    return size, longest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schemas", type=int, default=200_000)
+    parser.add_argument("--schema-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    schema = json_encode({"type": "record", "name": "r", "doc": "x" * args.schema_size, "fields": []})
+    for name, encode in (("json_encode", _encode_at_once), ("JSONArrayStream", _encode_chunks)):
+        tracemalloc.start()
+        size, stall = encode(args.schemas, schema)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:16s}: {size / 2**20:8.1f} MiB body, peak {peak / 2**20:8.1f} MiB, longest stall {stall:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for the JSON Schema validation of the REST proxy.
+
+Validates objects of 50 fields with the ``Draft7Validator`` of the schema, as
+before, and with the ``JsonSchemaValidator`` cached per schema id.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.schema_models import ValidatedTypedSchema
+from karapace.schema_type import SchemaType
+from karapace.serialization import JsonSchemaValidator
+from typing import Any, Callable
+
+import argparse
+import json
+import time
+
+FIELDS = 50
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "definitions": {"tag": {"type": "string", "maxLength": 32}},
+    "properties": {
+        **{f"int_{i}": {"type": "integer", "minimum": 0} for i in range(FIELDS // 2)},
+        **{f"tag_{i}": {"$ref": "#/definitions/tag"} for i in range(FIELDS // 2)},
+    },
+    "required": [f"int_{i}" for i in range(FIELDS // 2)],
+    "additionalProperties": False,
+}
+
+
+def _record(i: int) -> dict[str, Any]:
+    return {
+        **{f"int_{j}": i + j for j in range(FIELDS // 2)},
+        **{f"tag_{j}": f"tag-{i}-{j}" for j in range(FIELDS // 2)},
+    }
+
+
+def _validate(validate: Callable[[Any], None], data: list[dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    for datum in data:
+        validate(datum)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10_000)
+    args = parser.parse_args()
+
+    validator = ValidatedTypedSchema.parse(SchemaType.JSONSCHEMA, json.dumps(SCHEMA)).schema
+    data = [_record(i) for i in range(args.records)]
+    draft7 = _validate(validator.validate, data)
+    compiled = _validate(JsonSchemaValidator(validator).validate, data)
+    print(
+        f"{FIELDS} fields: {args.records / draft7:10.0f} records/s Draft7Validator, "
+        f"{args.records / compiled:10.0f} records/s compiled validator"
+    )
+
+
+if __name__ == "__main__":
+    main()
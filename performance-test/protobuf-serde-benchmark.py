@@ -0,0 +1,111 @@
+"""
+Micro-benchmark for Protobuf serialization and deserialization.
+
+Writes and reads records of a simple message with a process forked for every
+record, as with ``protobuf_serde_workers`` set to ``0``, with the serde worker
+pool in batches of ``--batch-size`` records, and in-process with the message
+classes built from the schema descriptors.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from io import BytesIO
+from karapace.config import DEFAULTS
+from karapace.protobuf.io import (
+    build_dynamic_messages,
+    ProtobufModuleSpec,
+    ProtobufSerdePool,
+    read_in_forked_multiprocess_process,
+    write_in_forked_multiprocess_process,
+)
+from karapace.protobuf.protobuf_to_dict import dict_to_protobuf, protobuf_to_dict
+from karapace.protobuf.schema import ProtobufSchema
+from karapace.schema_models import ValidatedTypedSchema
+from karapace.schema_type import SchemaType
+
+import argparse
+import time
+
+SCHEMA = """\
+syntax = "proto3";
+
+message Measurement {
+  string name = 1;
+  int64 timestamp = 2;
+  double value = 3;
+  Unit unit = 4;
+}
+
+enum Unit {
+  CELSIUS = 0;
+  FAHRENHEIT = 1;
+}
+"""
+
+
+def _time_forked(schema: ProtobufSchema, data: list[dict[object, object]]) -> float:
+    start = time.perf_counter()
+    for datum in data:
+        encoded = write_in_forked_multiprocess_process(DEFAULTS, schema, "Measurement", datum)
+        # The reader expects the message indexes in front of the payload
+        read_in_forked_multiprocess_process(DEFAULTS, schema, schema, BytesIO(b"\x00" + encoded))
+    return time.perf_counter() - start
+
+
+def _time_pool(
+    schema: ProtobufSchema, data: list[dict[object, object]], *, workers: int, batch_size: int
+) -> tuple[float, float]:
+    spec = ProtobufModuleSpec.of(schema)
+    pool = ProtobufSerdePool(workers=workers, max_tasks=0, runtime_directory=DEFAULTS["protobuf_runtime_directory"])
+    try:
+        # Start the workers and import the generated module before timing
+        pool.write(spec, [("Measurement", data[0])])
+
+        start = time.perf_counter()
+        for index in range(0, len(data), batch_size):
+            encoded = pool.write(spec, [("Measurement", datum) for datum in data[index : index + batch_size]])
+            pool.read(spec, [("Measurement", record) for record in encoded])  # type: ignore[misc]
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+    return elapsed, len(data) / elapsed
+
+
+def _time_dynamic(schema: ProtobufSchema, data: list[dict[object, object]]) -> float:
+    start = time.perf_counter()
+    message_class = build_dynamic_messages(schema).message_class("Measurement")
+    for datum in data:
+        class_instance = message_class()
+        dict_to_protobuf(class_instance, datum)
+        decoded = message_class()
+        decoded.ParseFromString(class_instance.SerializeToString())
+        protobuf_to_dict(decoded, True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--forked-records", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    parsed = ValidatedTypedSchema.parse(SchemaType.PROTOBUF, SCHEMA)
+    assert isinstance(parsed.schema, ProtobufSchema)
+    schema = parsed.schema
+    data: list[dict[object, object]] = [
+        {"name": f"sensor-{i}", "timestamp": i, "value": i / 7, "unit": "FAHRENHEIT" if i % 2 else "CELSIUS"}
+        for i in range(args.records)
+    ]
+
+    forked = _time_forked(schema, data[: args.forked_records])
+    print(f"forked per record:  {args.forked_records / forked:10.0f} records/s (write and read)")
+    elapsed, throughput = _time_pool(schema, data, workers=args.workers, batch_size=args.batch_size)
+    print(f"worker pool:        {throughput:10.0f} records/s (write and read, {args.records} records in {elapsed:.2f} s)")
+    dynamic = _time_dynamic(schema, data)
+    print(f"in-process classes: {args.records / dynamic:10.0f} records/s (write and read, including building the classes)")
+
+
+if __name__ == "__main__":
+    main()
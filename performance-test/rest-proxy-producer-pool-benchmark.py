@@ -0,0 +1,71 @@
+"""
+Benchmark for the producer pool of the REST proxy.
+
+Produces concurrent batches of records to every partition of a new topic
+through ``UserRestProxy.produce_messages``, with an increasing
+``producer_count``. Requires Kafka, see the README.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.config import DEFAULTS
+from karapace.kafka_rest_apis import UserRestProxy
+from karapace.serialization import SchemaRegistrySerializer
+
+import argparse
+import asyncio
+import time
+import uuid
+
+
+async def _produce(args: argparse.Namespace, topic: str, producer_count: int) -> float:
+    config = {**DEFAULTS, "bootstrap_uri": args.bootstrap_uri, "producer_count": producer_count}
+    proxy = UserRestProxy(config, kafka_timeout=60, serializer=SchemaRegistrySerializer(config))
+    try:
+        value = b"x" * args.record_size
+        batches = [
+            [(None, value, partition) for _ in range(args.batch_size)]
+            for partition in range(args.partitions)
+            for _ in range(args.batches)
+        ]
+        # Starts the producers
+        await proxy.produce_messages(topic=topic, prepared_records=[(None, value, 0)])
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(proxy.produce_messages(topic=topic, prepared_records=batch) for batch in batches))
+        elapsed = time.perf_counter() - start
+        errors = [result for batch_results in results for result in batch_results if "error" in result]
+        assert not errors, errors[:5]
+        return elapsed
+    finally:
+        await proxy.aclose()
+        await proxy.serializer.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bootstrap-uri", default="127.0.0.1:9092")
+    parser.add_argument("--partitions", type=int, default=10)
+    parser.add_argument("--batches", type=int, default=20, help="Batches per partition")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--record-size", type=int, default=100)
+    parser.add_argument("--producer-counts", type=int, nargs="+", default=[1, 2, 5, 10])
+    args = parser.parse_args()
+
+    records = args.partitions * args.batches * args.batch_size
+    for producer_count in args.producer_counts:
+        config = {**DEFAULTS, "bootstrap_uri": args.bootstrap_uri}
+        admin_proxy = UserRestProxy(config, kafka_timeout=60, serializer=SchemaRegistrySerializer(config))
+        topic = f"producer-pool-benchmark-{uuid.uuid4()}"
+        admin_proxy.admin_client.new_topic(topic, num_partitions=args.partitions)
+        try:
+            elapsed = await _produce(args, topic, producer_count)
+        finally:
+            admin_proxy.admin_client.delete_topic(topic)
+            await admin_proxy.aclose()
+            await admin_proxy.serializer.close()
+        print(f"producer_count={producer_count:3d}: {records / elapsed:10.0f} records/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
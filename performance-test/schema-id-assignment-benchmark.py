@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for schema id assignment in the in-memory database.
+
+Registers new schemas into a database already holding a growing number of
+schemas and reports the mean latency of `get_schema_id` plus
+`insert_schema_version`. The latency should stay flat as the schema count grows.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.schema_models import TypedSchema
+from karapace.schema_type import SchemaType
+from karapace.typing import SchemaId, Subject, Version
+
+import argparse
+import logging
+import time
+
+
+def _schema(index: int) -> TypedSchema:
+    return TypedSchema(
+        schema_type=SchemaType.AVRO,
+        schema_str=f'{{"type": "record", "name": "Record{index}", "fields": [{{"name": "f", "type": "int"}}]}}',
+    )
+
+
+def _register(database: InMemoryDatabase, index: int) -> None:
+    schema = _schema(index)
+    schema_id = database.get_schema_id(schema)
+    database.insert_schema_version(
+        subject=Subject(f"subject-{index}"),
+        schema_id=SchemaId(schema_id),
+        version=Version(1),
+        deleted=False,
+        schema=schema,
+        references=None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-schemas", type=int, default=400_000)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Per record INFO logging would dominate the measurement
+    logging.disable(logging.INFO)
+
+    database = InMemoryDatabase()
+    registered = 0
+    for step in range(1, args.steps + 1):
+        target = args.max_schemas * step // args.steps
+        while registered < target:
+            _register(database, registered)
+            registered += 1
+
+        start = time.perf_counter()
+        for index in range(registered, registered + args.samples):
+            _register(database, index)
+        elapsed = time.perf_counter() - start
+        registered += args.samples
+        print(f"schemas: {registered:>9}  registration latency: {elapsed / args.samples * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
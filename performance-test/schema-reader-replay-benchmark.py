@@ -0,0 +1,108 @@
+"""
+Micro-benchmark for the startup replay of the schemas topic.
+
+Feeds a synthetic schemas topic to the schema reader in batches of the startup
+batch size and times consuming it until the reader is ready, with the bulk-load
+mode used during the startup replay and with the per-record path used once the
+reader is ready. With ``--parse-workers`` the bulk-load replay is also timed with
+the records parsed in a worker pool.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.config import Config, set_config_defaults
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.key_format import KeyFormatter
+from karapace.offset_watcher import OffsetWatcher
+from karapace.schema_reader import KafkaSchemaReader, MAX_MESSAGES_TO_CONSUME_ON_STARTUP
+from karapace.utils import json_encode
+
+import argparse
+import logging
+import time
+
+
+class _Message:
+    """Minimal stand-in for `confluent_kafka.Message`, `Mock` objects would dominate the timing."""
+
+    def __init__(self, offset: int, key: bytes, value: bytes) -> None:
+        self._offset = offset
+        self._key = key
+        self._value = value
+
+    def error(self) -> None:
+        return None
+
+    def key(self) -> bytes:
+        return self._key
+
+    def value(self) -> bytes:
+        return self._value
+
+    def offset(self) -> int:
+        return self._offset
+
+
+def _topic(records: int, subjects: int) -> list[_Message]:
+    messages = []
+    for offset in range(records):
+        subject = f"subject-{offset % subjects}"
+        version = offset // subjects + 1
+        key = {"keytype": "SCHEMA", "subject": subject, "version": version, "magic": 1}
+        value = {
+            "subject": subject,
+            "version": version,
+            "id": offset + 1,
+            "deleted": False,
+            "schema": json_encode({"type": "record", "name": f"Record{offset}", "fields": []}),
+        }
+        messages.append(_Message(offset, json_encode(key, binary=True), json_encode(value, binary=True)))
+    return messages
+
+
+def _time_replay(messages: list[_Message], config: Config, *, bulk_load: bool) -> float:
+    reader = KafkaSchemaReader(
+        config=config,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    reader.offset = -1
+    if not bulk_load:
+        reader._ready = True  # pylint: disable=protected-access
+
+    start = time.perf_counter()
+    for index in range(0, len(messages), MAX_MESSAGES_TO_CONSUME_ON_STARTUP):
+        reader.consume_messages(messages[index : index + MAX_MESSAGES_TO_CONSUME_ON_STARTUP], watch_offsets=False)
+    elapsed = time.perf_counter() - start
+    reader._shutdown_parse_executor()  # pylint: disable=protected-access
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--subjects", type=int, default=1000)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--parse-pool", choices=["process", "thread"], default="process")
+    args = parser.parse_args()
+
+    # The log records are formatted and dropped, as the handlers of a production deployment would filter them.
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    messages = _topic(args.records, args.subjects)
+    config = set_config_defaults({})
+    bulk_load = _time_replay(messages, config, bulk_load=True)
+    per_record = _time_replay(messages, config, bulk_load=False)
+    print(f"records: {args.records}  bulk load: {bulk_load:8.2f} s  per record: {per_record:8.2f} s")
+    if args.parse_workers > 0:
+        config = set_config_defaults(
+            {"schema_reader_parse_workers": args.parse_workers, "schema_reader_parse_pool": args.parse_pool}
+        )
+        parallel = _time_replay(messages, config, bulk_load=True)
+        print(f"records: {args.records}  bulk load with {args.parse_workers} {args.parse_pool} workers: {parallel:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark for resolving Protobuf schema references in the schema reader.
+
+Builds a layered reference graph where every schema imports both schemas of
+the previous level, so the number of import paths doubles with every level.
+Resolving the top level references is timed with the referenced schema
+cache of the schema reader and without it.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.config import DEFAULTS
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.key_format import KeyFormatter
+from karapace.offset_watcher import OffsetWatcher
+from karapace.schema_models import ParsedSchemaCache, SchemaVersion
+from karapace.schema_reader import KafkaSchemaReader
+from karapace.schema_references import Reference
+from karapace.typing import Subject, Version
+
+import argparse
+import logging
+import time
+
+WIDTH = 2
+
+
+def _subject(level: int, index: int) -> str:
+    return f"level{level}_{index}"
+
+
+def _schema(level: int, index: int) -> str:
+    lines = ['syntax = "proto3";', ""]
+    fields = []
+    if level > 0:
+        for dependency in range(WIDTH):
+            lines.append(f'import "{_subject(level - 1, dependency)}.proto";')
+            fields.append(f"  Message{level - 1}_{dependency} field{dependency} = {dependency + 1};")
+        lines.append("")
+    else:
+        fields.append("  int32 value = 1;")
+    lines.append(f"message Message{level}_{index} {{")
+    lines.extend(fields)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _create_reader(levels: int) -> KafkaSchemaReader:
+    reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    schema_id = 0
+    for level in range(levels):
+        for index in range(WIDTH):
+            schema_id += 1
+            subject = _subject(level, index)
+            references = []
+            if level > 0:
+                for dependency in range(WIDTH):
+                    dependency_subject = _subject(level - 1, dependency)
+                    references.append({"name": f"{dependency_subject}.proto", "subject": dependency_subject, "version": 1})
+            key = {"keytype": "SCHEMA", "subject": subject, "version": 1, "magic": 1}
+            value = {
+                "schemaType": "PROTOBUF",
+                "subject": subject,
+                "version": 1,
+                "id": schema_id,
+                "deleted": False,
+                "schema": _schema(level, index),
+                "references": references,
+            }
+            reader.handle_msg(key, value)
+    return reader
+
+
+def _time_resolution(reader: KafkaSchemaReader, levels: int, *, cached: bool, rounds: int) -> float:
+    subjects = [Subject(_subject(levels - 1, index)) for index in range(WIDTH)]
+    references = [Reference(name=f"{subject}.proto", subject=subject, version=Version(1)) for subject in subjects]
+    if not cached:
+        # Resolve the whole reference tree on every call, as before the cache was added.
+        def resolve_uncached(schema_version: SchemaVersion):
+            return reader._resolve_and_validate(schema_version.schema)  # pylint: disable=protected-access
+
+        reader._get_referenced_schema = resolve_uncached  # type: ignore[method-assign]  # pylint: disable=protected-access
+        reader.parsed_schema_cache = ParsedSchemaCache(maxsize=0)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if cached:
+            # Measure a cold resolution, where every schema of the graph is resolved once.
+            reader._referenced_schemas.clear()  # pylint: disable=protected-access
+            reader.parsed_schema_cache.clear()
+        reader.resolve_references(references)
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    for levels in range(1, args.levels + 1):
+        cached = _time_resolution(_create_reader(levels), levels, cached=True, rounds=args.rounds)
+        uncached = _time_resolution(_create_reader(levels), levels, cached=False, rounds=args.rounds)
+        print(f"levels: {levels}  cached: {cached * 1000:9.2f} ms  uncached: {uncached * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
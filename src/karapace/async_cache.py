@@ -0,0 +1,83 @@
+"""
+karapace - cache of the results of coroutines
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from cachetools import TTLCache
+from collections.abc import Awaitable, Hashable
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Generic, TypeVar
+
+import asyncio
+import time
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class AsyncTTLCache(Generic[K, V]):
+    """Cache of the results of coroutines, bounded in size (LRU) and in age (TTL).
+
+    Concurrent lookups of a missing key share a single call of the loader. Failures are not
+    cached, every waiter of the failed call gets the exception and the next lookup retries.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic) -> None:
+        self._cache: TTLCache[K, V] = TTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._loading: dict[K, asyncio.Future[V]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        try:
+            value = self._cache[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return value
+
+        loading = self._loading.get(key)
+        if loading is None:
+            self.misses += 1
+            loading = asyncio.ensure_future(load())
+            self._loading[key] = loading
+            loading.add_done_callback(partial(self._loaded, key))
+        else:
+            self.hits += 1
+        # The load is shared, a waiter being cancelled must not cancel it for the others
+        return await asyncio.shield(loading)
+
+    def _loaded(self, key: K, loading: asyncio.Future[V]) -> None:
+        if self._loading.get(key) is loading:
+            del self._loading[key]
+        # Checking the exception also marks it as retrieved when every waiter was cancelled
+        if not loading.cancelled() and loading.exception() is None:
+            self._cache[key] = loading.result()
+
+    def pop(self, key: K) -> None:
+        """Drops the cached value of `key`, a load in progress is still shared."""
+        with suppress(KeyError):
+            del self._cache[key]
+
+    def clear(self) -> None:
+        self._cache.clear()
+        for loading in self._loading.values():
+            loading.cancel()
+        self._loading.clear()
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(hits=self.hits, misses=self.misses, maxsize=int(self._cache.maxsize), currsize=len(self._cache))
@@ -5,6 +5,7 @@ See LICENSE for details
 from __future__ import annotations
 
 from base64 import b64encode
+from cachetools import LRUCache, TTLCache
 from dataclasses import dataclass, field
 from enum import Enum, unique
 from hmac import compare_digest
@@ -12,6 +13,7 @@ from karapace.config import InvalidConfiguration
 from karapace.rapu import JSON_CONTENT_TYPE
 from karapace.statsd import StatsClient
 from karapace.utils import json_decode, json_encode
+from typing import Final
 from typing_extensions import TypedDict
 from watchfiles import awatch, Change
 
@@ -29,6 +31,14 @@ import sys
 
 log = logging.getLogger(__name__)
 
+METRIC_CREDENTIALS_CACHE_HIT: Final = "karapace_auth_credentials_cache_hit"
+METRIC_CREDENTIALS_CACHE_MISS: Final = "karapace_auth_credentials_cache_miss"
+ACL_DECISION_CACHE_SIZE: Final = 100_000
+
+# Backreferences are numbered or named per pattern, they break once the patterns are combined
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+_DEFAULT_FLAGS = re.compile("").flags
+
 
 @unique
 class Operation(Enum):
@@ -95,38 +105,74 @@ class AuthData(TypedDict):
     permissions: list[ACLEntryData]
 
 
+def combine_patterns(patterns: list[re.Pattern]) -> tuple[re.Pattern, ...]:
+    """Combines the patterns into an alternation, matching a string when any of the patterns matches it.
+
+    Patterns with backreferences or global inline flags, e.g. `(?i)`, cannot be combined and are kept as they are.
+    """
+    unique_patterns = list(dict.fromkeys(patterns))
+    combinable = [
+        pattern
+        for pattern in unique_patterns
+        if pattern.flags == _DEFAULT_FLAGS and _BACKREFERENCE.search(pattern.pattern) is None
+    ]
+    kept = tuple(pattern for pattern in unique_patterns if pattern not in combinable)
+    if len(combinable) < 2:
+        return tuple(combinable) + kept
+    try:
+        combined = re.compile("|".join(f"(?:{pattern.pattern})" for pattern in combinable))
+    except re.error:
+        return tuple(unique_patterns)
+    return (combined,) + kept
+
+
 class ACLAuthorizer:
-    def __init__(self, *, user_db: dict[str, User] | None = None, permissions: list[ACLEntry] | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        user_db: dict[str, User] | None = None,
+        permissions: list[ACLEntry] | None = None,
+        decision_cache_size: int = ACL_DECISION_CACHE_SIZE,
+    ) -> None:
         self.user_db = user_db or {}
+        self._resource_patterns: dict[tuple[str, Operation], tuple[re.Pattern, ...]] = {}
+        self._decisions: LRUCache[tuple[str, Operation, str], bool] = LRUCache(maxsize=decision_cache_size)
         self.permissions = permissions or []
 
-    def get_user(self, username: str) -> User | None:
-        return self.user_db.get(username)
-
-    def _check_resources(self, resources: list[str], aclentry: ACLEntry) -> bool:
-        for resource in resources:
-            if aclentry.resource.match(resource) is not None:
-                return True
-        return False
+    @property
+    def permissions(self) -> list[ACLEntry]:
+        return self._permissions
 
-    def _check_operation(self, operation: Operation, aclentry: ACLEntry) -> bool:
-        """Does ACL entry allow given operation.
+    @permissions.setter
+    def permissions(self, permissions: list[ACLEntry]) -> None:
+        """Indexes the resource patterns of the entries per username and operation.
 
         An entry at minimum gives Read permission. Write permission implies Read."""
-        return operation == Operation.Read or aclentry.operation == Operation.Write
+        patterns: dict[tuple[str, Operation], list[re.Pattern]] = {}
+        for aclentry in permissions:
+            patterns.setdefault((aclentry.username, Operation.Read), []).append(aclentry.resource)
+            if aclentry.operation == Operation.Write:
+                patterns.setdefault((aclentry.username, Operation.Write), []).append(aclentry.resource)
+        self._permissions = permissions
+        self._resource_patterns = {key: combine_patterns(resources) for key, resources in patterns.items()}
+        self._decisions.clear()
+
+    def get_user(self, username: str) -> User | None:
+        return self.user_db.get(username)
+
+    def _is_authorized(self, username: str, operation: Operation, resource: str) -> bool:
+        key = (username, operation, resource)
+        decision = self._decisions.get(key)
+        if decision is None:
+            patterns = self._resource_patterns.get((username, operation), ())
+            decision = any(pattern.match(resource) is not None for pattern in patterns)
+            self._decisions[key] = decision
+        return decision
 
     def check_authorization(self, user: User | None, operation: Operation, resource: str) -> bool:
         if user is None:
             return False
-
-        for aclentry in self.permissions:
-            if (
-                aclentry.username == user.username
-                and self._check_operation(operation, aclentry)
-                and self._check_resources([resource], aclentry)
-            ):
-                return True
-        return False
+        return self._is_authorized(user.username, operation, resource)
 
     def check_authorization_any(self, user: User | None, operation: Operation, resources: list[str]) -> bool:
         """Checks that user is authorized to one of the resources in the list.
@@ -136,24 +182,30 @@ class ACLAuthorizer:
         """
         if user is None:
             return False
-
-        for aclentry in self.permissions:
-            if (
-                aclentry.username == user.username
-                and self._check_operation(operation, aclentry)
-                and self._check_resources(resources, aclentry)
-            ):
-                return True
-        return False
+        return any(self._is_authorized(user.username, operation, resource) for resource in resources)
 
 
 class HTTPAuthorizer(ACLAuthorizer):
-    def __init__(self, filename: str) -> None:
+    def __init__(
+        self,
+        filename: str,
+        *,
+        stats: StatsClient | None = None,
+        credentials_cache_size: int = 0,
+        credentials_cache_ttl: float = 0,
+    ) -> None:
         super().__init__()
         self._auth_filename: str = filename
         self._auth_mtime: float = -1
         self._refresh_auth_task: asyncio.Task | None = None
         self._refresh_auth_awatch_stop_event = asyncio.Event()
+        self._stats = stats
+        # Successfully verified credentials, hashing the password with `hash_password` is slow by design.
+        # The keys are digests of the credentials keyed with a secret of the process, never the plaintext password.
+        self._credentials_cache: TTLCache[bytes, User] | None = None
+        if credentials_cache_size > 0 and credentials_cache_ttl > 0:
+            self._credentials_cache = TTLCache(maxsize=credentials_cache_size, ttl=credentials_cache_ttl)
+        self._credentials_cache_secret = secrets.token_bytes(32)
         # Once first, can raise if file not valid
         self._load_authfile()
 
@@ -213,6 +265,8 @@ class HTTPAuthorizer(ACLAuthorizer):
                     for entry in authdata["permissions"]
                 ]
                 self.user_db = users
+                if self._credentials_cache is not None:
+                    self._credentials_cache.clear()
                 log.info(
                     "Loaded schema registry users: %s",
                     users,
@@ -243,8 +297,8 @@ class HTTPAuthorizer(ACLAuthorizer):
                 text='{"message": "Unauthorized"}',
                 content_type=JSON_CONTENT_TYPE,
             )
-        user = self.get_user(auth.login)
-        if user is None or not user.compare_password(auth.password):
+        user = self._verify_credentials(auth.login, auth.password)
+        if user is None:
             raise aiohttp.web.HTTPUnauthorized(
                 headers={"WWW-Authenticate": 'Basic realm="Karapace Schema Registry"'},
                 text='{"message": "Unauthorized"}',
@@ -253,6 +307,28 @@ class HTTPAuthorizer(ACLAuthorizer):
 
         return user
 
+    def _verify_credentials(self, username: str, password: str) -> User | None:
+        if self._credentials_cache is None:
+            user = self.get_user(username)
+            return user if user is not None and user.compare_password(password) else None
+
+        credentials_digest = hashlib.blake2b(
+            f"{len(username)}:{username}:{password}".encode(), key=self._credentials_cache_secret
+        ).digest()
+        user = self._credentials_cache.get(credentials_digest)
+        if user is not None:
+            if self._stats is not None:
+                self._stats.increase(METRIC_CREDENTIALS_CACHE_HIT)
+            return user
+
+        if self._stats is not None:
+            self._stats.increase(METRIC_CREDENTIALS_CACHE_MISS)
+        user = self.get_user(username)
+        if user is None or not user.compare_password(password):
+            return None
+        self._credentials_cache[credentials_digest] = user
+        return user
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(prog="karapace_mkpasswd", description="Karapace password hasher")
@@ -0,0 +1,581 @@
+"""
+karapace - Avro schema compiler
+
+Compiles an Avro schema into closures encoding and decoding the data of the schema,
+instead of interpreting the schema tree for every datum as `avro.io` does. The output
+is the same as the one of `avro.io.DatumWriter` and `avro.io.DatumReader`, the data
+to encode is validated as with `avro.io.validate`.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from avro.io import BinaryDecoder, BinaryEncoder, STRUCT_DOUBLE, STRUCT_FLOAT
+from avro.schema import (
+    ArraySchema,
+    BytesDecimalSchema,
+    DateSchema,
+    EnumSchema,
+    FixedDecimalSchema,
+    FixedSchema,
+    INT_MAX_VALUE,
+    INT_MIN_VALUE,
+    LONG_MAX_VALUE,
+    LONG_MIN_VALUE,
+    MapSchema,
+    NamedSchema,
+    PrimitiveSchema,
+    RecordSchema,
+    Schema,
+    TimeMicrosSchema,
+    TimeMillisSchema,
+    TimestampMicrosSchema,
+    TimestampMillisSchema,
+    UnionSchema,
+    UUIDSchema,
+)
+from avro.timezones import utc
+from typing import Any, Callable
+
+import avro.errors
+import avro.io
+import datetime
+import decimal
+import io
+import uuid
+
+Check = Callable[[Any], bool]
+Encode = Callable[[Any, bytearray], None]
+Decode = Callable[[bytes, int], tuple[Any, int]]
+
+_EPOCH_DATE = datetime.date(1970, 1, 1)
+_EPOCH_DATETIME = datetime.datetime(1970, 1, 1, 0, 0, 0, 0, tzinfo=utc)
+
+
+def union_branch_name(schema: Schema) -> str:
+    """The tag of the union branch in the JSON encoding."""
+    if isinstance(schema, PrimitiveSchema):
+        return schema.fullname
+    if isinstance(schema, NamedSchema):
+        return schema.name
+    return schema.type
+
+
+def _write_long(out: bytearray, datum: int) -> None:
+    datum = (datum << 1) ^ (datum >> 63)
+    while datum & ~0x7F:
+        out.append((datum & 0x7F) | 0x80)
+        datum >>= 7
+    out.append(datum)
+
+
+def _write_bytes(out: bytearray, datum: bytes) -> None:
+    _write_long(out, len(datum))
+    out += datum
+
+
+def _read_long(data: bytes, pos: int) -> tuple[int, int]:
+    b = data[pos]
+    pos += 1
+    n = b & 0x7F
+    shift = 7
+    while b & 0x80:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        shift += 7
+    return (n >> 1) ^ -(n & 1), pos
+
+
+def _read_raw(data: bytes, pos: int, size: int) -> tuple[bytes, int]:
+    if size < 0:
+        raise avro.errors.InvalidAvroBinaryEncoding(f"Requested {size} bytes to read, expected positive integer.")
+    end = pos + size
+    if end > len(data):
+        raise avro.errors.InvalidAvroBinaryEncoding(f"Read {len(data) - pos} bytes, expected {size} bytes")
+    return data[pos:end], end
+
+
+def _read_bytes(data: bytes, pos: int) -> tuple[bytes, int]:
+    size, pos = _read_long(data, pos)
+    return _read_raw(data, pos, size)
+
+
+def _is_timezone_aware_datetime(datum: Any) -> bool:
+    return isinstance(datum, datetime.datetime) and datum.tzinfo is not None and datum.tzinfo.utcoffset(datum) is not None
+
+
+def _is_uuid(datum: Any) -> bool:
+    try:
+        uuid.UUID(datum)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+def _timedelta_total_microseconds(delta: datetime.timedelta) -> int:
+    return delta.microseconds + (delta.seconds + delta.days * 24 * 3600) * 10**6
+
+
+def _time_from_microseconds(value: int) -> datetime.time:
+    value, microseconds = divmod(value, 1000000)
+    value, seconds = divmod(value, 60)
+    hours, minutes = divmod(value, 60)
+    return datetime.time(hour=hours, minute=minutes, second=seconds, microsecond=microseconds)
+
+
+_PRIMITIVE_CHECKS: dict[str, Check] = {
+    "null": lambda datum: datum is None,
+    "boolean": lambda datum: isinstance(datum, bool),
+    "string": lambda datum: isinstance(datum, str),
+    "bytes": lambda datum: isinstance(datum, bytes),
+    "int": lambda datum: isinstance(datum, int) and INT_MIN_VALUE <= datum <= INT_MAX_VALUE,
+    "long": lambda datum: isinstance(datum, int) and LONG_MIN_VALUE <= datum <= LONG_MAX_VALUE,
+    "float": lambda datum: isinstance(datum, (int, float)),
+    "double": lambda datum: isinstance(datum, (int, float)),
+}
+
+
+def _write_null(datum: None, out: bytearray) -> None:  # pylint: disable=unused-argument
+    pass
+
+
+def _write_boolean(datum: bool, out: bytearray) -> None:
+    out.append(1 if datum else 0)
+
+
+def _write_string(datum: str, out: bytearray) -> None:
+    _write_bytes(out, datum.encode("utf-8"))
+
+
+def _write_float(datum: float, out: bytearray) -> None:
+    out += STRUCT_FLOAT.pack(datum)
+
+
+def _write_double(datum: float, out: bytearray) -> None:
+    out += STRUCT_DOUBLE.pack(datum)
+
+
+def _write_date(datum: datetime.date, out: bytearray) -> None:
+    _write_long(out, (datum - _EPOCH_DATE).days)
+
+
+def _write_time_millis(datum: datetime.time, out: bytearray) -> None:
+    _write_long(out, datum.hour * 3600000 + datum.minute * 60000 + datum.second * 1000 + datum.microsecond // 1000)
+
+
+def _write_time_micros(datum: datetime.time, out: bytearray) -> None:
+    _write_long(out, datum.hour * 3600000000 + datum.minute * 60000000 + datum.second * 1000000 + datum.microsecond)
+
+
+def _write_timestamp_millis(datum: datetime.datetime, out: bytearray) -> None:
+    _write_long(out, _timedelta_total_microseconds(datum.astimezone(tz=utc) - _EPOCH_DATETIME) // 1000)
+
+
+def _write_timestamp_micros(datum: datetime.datetime, out: bytearray) -> None:
+    _write_long(out, _timedelta_total_microseconds(datum.astimezone(tz=utc) - _EPOCH_DATETIME))
+
+
+_PRIMITIVE_WRITERS: dict[str, Encode] = {
+    "null": _write_null,
+    "boolean": _write_boolean,
+    "string": _write_string,
+    "bytes": lambda datum, out: _write_bytes(out, datum),
+    "int": lambda datum, out: _write_long(out, datum),
+    "long": lambda datum, out: _write_long(out, datum),
+    "float": _write_float,
+    "double": _write_double,
+}
+
+
+def _read_null(data: bytes, pos: int) -> tuple[None, int]:  # pylint: disable=unused-argument
+    return None, pos
+
+
+def _read_boolean(data: bytes, pos: int) -> tuple[bool, int]:
+    raw, pos = _read_raw(data, pos, 1)
+    return raw[0] == 1, pos
+
+
+def _read_string(data: bytes, pos: int) -> tuple[str, int]:
+    raw, pos = _read_bytes(data, pos)
+    return raw.decode("utf-8"), pos
+
+
+def _read_float(data: bytes, pos: int) -> tuple[float, int]:
+    raw, pos = _read_raw(data, pos, 4)
+    return float(STRUCT_FLOAT.unpack(raw)[0]), pos
+
+
+def _read_double(data: bytes, pos: int) -> tuple[float, int]:
+    raw, pos = _read_raw(data, pos, 8)
+    return float(STRUCT_DOUBLE.unpack(raw)[0]), pos
+
+
+def _read_date(data: bytes, pos: int) -> tuple[datetime.date, int]:
+    days, pos = _read_long(data, pos)
+    return _EPOCH_DATE + datetime.timedelta(days), pos
+
+
+def _read_time_millis(data: bytes, pos: int) -> tuple[datetime.time, int]:
+    milliseconds, pos = _read_long(data, pos)
+    return _time_from_microseconds(milliseconds * 1000), pos
+
+
+def _read_time_micros(data: bytes, pos: int) -> tuple[datetime.time, int]:
+    microseconds, pos = _read_long(data, pos)
+    return _time_from_microseconds(microseconds), pos
+
+
+def _read_timestamp_millis(data: bytes, pos: int) -> tuple[datetime.datetime, int]:
+    milliseconds, pos = _read_long(data, pos)
+    return _EPOCH_DATETIME + datetime.timedelta(microseconds=milliseconds * 1000), pos
+
+
+def _read_timestamp_micros(data: bytes, pos: int) -> tuple[datetime.datetime, int]:
+    microseconds, pos = _read_long(data, pos)
+    return _EPOCH_DATETIME + datetime.timedelta(microseconds=microseconds), pos
+
+
+_PRIMITIVE_READERS: dict[str, Decode] = {
+    "null": _read_null,
+    "boolean": _read_boolean,
+    "string": _read_string,
+    "bytes": _read_bytes,
+    "int": _read_long,
+    "long": _read_long,
+    "float": _read_float,
+    "double": _read_double,
+}
+
+# Logical types of the primitive types, with the check, writer and reader of each
+_LOGICAL_TYPES: dict[type[Schema], tuple[Check, Encode, Decode]] = {
+    DateSchema: (lambda datum: isinstance(datum, datetime.date), _write_date, _read_date),
+    TimeMillisSchema: (lambda datum: isinstance(datum, datetime.time), _write_time_millis, _read_time_millis),
+    TimeMicrosSchema: (lambda datum: isinstance(datum, datetime.time), _write_time_micros, _read_time_micros),
+    TimestampMillisSchema: (_is_timezone_aware_datetime, _write_timestamp_millis, _read_timestamp_millis),
+    TimestampMicrosSchema: (_is_timezone_aware_datetime, _write_timestamp_micros, _read_timestamp_micros),
+    UUIDSchema: (_is_uuid, _write_string, _read_string),
+}
+
+
+def _checked(schema: Schema, check: Check, write: Encode) -> Encode:
+    def encode(datum: Any, out: bytearray) -> None:
+        if not check(datum):
+            raise avro.errors.AvroTypeException(schema, datum)
+        write(datum, out)
+
+    return encode
+
+
+class _EncoderCompiler:
+    def __init__(self) -> None:
+        # Named schemas are compiled once, this also ends the recursion of recursive records
+        self._named: dict[int, tuple[Check, Encode]] = {}
+
+    def compile(self, schema: Schema) -> tuple[Check, Encode]:  # pylint: disable=too-many-return-statements
+        """The check of the top level of the datum, and the function validating and writing the whole datum."""
+        compiled = self._named.get(id(schema))
+        if compiled is not None:
+            return compiled
+
+        if isinstance(schema, (BytesDecimalSchema, FixedDecimalSchema)):
+            return self._decimal(schema)
+        if type(schema) in _LOGICAL_TYPES:
+            check, write, _ = _LOGICAL_TYPES[type(schema)]
+            return check, _checked(schema, check, write)
+        if isinstance(schema, PrimitiveSchema):
+            check = _PRIMITIVE_CHECKS[schema.type]
+            return check, _checked(schema, check, _PRIMITIVE_WRITERS[schema.type])
+        if isinstance(schema, FixedSchema):
+            return self._fixed(schema)
+        if isinstance(schema, EnumSchema):
+            return self._enum(schema)
+        if isinstance(schema, ArraySchema):
+            return self._array(schema)
+        if isinstance(schema, MapSchema):
+            return self._map(schema)
+        if isinstance(schema, UnionSchema):
+            return self._union(schema)
+        if isinstance(schema, RecordSchema):
+            return self._record(schema)
+        raise avro.errors.AvroException(f"Unknown type: {schema.type}")
+
+    def _decimal(self, schema: BytesDecimalSchema | FixedDecimalSchema) -> tuple[Check, Encode]:
+        scale = schema.scale
+        fixed_size = schema.size if isinstance(schema, FixedDecimalSchema) else None
+
+        def check(datum: Any) -> bool:
+            return isinstance(datum, decimal.Decimal)
+
+        def write(datum: decimal.Decimal, out: bytearray) -> None:
+            # The rarely used decimals are written with the encoder of `avro.io`
+            buffer = io.BytesIO()
+            if fixed_size is None:
+                BinaryEncoder(buffer).write_decimal_bytes(datum, scale)
+            else:
+                BinaryEncoder(buffer).write_decimal_fixed(datum, scale, fixed_size)
+            out += buffer.getvalue()
+
+        return check, _checked(schema, check, write)
+
+    def _fixed(self, schema: FixedSchema) -> tuple[Check, Encode]:
+        size = schema.size
+
+        def check(datum: Any) -> bool:
+            return isinstance(datum, bytes) and len(datum) == size
+
+        def write(datum: bytes, out: bytearray) -> None:
+            out += datum
+
+        compiled = check, _checked(schema, check, write)
+        self._named[id(schema)] = compiled
+        return compiled
+
+    def _enum(self, schema: EnumSchema) -> tuple[Check, Encode]:
+        symbols = list(schema.symbols)
+        indexes = {symbol: index for index, symbol in enumerate(symbols)}
+
+        def check(datum: Any) -> bool:
+            return datum in symbols
+
+        def write(datum: str, out: bytearray) -> None:
+            _write_long(out, indexes[datum])
+
+        compiled = check, _checked(schema, check, write)
+        self._named[id(schema)] = compiled
+        return compiled
+
+    def _array(self, schema: ArraySchema) -> tuple[Check, Encode]:
+        _, encode_item = self.compile(schema.items)
+
+        def check(datum: Any) -> bool:
+            return isinstance(datum, list)
+
+        def write(datum: list, out: bytearray) -> None:
+            if datum:
+                _write_long(out, len(datum))
+                for item in datum:
+                    encode_item(item, out)
+            out.append(0)
+
+        return check, _checked(schema, check, write)
+
+    def _map(self, schema: MapSchema) -> tuple[Check, Encode]:
+        _, encode_value = self.compile(schema.values)
+
+        def check(datum: Any) -> bool:
+            return isinstance(datum, dict) and all(isinstance(key, str) for key in datum)
+
+        def write(datum: dict, out: bytearray) -> None:
+            if datum:
+                _write_long(out, len(datum))
+                for key, value in datum.items():
+                    _write_string(key, out)
+                    encode_value(value, out)
+            out.append(0)
+
+        return check, _checked(schema, check, write)
+
+    def _union(self, schema: UnionSchema) -> tuple[Check, Encode]:
+        branches = [self.compile(branch) for branch in schema.schemas]
+        checks = [check for check, _ in branches]
+
+        def branch_of(datum: Any) -> int | None:
+            candidates = [index for index, check in enumerate(checks) if check(datum)]
+            if len(candidates) == 1:
+                return candidates[0]
+            # As `avro.io.DatumWriter.write_union`, the last valid branch is used
+            return next((index for index in reversed(candidates) if avro.io.validate(schema.schemas[index], datum)), None)
+
+        def check(datum: Any) -> bool:
+            return any(check(datum) for check in checks)
+
+        def encode(datum: Any, out: bytearray) -> None:
+            index = branch_of(datum)
+            if index is None:
+                raise avro.errors.AvroTypeException(schema, datum)
+            _write_long(out, index)
+            branches[index][1](datum, out)
+
+        return check, encode
+
+    def _record(self, schema: RecordSchema) -> tuple[Check, Encode]:
+        field_names = frozenset(field.name for field in schema.fields)
+        fields: list[tuple[str, Encode]] = []
+
+        def check(datum: Any) -> bool:
+            return isinstance(datum, dict) and field_names.issuperset(datum.keys())
+
+        def write(datum: dict, out: bytearray) -> None:
+            for name, encode_field in fields:
+                encode_field(datum.get(name), out)
+
+        compiled = check, _checked(schema, check, write)
+        self._named[id(schema)] = compiled
+        fields.extend((field.name, self.compile(field.type)[1]) for field in schema.fields)
+        return compiled
+
+
+class _DecoderCompiler:
+    def __init__(self) -> None:
+        self._named: dict[int, Decode] = {}
+
+    def compile(self, schema: Schema) -> Decode:  # pylint: disable=too-many-return-statements
+        compiled = self._named.get(id(schema))
+        if compiled is not None:
+            return compiled
+
+        if isinstance(schema, (BytesDecimalSchema, FixedDecimalSchema)):
+            return self._decimal(schema)
+        if type(schema) in _LOGICAL_TYPES:
+            return _LOGICAL_TYPES[type(schema)][2]
+        if isinstance(schema, PrimitiveSchema):
+            return _PRIMITIVE_READERS[schema.type]
+        if isinstance(schema, FixedSchema):
+            return self._fixed(schema)
+        if isinstance(schema, EnumSchema):
+            return self._enum(schema)
+        if isinstance(schema, ArraySchema):
+            return self._array(schema)
+        if isinstance(schema, MapSchema):
+            return self._map(schema)
+        if isinstance(schema, UnionSchema):
+            return self._union(schema)
+        if isinstance(schema, RecordSchema):
+            return self._record(schema)
+        raise avro.errors.AvroException(f"Cannot read unknown schema type: {schema.type}")
+
+    def _decimal(self, schema: BytesDecimalSchema | FixedDecimalSchema) -> Decode:
+        precision = schema.precision
+        scale = schema.scale
+        fixed_size = schema.size if isinstance(schema, FixedDecimalSchema) else None
+
+        def decode(data: bytes, pos: int) -> tuple[decimal.Decimal, int]:
+            if fixed_size is None:
+                size, pos = _read_long(data, pos)
+            else:
+                size = fixed_size
+            raw, pos = _read_raw(data, pos, size)
+            # The rarely used decimals are read with the decoder of `avro.io`
+            return BinaryDecoder(io.BytesIO(raw)).read_decimal_from_fixed(precision, scale, size), pos
+
+        return decode
+
+    def _fixed(self, schema: FixedSchema) -> Decode:
+        size = schema.size
+
+        def decode(data: bytes, pos: int) -> tuple[bytes, int]:
+            return _read_raw(data, pos, size)
+
+        self._named[id(schema)] = decode
+        return decode
+
+    def _enum(self, schema: EnumSchema) -> Decode:
+        symbols = list(schema.symbols)
+
+        def decode(data: bytes, pos: int) -> tuple[str, int]:
+            index, pos = _read_long(data, pos)
+            if index >= len(symbols):
+                raise avro.errors.SchemaResolutionException(
+                    f"Can't access enum index {index} for enum with {len(symbols)} symbols", schema, schema
+                )
+            return symbols[index], pos
+
+        self._named[id(schema)] = decode
+        return decode
+
+    def _array(self, schema: ArraySchema) -> Decode:
+        decode_item = self.compile(schema.items)
+
+        def decode(data: bytes, pos: int) -> tuple[list, int]:
+            items = []
+            block_count, pos = _read_long(data, pos)
+            while block_count != 0:
+                if block_count < 0:
+                    block_count = -block_count
+                    _, pos = _read_long(data, pos)
+                for _ in range(block_count):
+                    item, pos = decode_item(data, pos)
+                    items.append(item)
+                block_count, pos = _read_long(data, pos)
+            return items, pos
+
+        return decode
+
+    def _map(self, schema: MapSchema) -> Decode:
+        decode_value = self.compile(schema.values)
+
+        def decode(data: bytes, pos: int) -> tuple[dict, int]:
+            items = {}
+            block_count, pos = _read_long(data, pos)
+            while block_count != 0:
+                if block_count < 0:
+                    block_count = -block_count
+                    _, pos = _read_long(data, pos)
+                for _ in range(block_count):
+                    key, pos = _read_string(data, pos)
+                    items[key], pos = decode_value(data, pos)
+                block_count, pos = _read_long(data, pos)
+            return items, pos
+
+        return decode
+
+    def _union(self, schema: UnionSchema) -> Decode:
+        branches = [self.compile(branch) for branch in schema.schemas]
+
+        def decode(data: bytes, pos: int) -> tuple[Any, int]:
+            index, pos = _read_long(data, pos)
+            if index >= len(branches):
+                raise avro.errors.SchemaResolutionException(
+                    f"Can't access branch index {index} for union with {len(branches)} branches", schema, schema
+                )
+            return branches[index](data, pos)
+
+        return decode
+
+    def _record(self, schema: RecordSchema) -> Decode:
+        fields: list[tuple[str, Decode]] = []
+
+        def decode(data: bytes, pos: int) -> tuple[dict, int]:
+            record = {}
+            for name, decode_field in fields:
+                record[name], pos = decode_field(data, pos)
+            return record, pos
+
+        self._named[id(schema)] = decode
+        fields.extend((field.name, self.compile(field.type)) for field in schema.fields)
+        return decode
+
+
+def compile_encoder(schema: Schema) -> Callable[[Any], bytes]:
+    """Compile `schema` into a function returning the encoding of a datum.
+
+    Raises `avro.errors.AvroTypeException` if the datum is not valid for the schema.
+    """
+    _, encode = _EncoderCompiler().compile(schema)
+
+    def encoder(datum: Any) -> bytes:
+        out = bytearray()
+        encode(datum, out)
+        return bytes(out)
+
+    return encoder
+
+
+def compile_decoder(schema: Schema) -> Callable[[bytes, int], tuple[Any, int]]:
+    """Compile `schema` into a function decoding a datum from `data` at `pos`.
+
+    The function returns the datum and the position after it. Raises
+    `avro.errors.InvalidAvroBinaryEncoding` if the data is truncated.
+    """
+    decode = _DecoderCompiler().compile(schema)
+
+    def decoder(data: bytes, pos: int) -> tuple[Any, int]:
+        try:
+            return decode(data, pos)
+        except IndexError as e:
+            raise avro.errors.InvalidAvroBinaryEncoding("Data ended before the end of the datum") from e
+
+    return decoder
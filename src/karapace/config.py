@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from collections.abc import Mapping
 from karapace.constants import DEFAULT_AIOHTTP_CLIENT_MAX_SIZE, DEFAULT_PRODUCER_MAX_REQUEST, DEFAULT_SCHEMA_TOPIC
-from karapace.typing import ElectionStrategy, NameStrategy
+from karapace.typing import ElectionStrategy, NameStrategy, SchemaReaderParsePool
 from karapace.utils import json_decode, json_encode, JSONDecodeError
 from pathlib import Path
 from typing import IO
@@ -47,6 +47,8 @@ class Config(TypedDict):
     registry_password: str | None
     registry_ca: str | None
     registry_authfile: str | None
+    registry_authfile_cache_size: int
+    registry_authfile_cache_ttl_seconds: float
     rest_authorization: bool
     rest_base_uri: str | None
     log_handler: str | None
@@ -68,6 +70,7 @@ class Config(TypedDict):
     topic_name: str
     metadata_max_age_ms: int
     admin_metadata_max_age: int
+    admin_metadata_max_stale_age: int
     producer_acks: int
     producer_compression_type: str | None
     producer_count: int
@@ -79,7 +82,19 @@ class Config(TypedDict):
     name_strategy: str
     name_strategy_validation: bool
     master_election_strategy: str
+    parsed_schema_cache_size: int
+    registry_response_cache_size: int
+    schema_write_group_commit_ms: int
+    schema_reader_snapshot_path: str | None
+    schema_reader_snapshot_interval_seconds: int
+    schema_reader_parse_workers: int
+    schema_reader_parse_pool: str
     protobuf_runtime_directory: str
+    protobuf_serde_workers: int
+    protobuf_serde_worker_max_tasks: int
+    avro_compiled_codec: bool
+    rest_serialization_workers: int
+    rest_serialization_batch_threshold: int
     statsd_host: str
     statsd_port: int
     kafka_schema_reader_strict_mode: bool
@@ -126,6 +141,8 @@ DEFAULTS: ConfigDefaults = {
     "registry_password": None,
     "registry_ca": None,
     "registry_authfile": None,
+    "registry_authfile_cache_size": 1000,
+    "registry_authfile_cache_ttl_seconds": 300,
     "rest_authorization": False,
     "rest_base_uri": None,
     "log_handler": "stdout",
@@ -147,6 +164,7 @@ DEFAULTS: ConfigDefaults = {
     "topic_name": DEFAULT_SCHEMA_TOPIC,
     "metadata_max_age_ms": 60000,
     "admin_metadata_max_age": 5,
+    "admin_metadata_max_stale_age": 30,
     "producer_acks": 1,
     "producer_compression_type": None,
     "producer_count": 5,
@@ -158,7 +176,19 @@ DEFAULTS: ConfigDefaults = {
     "name_strategy": "topic_name",
     "name_strategy_validation": True,
     "master_election_strategy": "lowest",
+    "parsed_schema_cache_size": 1000,
+    "registry_response_cache_size": 1000,
+    "schema_write_group_commit_ms": 0,
+    "schema_reader_snapshot_path": None,
+    "schema_reader_snapshot_interval_seconds": 300,
+    "schema_reader_parse_workers": 0,
+    "schema_reader_parse_pool": "process",
     "protobuf_runtime_directory": "runtime",
+    "protobuf_serde_workers": 2,
+    "protobuf_serde_worker_max_tasks": 10000,
+    "avro_compiled_codec": False,
+    "rest_serialization_workers": 2,
+    "rest_serialization_batch_threshold": 500,
     "statsd_host": "127.0.0.1",
     "statsd_port": 8125,
     "kafka_schema_reader_strict_mode": False,
@@ -280,6 +310,15 @@ def validate_config(config: Config) -> None:
             f"Invalid default name strategy: {name_strategy}, valid values are {valid_strategies}"
         ) from None
 
+    schema_reader_parse_pool = config["schema_reader_parse_pool"]
+    try:
+        SchemaReaderParsePool(schema_reader_parse_pool)
+    except ValueError:
+        valid_pools = [pool.value for pool in SchemaReaderParsePool]
+        raise InvalidConfiguration(
+            f"Invalid schema reader parse pool: {schema_reader_parse_pool}, valid values are {valid_pools}"
+        ) from None
+
     if config["rest_authorization"] and config["sasl_bootstrap_uri"] is None:
         raise InvalidConfiguration(
             "Using 'rest_authorization' requires configuration value for 'sasl_bootstrap_uri' to be set"
@@ -40,6 +40,10 @@ class InvalidReferences(Exception):
     pass
 
 
+class InvalidSnapshot(Exception):
+    pass
+
+
 class SchemasNotFoundException(Exception):
     pass
 
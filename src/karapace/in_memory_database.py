@@ -7,13 +7,16 @@ See LICENSE for details
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable, Sequence
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
 from dataclasses import dataclass, field
 from karapace.schema_models import SchemaVersion, TypedSchema, Versioner
 from karapace.schema_references import Reference, Referents
+from karapace.schema_type import SchemaType
 from karapace.typing import SchemaId, Subject, Version
 from threading import Lock, RLock
 
+import itertools
 import logging
 
 LOG = logging.getLogger(__name__)
@@ -26,6 +29,10 @@ class SubjectData:
 
 
 class KarapaceDatabase(ABC):
+    @abstractmethod
+    def bulk_load(self) -> AbstractContextManager[None]:
+        pass
+
     @abstractmethod
     def get_schema_id(self, new_schema: TypedSchema) -> SchemaId:
         pass
@@ -57,6 +64,10 @@ class KarapaceDatabase(ABC):
     ) -> None:
         pass
 
+    @abstractmethod
+    def insert_schema(self, *, schema_id: SchemaId, schema: TypedSchema) -> None:
+        pass
+
     @abstractmethod
     def insert_subject(self, *, subject: Subject) -> None:
         pass
@@ -155,6 +166,32 @@ class InMemoryDatabase(KarapaceDatabase):
         self._hash_to_schema: dict[str, TypedSchema] = {}
         self._hash_to_schema_id_on_subject: dict[Subject, dict[str, SchemaId]] = {}
 
+        # Global content index used for schema id assignment. It mirrors
+        # `self.schemas`, when the same content is stored under multiple ids
+        # the first inserted id is kept, which is the id the linear scan over
+        # `self.schemas` would have found.
+        self._hash_to_schema_id: dict[tuple[SchemaType, str], SchemaId] = {}
+
+        # Reverse index of the subject versions using a schema id, including
+        # the soft deleted ones. The lookups list the subjects in the order of
+        # `self.subjects`, using the rank of the subjects in that order.
+        self._schema_id_to_subject_versions: dict[SchemaId, dict[Subject, set[Version]]] = {}
+        self._subject_rank: dict[Subject, int] = {}
+        self._subject_ranks = itertools.count()
+
+        # Per record logs are lowered to debug level while bulk loading.
+        self._record_log_level = logging.INFO
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """Apply a batch of records with a single lock acquisition and without per record logs."""
+        with self.schema_lock_thread:
+            self._record_log_level = logging.DEBUG
+            try:
+                yield
+            finally:
+                self._record_log_level = logging.INFO
+
     def log_state(self) -> None:
         if LOG.isEnabledFor(logging.DEBUG):
             debug_str = "\nState\n\tSchemas:\n"
@@ -171,12 +208,41 @@ class InMemoryDatabase(KarapaceDatabase):
             debug_str += "--------------------------------------------------------------------------------------\n"
             LOG.debug(debug_str)
 
-    def _get_schema_id_from_storage(self, *, new_schema: TypedSchema) -> SchemaId | None:
+    @staticmethod
+    def _schema_content_key(schema: TypedSchema) -> tuple[SchemaType, str]:
+        return (schema.schema_type, schema.fingerprint())
+
+    def _scan_schema_id_from_storage(self, *, new_schema: TypedSchema) -> SchemaId | None:
         for schema_id, schema in self.schemas.items():
             if schema == new_schema:
                 return schema_id
         return None
 
+    def _get_schema_id_from_storage(self, *, new_schema: TypedSchema) -> SchemaId | None:
+        schema_id = self._hash_to_schema_id.get(self._schema_content_key(new_schema))
+        if schema_id is None:
+            return None
+        if self.schemas.get(schema_id) == new_schema:
+            return schema_id
+        # The fingerprint does not distinguish all the cases the equality does
+        # (e.g. missing vs. empty references), fall back to the full scan.
+        return self._scan_schema_id_from_storage(new_schema=new_schema)
+
+    def _set_schema_id_by_content(self, *, schema_id: SchemaId, schema: TypedSchema) -> None:
+        content_key = self._schema_content_key(schema)
+        previous_schema = self.schemas.get(schema_id)
+        if previous_schema is not None:
+            previous_key = self._schema_content_key(previous_schema)
+            if previous_key != content_key and self._hash_to_schema_id.get(previous_key) == schema_id:
+                # The id is overwritten with different content, the previous
+                # content may still be stored with another id.
+                del self._hash_to_schema_id[previous_key]
+                for other_schema_id, other_schema in self.schemas.items():
+                    if other_schema_id != schema_id and self._schema_content_key(other_schema) == previous_key:
+                        self._hash_to_schema_id[previous_key] = other_schema_id
+                        break
+        self._hash_to_schema_id.setdefault(content_key, schema_id)
+
     def get_schema_id(self, new_schema: TypedSchema) -> SchemaId:
         with self.id_lock_thread:
             maybe_schema_id = self._get_schema_id_from_storage(new_schema=new_schema)
@@ -214,6 +280,27 @@ class InMemoryDatabase(KarapaceDatabase):
     def _get_from_hash_cache(self, *, typed_schema: TypedSchema) -> TypedSchema:
         return self._hash_to_schema.setdefault(typed_schema.fingerprint(), typed_schema)
 
+    def _add_to_schema_id_subject_versions(self, *, schema_id: SchemaId, subject: Subject, version: Version) -> None:
+        subject_versions = self._schema_id_to_subject_versions.setdefault(schema_id, {})
+        subject_versions.setdefault(subject, set()).add(version)
+
+    def _remove_from_schema_id_subject_versions(self, *, schema_id: SchemaId, subject: Subject, version: Version) -> None:
+        subject_versions = self._schema_id_to_subject_versions.get(schema_id)
+        if subject_versions is None:
+            return
+        versions = subject_versions.get(subject)
+        if versions is None:
+            return
+        versions.discard(version)
+        if not versions:
+            del subject_versions[subject]
+            if not subject_versions:
+                del self._schema_id_to_subject_versions[schema_id]
+
+    def _subject_versions_for_schema_id(self, schema_id: SchemaId) -> list[tuple[Subject, set[Version]]]:
+        subject_versions = self._schema_id_to_subject_versions.get(schema_id, {})
+        return sorted(subject_versions.items(), key=lambda item: self._subject_rank[item[0]])
+
     def get_next_version(self, *, subject: Subject) -> Version:
         return Versioner.V(max(self.subjects[subject].schemas).value + 1)
 
@@ -234,13 +321,20 @@ class InMemoryDatabase(KarapaceDatabase):
             schema = self._get_from_hash_cache(typed_schema=schema)
 
             if self.find_subject(subject=subject) is None:
-                LOG.info("Adding first version of subject: %r with no schemas", subject)
+                LOG.log(self._record_log_level, "Adding first version of subject: %r with no schemas", subject)
                 self.insert_subject(subject=subject)
 
-            if version in self.subjects[subject].schemas:
-                LOG.info("Updating entry subject: %r version: %r id: %r", subject, version, schema_id)
+            previous_schema_version = self.subjects[subject].schemas.get(version)
+            if previous_schema_version is not None:
+                LOG.log(self._record_log_level, "Updating entry subject: %r version: %r id: %r", subject, version, schema_id)
+                self._remove_from_schema_id_subject_versions(
+                    schema_id=previous_schema_version.schema_id,
+                    subject=subject,
+                    version=version,
+                )
             else:
-                LOG.info("Adding entry subject: %r version: %r id: %r", subject, version, schema_id)
+                LOG.log(self._record_log_level, "Adding entry subject: %r version: %r id: %r", subject, version, schema_id)
+            self._set_schema_id_by_content(schema_id=schema_id, schema=schema)
             self.schemas[schema_id] = schema
             self.subjects[subject].schemas[version] = SchemaVersion(
                 subject=subject,
@@ -250,6 +344,7 @@ class InMemoryDatabase(KarapaceDatabase):
                 schema=schema,
                 references=references,
             )
+            self._add_to_schema_id_subject_versions(schema_id=schema_id, subject=subject, version=version)
 
             if not deleted:
                 self._set_schema_id_on_subject(
@@ -263,8 +358,19 @@ class InMemoryDatabase(KarapaceDatabase):
                     schema=schema,
                 )
 
+    def insert_schema(self, *, schema_id: SchemaId, schema: TypedSchema) -> None:
+        """Store a schema without a subject version, e.g. one whose versions are all hard deleted."""
+        with self.schema_lock_thread:
+            self.global_schema_id = max(self.global_schema_id, schema_id)
+            schema = self._get_from_hash_cache(typed_schema=schema)
+            self._set_schema_id_by_content(schema_id=schema_id, schema=schema)
+            self.schemas[schema_id] = schema
+
     def insert_subject(self, *, subject: Subject) -> None:
-        self.subjects.setdefault(subject, SubjectData())
+        with self.schema_lock_thread:
+            if subject not in self.subjects:
+                self.subjects[subject] = SubjectData()
+                self._subject_rank[subject] = next(self._subject_ranks)
 
     def get_subject_compatibility(self, *, subject: Subject) -> str | None:
         if subject in self.subjects:
@@ -301,22 +407,21 @@ class InMemoryDatabase(KarapaceDatabase):
     def subjects_for_schema(self, schema_id: SchemaId) -> list[Subject]:
         subjects = []
         with self.schema_lock_thread:
-            for subject, subject_data in self.subjects.items():
-                for version in subject_data.schemas.values():
-                    if version.deleted is False and version.schema_id == schema_id:
-                        subjects.append(subject)
-                        break
+            for subject, versions in self._subject_versions_for_schema_id(schema_id):
+                subject_schemas = self.subjects[subject].schemas
+                if any(subject_schemas[version].deleted is False for version in versions):
+                    subjects.append(subject)
 
         return subjects
 
     def find_schema_versions_by_schema_id(self, *, schema_id: SchemaId, include_deleted: bool) -> list[SchemaVersion]:
         schema_versions: list[SchemaVersion] = []
         with self.schema_lock_thread:
-            for subject in self.subjects:
-                # find_subject_schemas will also acquire the schema_lock_thread, RLock
-                found_schema_versions = self.find_subject_schemas(subject=subject, include_deleted=include_deleted)
-                for schema_version in found_schema_versions.values():
-                    if schema_version.schema_id == schema_id:
+            for subject, versions in self._subject_versions_for_schema_id(schema_id):
+                subject_schemas = self.subjects[subject].schemas
+                for version in sorted(versions):
+                    schema_version = subject_schemas[version]
+                    if include_deleted or schema_version.deleted is False:
                         schema_versions.append(schema_version)
         return schema_versions
 
@@ -352,12 +457,25 @@ class InMemoryDatabase(KarapaceDatabase):
 
     def delete_subject_hard(self, *, subject: Subject) -> None:
         with self.schema_lock_thread:
+            for schema_version in self.subjects[subject].schemas.values():
+                self._remove_from_schema_id_subject_versions(
+                    schema_id=schema_version.schema_id,
+                    subject=subject,
+                    version=schema_version.version,
+                )
             del self.subjects[subject]
+            del self._subject_rank[subject]
             self._delete_subject_from_schema_id_on_subject(subject=subject)
 
     def delete_subject_schema(self, *, subject: Subject, version: Version) -> None:
         with self.schema_lock_thread:
-            self.subjects[subject].schemas.pop(version, None)
+            schema_version = self.subjects[subject].schemas.pop(version, None)
+            if schema_version is not None:
+                self._remove_from_schema_id_subject_versions(
+                    schema_id=schema_version.schema_id,
+                    subject=subject,
+                    version=version,
+                )
 
     def num_schemas(self) -> int:
         return len(self.schemas)
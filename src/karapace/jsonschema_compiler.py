@@ -0,0 +1,392 @@
+"""
+karapace - JSON Schema compiler
+
+Compiles a Draft 7 JSON Schema into a function telling whether an instance is
+valid, instead of interpreting the schema and resolving its references for
+every instance as `jsonschema.Draft7Validator` does. The compiled function gives
+the same result as `Draft7Validator.is_valid`, the errors are still reported
+with the validator.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from fractions import Fraction
+from jsonschema import Draft7Validator
+from typing import Any, Callable
+from urllib.parse import unquote
+
+import numbers
+import re
+
+Check = Callable[[Any], bool]
+
+# Keywords of `Draft7Validator` without effect on the validation result
+_ANNOTATIONS = frozenset(
+    {
+        "$comment",
+        "$id",
+        "$schema",
+        "contentEncoding",
+        "contentMediaType",
+        "default",
+        "definitions",
+        "description",
+        "else",
+        "examples",
+        "format",
+        "readOnly",
+        "then",
+        "title",
+        "writeOnly",
+    }
+)
+
+
+class UnsupportedSchema(Exception):
+    pass
+
+
+def _is_integer(instance: Any) -> bool:
+    if isinstance(instance, bool):
+        return False
+    return isinstance(instance, int) or (isinstance(instance, float) and instance.is_integer())
+
+
+def _is_number(instance: Any) -> bool:
+    if isinstance(instance, (int, float)):
+        return not isinstance(instance, bool)
+    return isinstance(instance, numbers.Number)
+
+
+_TYPE_CHECKS: dict[str, Check] = {
+    "array": lambda instance: isinstance(instance, list),
+    "boolean": lambda instance: isinstance(instance, bool),
+    "integer": _is_integer,
+    "null": lambda instance: instance is None,
+    "number": _is_number,
+    "object": lambda instance: isinstance(instance, dict),
+    "string": lambda instance: isinstance(instance, str),
+}
+
+
+def _unbool(instance: Any) -> Any:
+    # Tells `True` and `False` apart from `1` and `0`, which compare equal in Python
+    if isinstance(instance, bool):
+        return (bool, instance)
+    return instance
+
+
+def _equal(one: Any, two: Any) -> bool:
+    """Equality of JSON values, as the `const`, `enum` and `uniqueItems` keywords of `jsonschema` compare them"""
+    if one is two:
+        return True
+    if isinstance(one, str) or isinstance(two, str):
+        return one == two
+    if isinstance(one, list) and isinstance(two, list):
+        return len(one) == len(two) and all(_equal(a, b) for a, b in zip(one, two))
+    if isinstance(one, dict) and isinstance(two, dict):
+        return len(one) == len(two) and all(key in two and _equal(value, two[key]) for key, value in one.items())
+    return _unbool(one) == _unbool(two)
+
+
+def _uniq(items: list[Any]) -> bool:
+    seen: list[Any] = []
+    for item in items:
+        if any(_equal(item, other) for other in seen):
+            return False
+        seen.append(item)
+    return True
+
+
+def _always_valid(_instance: Any) -> bool:
+    return True
+
+
+def _never_valid(_instance: Any) -> bool:
+    return False
+
+
+def _all_of(checks: list[Check]) -> Check:
+    if not checks:
+        return _always_valid
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(instance: Any) -> bool:
+        for keyword_check in checks:
+            if not keyword_check(instance):
+                return False
+        return True
+
+    return check
+
+
+def _has_properties(names: list[str]) -> Check:
+    def check(instance: Any) -> bool:
+        return all(name in instance for name in names)
+
+    return check
+
+
+def _is_multiple_of(instance: Any, divisor: Any) -> bool:
+    # Same arithmetic as the `multipleOf` keyword of `jsonschema`
+    if isinstance(divisor, float):
+        quotient = instance / divisor
+        try:
+            return int(quotient) == quotient
+        except OverflowError:
+            return (Fraction(instance) / Fraction(divisor)).denominator == 1
+    return not instance % divisor
+
+
+class _Compiler:
+    def __init__(self, root: Any) -> None:
+        self._root = root
+        self._compiled: dict[int, Check] = {}
+
+    def compile(self, schema: Any) -> Check:
+        if schema is True:
+            return _always_valid
+        if schema is False:
+            return _never_valid
+        if not isinstance(schema, Mapping):
+            raise UnsupportedSchema(f"Invalid schema {schema!r}")
+
+        compiled = self._compiled.get(id(schema))
+        if compiled is not None:
+            return compiled
+        if "$id" in schema and schema is not self._root:
+            raise UnsupportedSchema("Subschemas with $id are not supported")
+
+        # Recursive references call the compiled check through the cell
+        cell: list[Check] = []
+
+        def recursive_check(instance: Any) -> bool:
+            return cell[0](instance)
+
+        self._compiled[id(schema)] = recursive_check
+        if "$ref" in schema:
+            # The siblings of $ref are ignored in Draft 7
+            compiled = self.compile(self._resolve(schema["$ref"]))
+        else:
+            compiled = _all_of([self._keyword(keyword, value, schema) for keyword, value in schema.items()])
+        cell.append(compiled)
+        self._compiled[id(schema)] = compiled
+        return compiled
+
+    def _resolve(self, ref: str) -> Any:
+        if not ref.startswith("#"):
+            raise UnsupportedSchema(f"Reference {ref} is not local")
+        pointer = unquote(ref[1:])
+        if pointer and not pointer.startswith("/"):
+            raise UnsupportedSchema(f"Reference {ref} is not a JSON pointer")
+        target = self._root
+        for token in pointer.split("/")[1:]:
+            token = token.replace("~1", "/").replace("~0", "~")
+            try:
+                target = target[int(token)] if isinstance(target, list) else target[token]
+            except (IndexError, KeyError, TypeError, ValueError) as e:
+                raise UnsupportedSchema(f"Reference {ref} can not be resolved") from e
+        return target
+
+    def _keyword(self, keyword: str, value: Any, schema: Mapping[str, Any]) -> Check:
+        if keyword in _ANNOTATIONS or keyword not in Draft7Validator.VALIDATORS:
+            return _always_valid
+        method = getattr(self, f"_{keyword}", None)
+        if method is None:
+            raise UnsupportedSchema(f"Keyword {keyword} is not supported")
+        return method(value, schema)
+
+    def _type(self, types: Any, _schema: Mapping[str, Any]) -> Check:
+        if isinstance(types, str):
+            types = [types]
+        try:
+            type_checks = [_TYPE_CHECKS[type_] for type_ in types]
+        except KeyError as e:
+            raise UnsupportedSchema(f"Type {e} is not supported") from e
+        if len(type_checks) == 1:
+            return type_checks[0]
+        return lambda instance: any(type_check(instance) for type_check in type_checks)
+
+    def _enum(self, enums: list[Any], _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: any(_equal(each, instance) for each in enums)
+
+    def _const(self, const: Any, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: _equal(instance, const)
+
+    def _properties(self, properties: Mapping[str, Any], _schema: Mapping[str, Any]) -> Check:
+        property_checks = {name: self.compile(subschema) for name, subschema in properties.items()}
+
+        def check(instance: Any) -> bool:
+            if isinstance(instance, dict):
+                for name, value in instance.items():
+                    property_check = property_checks.get(name)
+                    if property_check is not None and not property_check(value):
+                        return False
+            return True
+
+        return check
+
+    def _patternProperties(self, pattern_properties: Mapping[str, Any], _schema: Mapping[str, Any]) -> Check:
+        pattern_checks = [
+            (re.compile(pattern), self.compile(subschema)) for pattern, subschema in pattern_properties.items()
+        ]
+
+        def check(instance: Any) -> bool:
+            if isinstance(instance, dict):
+                for pattern, pattern_check in pattern_checks:
+                    for name, value in instance.items():
+                        if pattern.search(name) and not pattern_check(value):
+                            return False
+            return True
+
+        return check
+
+    def _additionalProperties(self, additional: Any, schema: Mapping[str, Any]) -> Check:
+        if additional is True:
+            return _always_valid
+        properties = schema.get("properties", {})
+        patterns = "|".join(schema.get("patternProperties", {}))
+        pattern = re.compile(patterns) if patterns else None
+        additional_check = self.compile(additional)
+
+        def check(instance: Any) -> bool:
+            if isinstance(instance, dict):
+                for name, value in instance.items():
+                    if name in properties or (pattern is not None and pattern.search(name)):
+                        continue
+                    if not additional_check(value):
+                        return False
+            return True
+
+        return check
+
+    def _propertyNames(self, property_names: Any, _schema: Mapping[str, Any]) -> Check:
+        name_check = self.compile(property_names)
+        return lambda instance: not isinstance(instance, dict) or all(name_check(name) for name in instance)
+
+    def _required(self, required: list[str], _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not isinstance(instance, dict) or all(name in instance for name in required)
+
+    def _dependencies(self, dependencies: Mapping[str, Any], _schema: Mapping[str, Any]) -> Check:
+        dependency_checks: list[tuple[str, Check]] = []
+        for name, dependency in dependencies.items():
+            if isinstance(dependency, list):
+                dependency_checks.append((name, _has_properties(dependency)))
+            else:
+                dependency_checks.append((name, self.compile(dependency)))
+
+        def check(instance: Any) -> bool:
+            if isinstance(instance, dict):
+                for name, dependency_check in dependency_checks:
+                    if name in instance and not dependency_check(instance):
+                        return False
+            return True
+
+        return check
+
+    def _minProperties(self, minimum: int, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not isinstance(instance, dict) or len(instance) >= minimum
+
+    def _maxProperties(self, maximum: int, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not isinstance(instance, dict) or len(instance) <= maximum
+
+    def _items(self, items: Any, _schema: Mapping[str, Any]) -> Check:
+        if isinstance(items, list):
+            item_checks = [self.compile(subschema) for subschema in items]
+            return lambda instance: not isinstance(instance, list) or all(
+                item_check(item) for item_check, item in zip(item_checks, instance)
+            )
+
+        item_check = self.compile(items)
+        return lambda instance: not isinstance(instance, list) or all(item_check(item) for item in instance)
+
+    def _additionalItems(self, additional: Any, schema: Mapping[str, Any]) -> Check:
+        items = schema.get("items", {})
+        if isinstance(items, dict):
+            return _always_valid
+        if not isinstance(items, list):
+            raise UnsupportedSchema("additionalItems requires items to be an object or an array")
+        if additional is True:
+            return _always_valid
+        additional_check = self.compile(additional)
+        return lambda instance: not isinstance(instance, list) or all(
+            additional_check(item) for item in instance[len(items) :]
+        )
+
+    def _contains(self, contains: Any, _schema: Mapping[str, Any]) -> Check:
+        contains_check = self.compile(contains)
+        return lambda instance: not isinstance(instance, list) or any(contains_check(item) for item in instance)
+
+    def _minItems(self, minimum: int, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not isinstance(instance, list) or len(instance) >= minimum
+
+    def _maxItems(self, maximum: int, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not isinstance(instance, list) or len(instance) <= maximum
+
+    def _uniqueItems(self, unique: bool, _schema: Mapping[str, Any]) -> Check:
+        if not unique:
+            return _always_valid
+        return lambda instance: not isinstance(instance, list) or _uniq(instance)
+
+    def _minLength(self, minimum: int, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not isinstance(instance, str) or len(instance) >= minimum
+
+    def _maxLength(self, maximum: int, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not isinstance(instance, str) or len(instance) <= maximum
+
+    def _pattern(self, pattern: str, _schema: Mapping[str, Any]) -> Check:
+        compiled = re.compile(pattern)
+        return lambda instance: not isinstance(instance, str) or compiled.search(instance) is not None
+
+    def _minimum(self, minimum: Any, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not _is_number(instance) or not instance < minimum
+
+    def _maximum(self, maximum: Any, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not _is_number(instance) or not instance > maximum
+
+    def _exclusiveMinimum(self, minimum: Any, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not _is_number(instance) or not instance <= minimum
+
+    def _exclusiveMaximum(self, maximum: Any, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not _is_number(instance) or not instance >= maximum
+
+    def _multipleOf(self, divisor: Any, _schema: Mapping[str, Any]) -> Check:
+        return lambda instance: not _is_number(instance) or _is_multiple_of(instance, divisor)
+
+    def _allOf(self, subschemas: list[Any], _schema: Mapping[str, Any]) -> Check:
+        return _all_of([self.compile(subschema) for subschema in subschemas])
+
+    def _anyOf(self, subschemas: list[Any], _schema: Mapping[str, Any]) -> Check:
+        checks = [self.compile(subschema) for subschema in subschemas]
+        return lambda instance: any(check(instance) for check in checks)
+
+    def _oneOf(self, subschemas: list[Any], _schema: Mapping[str, Any]) -> Check:
+        checks = [self.compile(subschema) for subschema in subschemas]
+        return lambda instance: sum(1 for check in checks if check(instance)) == 1
+
+    def _not(self, subschema: Any, _schema: Mapping[str, Any]) -> Check:
+        not_check = self.compile(subschema)
+        return lambda instance: not not_check(instance)
+
+    def _if(self, if_schema: Any, schema: Mapping[str, Any]) -> Check:
+        if_check = self.compile(if_schema)
+        then_check = self.compile(schema["then"]) if "then" in schema else _always_valid
+        else_check = self.compile(schema["else"]) if "else" in schema else _always_valid
+        return lambda instance: then_check(instance) if if_check(instance) else else_check(instance)
+
+
+def compile_validator(validator: Draft7Validator) -> Check | None:
+    """Compile the schema of `validator`, or return None if the schema uses unsupported features.
+
+    Remote references, subschemas with their own `$id` and format checking are not supported.
+    """
+    if validator.format_checker is not None:
+        return None
+    try:
+        return _Compiler(validator.schema).compile(validator.schema)
+    except (UnsupportedSchema, re.error, RecursionError):
+        return None
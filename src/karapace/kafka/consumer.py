@@ -238,6 +238,11 @@ class AsyncKafkaConsumer:
         assert self.consumer is not None, self._START_ERROR
         return await self._run_in_executor(self.consumer.poll, timeout)
 
+    async def consume(self, num_messages: int = 1, timeout: float = -1) -> list[Message]:
+        """Consume up to `num_messages`, waiting at most `timeout` seconds for them, in a single executor call."""
+        assert self.consumer is not None, self._START_ERROR
+        return await self._run_in_executor(self.consumer.consume, num_messages, timeout)
+
     async def commit(
         self,
         message: Message | None = None,
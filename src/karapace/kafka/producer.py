@@ -23,6 +23,9 @@ LOG = logging.getLogger(__name__)
 
 
 def _on_delivery_callback(future: Future, error: KafkaError | None, msg: Message | None) -> None:
+    if future.done():
+        # The send was cancelled, setting the result would raise in the poll-thread
+        return
     if error is not None:
         LOG.info("Kafka producer delivery error: %s", error)
         future.set_exception(translate_from_kafkaerror(error))
@@ -78,6 +81,7 @@ class AsyncKafkaProducer:
         self,
         bootstrap_servers: Iterable[str] | str,
         loop: asyncio.AbstractEventLoop | None = None,
+        verify_connection: bool = True,
         **params: Unpack[KafkaClientParams],
     ) -> None:
         self.loop = loop or asyncio.get_running_loop()
@@ -87,12 +91,17 @@ class AsyncKafkaProducer:
 
         self.producer: KafkaProducer | None = None
         self._bootstrap_servers = bootstrap_servers
+        self._verify_connection = verify_connection
         self._producer_params = params
 
     def _start(self) -> None:
         assert not self.stopped.is_set(), "The async producer cannot be restarted"
 
-        self.producer = KafkaProducer(self._bootstrap_servers, **self._producer_params)
+        self.producer = KafkaProducer(
+            self._bootstrap_servers,
+            verify_connection=self._verify_connection,
+            **self._producer_params,
+        )
         self.poll_thread.start()
 
     async def start(self) -> None:
@@ -122,6 +131,16 @@ class AsyncKafkaProducer:
             # a `flush` call), otherwise it'll sleep for the given timeout (seconds).
             self.producer.poll(timeout=0.1)
 
+    async def flush(self, timeout: float) -> int:
+        """Waits up to `timeout` seconds for the buffered messages, returns the number of messages left."""
+        assert self.producer is not None, "The async producer must be started"
+
+        return await self.loop.run_in_executor(None, self.producer.flush, timeout)
+
+    def queue_depth(self) -> int:
+        """Number of messages and requests waiting to be delivered to the brokers."""
+        return 0 if self.producer is None else len(self.producer)
+
     async def send(self, topic: str, **params: Unpack[ProducerSendParams]) -> asyncio.Future[Message]:
         assert self.producer is not None, "The async producer must be started"
 
@@ -42,25 +42,31 @@ from karapace.serialization import (
     SchemaRegistrySerializer,
     SchemaRetrievalError,
 )
+from karapace.statsd import StatsClient
 from karapace.typing import NameStrategy, SchemaId, Subject, SubjectType
 from karapace.utils import convert_to_int, json_encode
-from typing import Callable, TypedDict
+from typing import Callable, Final, TypedDict
 
 import asyncio
 import base64
 import datetime
+import functools
 import logging
 import time
+import zlib
 
 SUBJECT_VALID_POSTFIX = [SubjectType.key, SubjectType.value]
 PUBLISH_KEYS = {"records", "value_schema", "value_schema_id", "key_schema", "key_schema_id"}
 RECORD_CODES = [42201, 42202]
 KNOWN_FORMATS = {"json", "avro", "protobuf", "binary"}
+SCHEMA_FORMATS = {"avro", "jsonschema", "protobuf"}
 OFFSET_RESET_STRATEGIES = {"latest", "earliest"}
 SCHEMA_MAPPINGS = {"avro": SchemaType.AVRO, "jsonschema": SchemaType.JSONSCHEMA, "protobuf": SchemaType.PROTOBUF}
 TypedConsumer = namedtuple("TypedConsumer", ["consumer", "serialization_format", "config"])
 IDLE_PROXY_TIMEOUT = 5 * 60
 AUTH_EXPIRY_TOLERANCE = datetime.timedelta(seconds=IDLE_PROXY_TIMEOUT)
+METRIC_CLUSTER_METADATA_REFRESH_TIME: Final = "karapace_rest_proxy_cluster_metadata_refresh_time"
+METRIC_PRODUCER_QUEUE_DEPTH: Final = "karapace_rest_proxy_producer_queue_depth"
 
 log = logging.getLogger(__name__)
 
@@ -310,10 +316,12 @@ class KafkaRest(KarapaceBase):
                             "SASL_SSL" if config["security_protocol"] in ("SSL", "SASL_SSL") else "SASL_PLAINTEXT"
                         )
                         config.update(auth_config)
-                        self.proxies[key] = UserRestProxy(config, self.kafka_timeout, self.serializer, auth_expiry)
+                        self.proxies[key] = UserRestProxy(
+                            config, self.kafka_timeout, self.serializer, auth_expiry, stats=self.stats
+                        )
                 else:
                     if self.proxies.get(key) is None:
-                        self.proxies[key] = UserRestProxy(self.config, self.kafka_timeout, self.serializer)
+                        self.proxies[key] = UserRestProxy(self.config, self.kafka_timeout, self.serializer, stats=self.stats)
             except (NoBrokersAvailable, AuthenticationFailedError):
                 log.warning("Failed to connect to Kafka with the credentials")
                 self.r(body={"message": "Forbidden"}, content_type=JSON_CONTENT_TYPE, status=HTTPStatus.FORBIDDEN)
@@ -453,16 +461,21 @@ class UserRestProxy:
         serializer: SchemaRegistrySerializer,
         auth_expiry: datetime.datetime | None = None,
         verify_connection: bool = True,
+        stats: StatsClient | None = None,
     ):
         self.config = config
         self.kafka_timeout = kafka_timeout
         self.serializer = serializer
+        self._owns_stats = stats is None
+        self.stats = StatsClient(config=config) if stats is None else stats
         self._cluster_metadata: _ClusterMetadata = self._empty_cluster_metadata_cache()
         self._cluster_metadata_complete = False
         # birth of all the metadata (when the request was requiring all the metadata available in the cluster)
         self._global_metadata_birth: float = 0.0  # set to this value will always require a refresh at the first call.
         self._cluster_metadata_topic_birth: dict[str, float] = {}
         self.metadata_max_age = self.config["admin_metadata_max_age"]
+        self.metadata_max_stale_age = self.config["admin_metadata_max_stale_age"]
+        self._metadata_refreshes: dict[frozenset[str] | None, asyncio.Future[_ClusterMetadata]] = {}
         self.admin_client = None
         self.admin_lock = asyncio.Lock()
         self.metadata_cache = None
@@ -473,7 +486,8 @@ class UserRestProxy:
         self._auth_expiry = auth_expiry
 
         self._async_producer_lock = asyncio.Lock()
-        self._async_producer: AsyncKafkaProducer | None = None
+        self._async_producers: list[AsyncKafkaProducer] = []
+        self._next_async_producer = 0
         self.naming_strategy = NameStrategy(self.config["name_strategy"])
 
     def __str__(self) -> str:
@@ -493,58 +507,72 @@ class UserRestProxy:
     def num_consumers(self) -> int:
         return len(self.consumer_manager.consumers)
 
-    async def _maybe_create_async_producer(self) -> AsyncKafkaProducer:
+    async def _maybe_create_async_producers(self) -> list[AsyncKafkaProducer]:
         """
         :raises NoBrokersAvailable:
         :raises AuthenticationFailedError:
         """
-        if self._async_producer is not None:
-            return self._async_producer
+        if self._async_producers:
+            return self._async_producers
+
+        async with self._async_producer_lock:
+            if not self._async_producers:
+                producers: list[AsyncKafkaProducer] = []
+                try:
+                    for _ in range(max(1, self.config["producer_count"])):
+                        producers.append(await self._create_async_producer())
+                except Exception:
+                    for producer in producers:
+                        await producer.stop()
+                    raise
+                self._async_producers = producers
+
+        return self._async_producers
 
+    async def _create_async_producer(self) -> AsyncKafkaProducer:
+        """
+        :raises NoBrokersAvailable:
+        :raises AuthenticationFailedError:
+        """
         if self.config["producer_acks"] == "all":
             acks = -1
         else:
             acks = int(self.config["producer_acks"])
 
-        async with self._async_producer_lock:
-            for retry in [True, True, False]:
-                if self._async_producer is not None:
-                    break
-
-                log.info("Creating async producer")
-
-                producer = AsyncKafkaProducer(
-                    acks=acks,
-                    bootstrap_servers=self.config["bootstrap_uri"],
-                    compression_type=self.config["producer_compression_type"],
-                    connections_max_idle_ms=self.config["connections_max_idle_ms"],
-                    linger_ms=self.config["producer_linger_ms"],
-                    message_max_bytes=self.config["producer_max_request_size"],
-                    metadata_max_age_ms=self.config["metadata_max_age_ms"],
-                    security_protocol=self.config["security_protocol"],
-                    ssl_cafile=self.config["ssl_cafile"],
-                    ssl_certfile=self.config["ssl_certfile"],
-                    ssl_keyfile=self.config["ssl_keyfile"],
-                    ssl_crlfile=self.config["ssl_crlfile"],
-                    **get_kafka_client_auth_parameters_from_config(self.config),
-                )
-                try:
-                    await producer.start()
-                except (NoBrokersAvailable, AuthenticationFailedError):
-                    await producer.stop()
-                    if retry:
-                        log.warning("Unable to connect to the bootstrap servers, retrying")
-                    else:
-                        log.warning("Giving up after trying to connect to the bootstrap servers")
-                        raise
-                    await asyncio.sleep(1)
-                except Exception:
-                    await producer.stop()
-                    raise
+        for retry in [True, True, False]:
+            log.info("Creating async producer")
+
+            producer = AsyncKafkaProducer(
+                acks=acks,
+                bootstrap_servers=self.config["bootstrap_uri"],
+                compression_type=self.config["producer_compression_type"],
+                connections_max_idle_ms=self.config["connections_max_idle_ms"],
+                linger_ms=self.config["producer_linger_ms"],
+                message_max_bytes=self.config["producer_max_request_size"],
+                metadata_max_age_ms=self.config["metadata_max_age_ms"],
+                security_protocol=self.config["security_protocol"],
+                ssl_cafile=self.config["ssl_cafile"],
+                ssl_certfile=self.config["ssl_certfile"],
+                ssl_keyfile=self.config["ssl_keyfile"],
+                ssl_crlfile=self.config["ssl_crlfile"],
+                **get_kafka_client_auth_parameters_from_config(self.config),
+            )
+            try:
+                await producer.start()
+            except (NoBrokersAvailable, AuthenticationFailedError):
+                await producer.stop()
+                if retry:
+                    log.warning("Unable to connect to the bootstrap servers, retrying")
                 else:
-                    self._async_producer = producer
-
-        return self._async_producer
+                    log.warning("Giving up after trying to connect to the bootstrap servers")
+                    raise
+                await asyncio.sleep(1)
+            except Exception:
+                await producer.stop()
+                raise
+            else:
+                return producer
+        raise AssertionError("unreachable, the last retry raises")
 
     async def create_consumer(self, group_name: str, content_type: str, *, request: HTTPRequest) -> None:
         await self.consumer_manager.create_consumer(group_name, request.json, content_type)
@@ -655,33 +683,34 @@ class UserRestProxy:
             and (time.monotonic() - oldest_requested_topic_update_timestamp) > self.metadata_max_age
         )
 
-    def _update_all_metadata(self) -> _ClusterMetadata:
-        if not self.is_global_metadata_old() and self._cluster_metadata_complete:
-            return self._cluster_metadata
+    def is_metadata_of_topics_expired(self, topics: list[str]) -> bool:
+        # Old metadata is served while it is refreshed in the background, until it is older than the max stale age
+        if not all(topic in self._cluster_metadata_topic_birth for topic in topics):
+            return True
 
-        metadata_birth = time.monotonic()
-        metadata = self.admin_client.cluster_metadata(None)
+        oldest_requested_topic_update_timestamp = min(self._cluster_metadata_topic_birth[topic] for topic in topics)
+        return (time.monotonic() - oldest_requested_topic_update_timestamp) > (
+            self.metadata_max_age + self.metadata_max_stale_age
+        )
+
+    def _store_all_metadata(self, metadata: _ClusterMetadata, metadata_birth: float) -> None:
         for topic in metadata["topics"]:
             self._cluster_metadata_topic_birth[topic] = metadata_birth
 
         self._global_metadata_birth = metadata_birth
         self._cluster_metadata = metadata
         self._cluster_metadata_complete = True
-        return metadata
 
     def _empty_cluster_metadata_cache(self) -> _ClusterMetadata:
         return {"topics": {}, "brokers": []}
 
-    def _update_metadata_for_topics(self, topics: list[str]) -> _ClusterMetadata:
-        if not self.is_metadata_of_topics_old(topics):
-            return {
-                **self._cluster_metadata,
-                "topics": {topic: self._cluster_metadata["topics"][topic] for topic in topics},
-            }
-
-        metadata_birth = time.monotonic()
-        metadata = self.admin_client.cluster_metadata(topics)
+    def _cached_metadata_for_topics(self, topics: list[str]) -> _ClusterMetadata:
+        return {
+            **self._cluster_metadata,
+            "topics": {topic: self._cluster_metadata["topics"][topic] for topic in topics},
+        }
 
+    def _store_metadata_for_topics(self, topics: list[str], metadata: _ClusterMetadata, metadata_birth: float) -> None:
         if self._cluster_metadata is None:
             self._cluster_metadata = self._empty_cluster_metadata_cache()
 
@@ -716,26 +745,59 @@ class UserRestProxy:
                 "Data not present on server side",
                 topics,
             )
+
+    async def _refresh_metadata(self, topics: list[str] | None) -> _ClusterMetadata:
+        metadata_birth = time.monotonic()
+        # The admin client blocks until the brokers reply, the event loop keeps serving the other requests meanwhile
+        with self.stats.timing_manager(
+            METRIC_CLUSTER_METADATA_REFRESH_TIME, tags={"topics": "all" if topics is None else "requested"}
+        ):
+            metadata = await asyncio.get_running_loop().run_in_executor(None, self.admin_client.cluster_metadata, topics)
+        if topics is None:
+            self._store_all_metadata(metadata, metadata_birth)
+        else:
+            self._store_metadata_for_topics(topics, metadata, metadata_birth)
         return metadata
 
+    def _metadata_refresh(self, topics: list[str] | None) -> asyncio.Future[_ClusterMetadata]:
+        """The refresh of the metadata of the topics, shared by all the requests for them until it completes."""
+        key = None if topics is None else frozenset(topics)
+        refresh = self._metadata_refreshes.get(key)
+        if refresh is None:
+            refresh = asyncio.ensure_future(self._refresh_metadata(topics))
+            self._metadata_refreshes[key] = refresh
+            refresh.add_done_callback(functools.partial(self._metadata_refresh_done, key))
+        return refresh
+
+    def _metadata_refresh_done(self, key: frozenset[str] | None, refresh: asyncio.Future[_ClusterMetadata]) -> None:
+        del self._metadata_refreshes[key]
+        # Retrieving the exception also keeps asyncio from logging it for the background refreshes
+        if not refresh.cancelled() and isinstance(refresh.exception(), KafkaException):
+            log.warning("Could not refresh cluster metadata", exc_info=refresh.exception())
+
     async def cluster_metadata(self, topics: list[str] | None = None) -> _ClusterMetadata:
-        async with self.admin_lock:
-            try:
-                if topics is None or len(topics) == 0:
-                    metadata = self._update_all_metadata()
-                else:
-                    metadata = self._update_metadata_for_topics(topics)
-            except KafkaException:
-                log.warning("Could not refresh cluster metadata")
-                KafkaRest.r(
-                    body={
-                        "message": "Kafka node not ready",
-                        "code": RESTErrorCodes.HTTP_INTERNAL_SERVER_ERROR.value,
-                    },
-                    content_type="application/json",
-                    status=HTTPStatus.INTERNAL_SERVER_ERROR,
-                )
-            return metadata
+        if topics is None or len(topics) == 0:
+            if not self.is_global_metadata_old() and self._cluster_metadata_complete:
+                return self._cluster_metadata
+            topics = None
+        elif not self.is_metadata_of_topics_old(topics):
+            return self._cached_metadata_for_topics(topics)
+        elif not self.is_metadata_of_topics_expired(topics):
+            self._metadata_refresh(topics)
+            return self._cached_metadata_for_topics(topics)
+
+        try:
+            # Shielded, a request cancelled while waiting does not cancel the refresh shared with the other requests
+            return await asyncio.shield(self._metadata_refresh(topics))
+        except KafkaException:
+            KafkaRest.r(
+                body={
+                    "message": "Kafka node not ready",
+                    "code": RESTErrorCodes.HTTP_INTERNAL_SERVER_ERROR.value,
+                },
+                content_type="application/json",
+                status=HTTPStatus.INTERNAL_SERVER_ERROR,
+            )
 
     def init_admin_client(self, verify_connection: bool = True) -> KafkaAdminClient:
         for retry in [True, True, False]:
@@ -762,13 +824,20 @@ class UserRestProxy:
 
     async def aclose(self) -> None:
         async with AsyncExitStack() as stack, self._async_producer_lock:
-            if self._async_producer is not None:
+            for producer in self._async_producers:
                 log.info("Disposing async producer")
-                stack.push_async_callback(self._async_producer.stop)
+                stack.push_async_callback(producer.stop)
+            self._async_producers = []
 
             if self.consumer_manager is not None:
                 stack.push_async_callback(self.consumer_manager.aclose)
 
+            if self._owns_stats:
+                stack.callback(self.stats.close)
+
+            for refresh in list(self._metadata_refreshes.values()):
+                refresh.cancel()
+
             self.admin_client = None
             self.consumer_manager = None
 
@@ -1024,14 +1093,68 @@ class UserRestProxy:
         key_schema_id: int | None,
         value_schema_id: int | None,
         default_partition: int | None = None,
+    ) -> list[tuple]:
+        records = data["records"]
+        executor = self.serializer.serialization_executor()
+        if (
+            executor is None
+            or ser_format not in SCHEMA_FORMATS
+            or len(records) < self.config["rest_serialization_batch_threshold"]
+        ):
+            prepared_records = []
+            for record in records:
+                key = record.get("key")
+                value = record.get("value")
+                if key is not None:
+                    key = await self.serialize(content_type, key, ser_format, key_schema_id)
+                value = await self.serialize(content_type, value, ser_format, value_schema_id)
+                prepared_records.append((key, value, record.get("partition", default_partition)))
+            return prepared_records
+
+        # Large batches are serialized in chunks in the executor, so the event loop keeps serving the other requests
+        key_schema = value_schema = None
+        if any(record.get("key") for record in records):
+            key_schema, _ = await self.serializer.get_schema_for_id(key_schema_id)
+        if any(record.get("value") for record in records):
+            value_schema, _ = await self.serializer.get_schema_for_id(value_schema_id)
+        chunksize = max(1, len(records) // (self.config["rest_serialization_workers"] * 4))
+        loop = asyncio.get_running_loop()
+        chunk_results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    self._serialize_records,
+                    records[start : start + chunksize],
+                    key_schema,
+                    value_schema,
+                    default_partition,
+                )
+                for start in range(0, len(records), chunksize)
+            ),
+            return_exceptions=True,
+        )
+        prepared_records = []
+        for chunk_result in chunk_results:
+            if isinstance(chunk_result, BaseException):
+                # Chunks stop at their first invalid record, this is the first invalid record of the batch
+                raise chunk_result
+            prepared_records.extend(chunk_result)
+        return prepared_records
+
+    def _serialize_records(
+        self,
+        records: list[dict],
+        key_schema: TypedSchema | None,
+        value_schema: TypedSchema | None,
+        default_partition: int | None,
     ) -> list[tuple]:
         prepared_records = []
-        for record in data["records"]:
+        for record in records:
             key = record.get("key")
             value = record.get("value")
             if key is not None:
-                key = await self.serialize(content_type, key, ser_format, key_schema_id)
-            value = await self.serialize(content_type, value, ser_format, value_schema_id)
+                key = self.serializer.serialize_sync(key_schema, key) if key else b""
+            value = self.serializer.serialize_sync(value_schema, value) if value else b""
             prepared_records.append((key, value, record.get("partition", default_partition)))
         return prepared_records
 
@@ -1096,7 +1219,7 @@ class UserRestProxy:
                     content_type=content_type,
                     status=HTTPStatus.BAD_REQUEST,
                 )
-        if ser_format in {"avro", "jsonschema", "protobuf"}:
+        if ser_format in SCHEMA_FORMATS:
             return await self.schema_serialize(obj, schema_id)
         raise FormatError(f"Unknown format: {ser_format}")
 
@@ -1143,7 +1266,7 @@ class UserRestProxy:
                     sub_code=RESTErrorCodes.HTTP_UNPROCESSABLE_ENTITY.value,
                 )
         # disallow missing id and schema for any key/value list that has at least one populated element
-        if formats["embedded_format"] in {"avro", "jsonschema", "protobuf"}:
+        if formats["embedded_format"] in SCHEMA_FORMATS:
             for subject_type, code in zip(SUBJECT_VALID_POSTFIX, RECORD_CODES):
                 if self.all_empty(data, subject_type):
                     continue
@@ -1163,15 +1286,30 @@ class UserRestProxy:
                         sub_code=RESTErrorCodes.INVALID_DATA.value,
                     )
 
+    def _async_producer_index(self, producer_count: int, topic: str, key: bytes | None, partition: int | None) -> int:
+        """Index of the producer sending a record.
+
+        A partition is always sent to by the same producer, keeping the order of its records. Without a partition
+        the keyed records are routed by key, as the partitioner maps a key to a single partition. The other records
+        can go to any partition and are spread over the producers.
+        """
+        if partition is not None:
+            return zlib.crc32(f"{topic}:{partition}".encode()) % producer_count
+        if key is not None:
+            return zlib.crc32(key, zlib.crc32(topic.encode())) % producer_count
+        self._next_async_producer = (self._next_async_producer + 1) % producer_count
+        return self._next_async_producer
+
     async def produce_messages(self, *, topic: str, prepared_records: list) -> list:
         """
         :raises NoBrokersAvailable:
         :raises AuthenticationFailedError:
         """
-        producer = await self._maybe_create_async_producer()
+        producers = await self._maybe_create_async_producers()
 
         produce_futures = []
         for key, value, partition in prepared_records:
+            producer = producers[self._async_producer_index(len(producers), topic, key, partition)]
             # Cancelling the returned future **will not** stop event from being sent, but cancelling
             # the ``send`` coroutine itself **will**.
             coroutine = producer.send(topic, key=key, value=value, partition=partition)
@@ -1183,7 +1321,10 @@ class UserRestProxy:
 
         # Gather the results of `asyncio.wait_for`
         send_results = []
-        for result in await asyncio.gather(*produce_futures, return_exceptions=True):
+        send_results_and_exceptions = await asyncio.gather(*produce_futures, return_exceptions=True)
+        for index, producer in enumerate(producers):
+            self.stats.gauge(METRIC_PRODUCER_QUEUE_DEPTH, producer.queue_depth(), tags={"producer": index})
+        for result in send_results_and_exceptions:
             if not isinstance(result, Exception):
                 send_results.append(result)
             else:
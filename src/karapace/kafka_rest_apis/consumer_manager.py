@@ -38,12 +38,25 @@ OFFSET_RESET_STRATEGIES = {"latest", "earliest"}
 
 TypedConsumer = namedtuple("TypedConsumer", ["consumer", "serialization_format", "config"])
 LOG = logging.getLogger(__name__)
+MAX_CONSUME_BATCH_SIZE = 1000
 
 
 def new_name() -> str:
     return str(uuid.uuid4())
 
 
+def consume_batch_size(bytes_left: int, message_count: int, read_bytes: int) -> int:
+    """Number of messages to consume next, estimated from the average size of the messages read so far.
+
+    Consumed messages are always part of the response, the estimate keeps the batches from going much past `max_bytes`.
+    """
+    if message_count == 0:
+        return 1
+    if read_bytes == 0:
+        return MAX_CONSUME_BATCH_SIZE
+    return min(MAX_CONSUME_BATCH_SIZE, max(1, bytes_left * message_count // read_bytes))
+
+
 class ConsumerManager:
     def __init__(self, config: Config, deserializer: SchemaRegistrySerializer) -> None:
         self.config = config
@@ -493,7 +506,7 @@ class ConsumerManager:
                 if val <= 0:
                     KarapaceBase.internal_error(message=f"Invalid request parameter {val}", content_type=content_type)
             LOG.info(
-                "Will poll multiple times for a single message with a total timeout of %dms, "
+                "Will consume batches of messages with a total timeout of %dms, "
                 "until at least %d bytes have been fetched",
                 timeout,
                 max_bytes,
@@ -508,23 +521,26 @@ class ConsumerManager:
                 time_left = start_time + timeout / 1000 - time.monotonic()
                 bytes_left = max_bytes - read_bytes
                 LOG.debug(
-                    "Polling with %r time left and %d bytes left, gathered %d messages so far",
+                    "Consuming with %r time left and %d bytes left, gathered %d messages so far",
                     time_left,
                     bytes_left,
                     message_count,
                 )
                 timeout_left = max(0, (start_time - time.monotonic()) * 1000 + timeout)
+                error = None
                 try:
-                    message = await consumer.poll(timeout=timeout_left / 1000)
-                    if message is None:
-                        continue
-                    if message.error() is not None:
-                        raise translate_from_kafkaerror(message.error())
+                    messages = await consumer.consume(
+                        num_messages=consume_batch_size(bytes_left, message_count, read_bytes),
+                        timeout=timeout_left / 1000,
+                    )
+                    error = next((message.error() for message in messages if message.error() is not None), None)
+                    if error is not None:
+                        raise translate_from_kafkaerror(error)
                 except (GroupAuthorizationFailedError, TopicAuthorizationFailedError):
                     KarapaceBase.r(body={"message": "Forbidden"}, content_type=content_type, status=HTTPStatus.FORBIDDEN)
                 except UnknownTopicOrPartitionError:
                     KarapaceBase.not_found(
-                        message=f"Unknown topic or partition: {message.error()}",
+                        message=f"Unknown topic or partition: {error}",
                         content_type=content_type,
                         sub_code=RESTErrorCodes.UNKNOWN_TOPIC_OR_PARTITION.value,
                     )
@@ -533,13 +549,14 @@ class ConsumerManager:
                         message=f"Failed to fetch: {ex}",
                         content_type=content_type,
                     )
-                LOG.debug("Successfully polled for messages")
-                message_count += 1
-                key_bytes = 0 if message.key() is None else len(message.key())
-                value_bytes = 0 if message.value() is None else len(message.value())
-                read_bytes += key_bytes + value_bytes
-                poll_data.append(message)
-                read_buffered = True
+                LOG.debug("Successfully consumed %d messages", len(messages))
+                for message in messages:
+                    message_count += 1
+                    key_bytes = 0 if message.key() is None else len(message.key())
+                    value_bytes = 0 if message.value() is None else len(message.value())
+                    read_bytes += key_bytes + value_bytes
+                    poll_data.append(message)
+                read_buffered = bool(messages)
             LOG.info(
                 "Gathered %d total messages (%d bytes read) in %r",
                 message_count,
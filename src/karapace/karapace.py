@@ -13,7 +13,7 @@ from functools import partial
 from http import HTTPStatus
 from karapace.config import Config
 from karapace.dataclasses import default_dataclass
-from karapace.rapu import HTTPRequest, HTTPResponse, RestApp
+from karapace.rapu import HTTPRequest, HTTPResponse, JSONArrayStream, RestApp
 from karapace.typing import JsonObject
 from karapace.utils import json_encode
 from karapace.version import __version__
@@ -47,7 +47,7 @@ class KarapaceBase(RestApp):
         self.log.info("Karapace initialized")
 
     @staticmethod
-    def r(body: dict | list, content_type: str, status: HTTPStatus = HTTPStatus.OK) -> NoReturn:
+    def r(body: dict | list | JSONArrayStream, content_type: str, status: HTTPStatus = HTTPStatus.OK) -> NoReturn:
         raise HTTPResponse(
             body=body,
             status=status,
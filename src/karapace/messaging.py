@@ -5,17 +5,18 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 from aiokafka.errors import MessageSizeTooLargeError
+from collections.abc import Sequence
 from karapace.config import Config
 from karapace.errors import SchemaTooLargeException
-from karapace.kafka.producer import KafkaProducer
+from karapace.kafka.producer import AsyncKafkaProducer
 from karapace.key_format import KeyFormatter
 from karapace.offset_watcher import OffsetWatcher
 from karapace.utils import json_encode
 from karapace.version import __version__
 from typing import Any, Final, Optional, Union
 
+import asyncio
 import logging
-import time
 
 LOG = logging.getLogger(__name__)
 X_REGISTRY_VERSION_HEADER = ("X-Registry-Version", f"karapace-{__version__}".encode())
@@ -23,7 +24,7 @@ X_REGISTRY_VERSION_HEADER = ("X-Registry-Version", f"karapace-{__version__}".enc
 
 class KarapaceProducer:
     def __init__(self, *, config: Config, offset_watcher: OffsetWatcher, key_formatter: KeyFormatter):
-        self._producer: Optional[KafkaProducer] = None
+        self._producer: Optional[AsyncKafkaProducer] = None
         self._config = config
         self._offset_watcher = offset_watcher
         self._key_formatter = key_formatter
@@ -31,12 +32,12 @@ class KarapaceProducer:
         self._schemas_topic = self._config["topic_name"]
         self._x_origin_host_header: Final = ("X-Origin-Host", self._config["host"].encode())
 
-    def initialize_karapace_producer(
+    async def initialize_karapace_producer(
         self,
     ) -> None:
         while True:
             try:
-                self._producer = KafkaProducer(
+                producer = AsyncKafkaProducer(
                     bootstrap_servers=self._config["bootstrap_uri"],
                     verify_connection=False,
                     security_protocol=self._config["security_protocol"],
@@ -50,17 +51,22 @@ class KarapaceProducer:
                     socket_timeout_ms=2000,  # missing topics will block unless we cache cluster metadata and pre-check
                     connections_max_idle_ms=self._config["connections_max_idle_ms"],  # helps through cluster upgrades ??
                 )
+                await producer.start()
+                self._producer = producer
                 return
             except:  # pylint: disable=bare-except
                 LOG.exception("Unable to create producer, retrying")
-                time.sleep(1)
+                await asyncio.sleep(1)
 
-    def close(self) -> None:
+    async def close(self) -> None:
         LOG.info("Closing karapace_producer")
         if self._producer is not None:
-            self._producer.flush()
+            # A send which timed out may still be buffered
+            await self._producer.flush(timeout=self._kafka_timeout)
+            await self._producer.stop()
 
-    def _send_kafka_message(self, key: Union[bytes, str], value: Union[bytes, str]) -> None:
+    async def _produce(self, key: Union[bytes, str], value: Union[bytes, str]) -> int:
+        """Produce a message and return its offset once delivered."""
         assert self._producer is not None
 
         if isinstance(key, str):
@@ -68,19 +74,22 @@ class KarapaceProducer:
         if isinstance(value, str):
             value = value.encode("utf8")
 
-        future = self._producer.send(
-            self._schemas_topic,
-            key=key,
-            value=value,
-            headers=[X_REGISTRY_VERSION_HEADER, self._x_origin_host_header],
-        )
-        self._producer.flush(timeout=self._kafka_timeout)
         try:
-            msg = future.result(self._kafka_timeout)
+            future = await self._producer.send(
+                self._schemas_topic,
+                key=key,
+                value=value,
+                headers=[X_REGISTRY_VERSION_HEADER, self._x_origin_host_header],
+            )
+            # On timeout the delivery is still pending in the producer, the shield keeps `wait_for` from
+            # cancelling it under the poll-thread
+            msg = await asyncio.wait_for(asyncio.shield(future), timeout=self._kafka_timeout)
         except MessageSizeTooLargeError as ex:
             raise SchemaTooLargeException from ex
+        return msg.offset()
 
-        sent_offset = msg.offset()
+    async def _send_kafka_message(self, key: Union[bytes, str], value: Union[bytes, str]) -> None:
+        sent_offset = await self._produce(key, value)
 
         LOG.info(
             "Waiting for schema reader to catch up. key: %r, value: %r, offset: %r",
@@ -89,7 +98,7 @@ class KarapaceProducer:
             sent_offset,
         )
 
-        if self._offset_watcher.wait_for_offset(sent_offset, timeout=60) is True:
+        if await self._offset_watcher.wait_for_offset_async(sent_offset, timeout=60) is True:
             LOG.info(
                 "Schema reader has found key. key: %r, value: %r, offset: %r",
                 key,
@@ -103,9 +112,54 @@ class KarapaceProducer:
                 )
             )
 
-    def send_message(self, *, key: dict[str, Any], value: Optional[dict[str, Any]]) -> None:
+    def _serialize(
+        self, key: dict[str, Any], value: Optional[dict[str, Any]]
+    ) -> tuple[Union[bytes, str], Union[bytes, str]]:
         key_bytes = self._key_formatter.format_key(key)
         value_bytes: Union[bytes, str] = b""
         if value is not None:
             value_bytes = json_encode(value, binary=True, compact=True)
-        self._send_kafka_message(key=key_bytes, value=value_bytes)
+        return key_bytes, value_bytes
+
+    async def send_message(self, *, key: dict[str, Any], value: Optional[dict[str, Any]]) -> None:
+        key_bytes, value_bytes = self._serialize(key, value)
+        await self._send_kafka_message(key=key_bytes, value=value_bytes)
+
+    async def send_messages(
+        self, messages: Sequence[tuple[dict[str, Any], Optional[dict[str, Any]]]]
+    ) -> list[Optional[Exception]]:
+        """Send a group of messages and wait for the schema reader once.
+
+        All the messages are produced before any delivery is awaited, so they are flushed to
+        Kafka together, and the schema reader is awaited only for the highest delivered offset.
+
+        Returns the error of each message in order, `None` for the messages which were delivered
+        and consumed by the schema reader.
+        """
+        serialized = [self._serialize(key, value) for key, value in messages]
+        results = await asyncio.gather(
+            *(self._produce(key_bytes, value_bytes) for key_bytes, value_bytes in serialized),
+            return_exceptions=True,
+        )
+        errors: list[Optional[Exception]] = []
+        delivered_offsets: list[int] = []
+        for result in results:
+            if isinstance(result, int):
+                delivered_offsets.append(result)
+                errors.append(None)
+            elif isinstance(result, Exception):
+                errors.append(result)
+            else:
+                raise result
+
+        if not delivered_offsets:
+            return errors
+
+        sent_offset = max(delivered_offsets)
+        LOG.info("Waiting for schema reader to catch up. messages: %d, offset: %r", len(delivered_offsets), sent_offset)
+        if await self._offset_watcher.wait_for_offset_async(sent_offset, timeout=60) is True:
+            LOG.info("Schema reader has found the messages. messages: %d, offset: %r", len(delivered_offsets), sent_offset)
+            return errors
+
+        timeout_error = RuntimeError(f"Schema reader timed out while looking for offset {sent_offset}")
+        return [timeout_error if error is None else error for error in errors]
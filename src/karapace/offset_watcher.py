@@ -6,12 +6,22 @@ See LICENSE for details
 """
 from threading import Condition
 
+import asyncio
+
+
+def _set_future_done(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
 
 class OffsetWatcher:
     """Synchronization container for threads to wait until an offset is seen.
 
     This works under the assumption offsets are used only once, which should be
     correct as long as no unclean leader election is performed.
+
+    Coroutines wait with `wait_for_offset_async`, which does not block the event
+    loop, the futures are resolved thread safely when the offset is seen.
     """
 
     def __init__(self) -> None:
@@ -19,6 +29,7 @@ class OffsetWatcher:
         # be performed with this condition acquired
         self._condition = Condition()
         self._greatest_offset = -1  # Would fail if initially this is 0 as it will be first offset ever.
+        self._async_waiters: list[tuple[int, asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
 
     def greatest_offset(self) -> int:
         return self._greatest_offset
@@ -28,6 +39,17 @@ class OffsetWatcher:
             self._greatest_offset = max(self._greatest_offset, new_offset)
             self._condition.notify_all()
 
+            if not self._async_waiters:
+                return
+            waiting = []
+            for waiter in self._async_waiters:
+                expected_offset, loop, future = waiter
+                if expected_offset <= self._greatest_offset:
+                    loop.call_soon_threadsafe(_set_future_done, future)
+                else:
+                    waiting.append(waiter)
+            self._async_waiters = waiting
+
     def wait_for_offset(self, expected_offset: int, timeout: float) -> bool:
         """Block until expected_offset is seen.
 
@@ -37,3 +59,28 @@ class OffsetWatcher:
         """
         with self._condition:
             return self._condition.wait_for(lambda: expected_offset <= self._greatest_offset, timeout=timeout)
+
+    async def wait_for_offset_async(self, expected_offset: int, timeout: float) -> bool:
+        """Wait until expected_offset is seen without blocking the event loop.
+
+        Args:
+            expected_offset: The message offset generated by the producer.
+            timeout: How long the caller will wait for the offset in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        waiter = (expected_offset, loop, future)
+        with self._condition:
+            if expected_offset <= self._greatest_offset:
+                return True
+            self._async_waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(future, timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._condition:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
@@ -40,6 +40,10 @@ class SchemaParseException(ProtobufException):
     """Error while parsing a Protobuf schema descriptor."""
 
 
+class UnsupportedDescriptorSchema(ProtobufException):
+    """The schema uses features which its descriptor can not carry, its message classes are generated with protoc."""
+
+
 def pretty_print_json(obj: str) -> str:
     return json.dumps(json.loads(obj), indent=2)
 
@@ -4,25 +4,56 @@ See LICENSE for details
 """
 from __future__ import annotations
 
-from collections.abc import Generator, Iterable
+from cachetools import LRUCache
+from collections.abc import Generator, Iterable, Sequence
+from dataclasses import dataclass
+from enum import Enum
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
+from google.protobuf.descriptor_pool import DescriptorPool
+from google.protobuf.message import Message
+from google.protobuf.message_factory import MessageFactory
 from io import BytesIO
 from karapace.config import Config
 from karapace.protobuf.encoding_variants import read_indexes, write_indexes
-from karapace.protobuf.exception import IllegalArgumentException, ProtobufSchemaResolutionException, ProtobufTypeException
+from karapace.protobuf.enum_element import EnumElement
+from karapace.protobuf.exception import (
+    IllegalArgumentException,
+    ProtobufSchemaResolutionException,
+    ProtobufTypeException,
+    UnsupportedDescriptorSchema,
+)
 from karapace.protobuf.message_element import MessageElement
 from karapace.protobuf.protobuf_to_dict import dict_to_protobuf, protobuf_to_dict
 from karapace.protobuf.schema import ProtobufSchema
+from karapace.protobuf.serialization import to_file_descriptor_proto
+from karapace.protobuf.service_element import ServiceElement
 from karapace.protobuf.type_element import TypeElement
 from multiprocessing import Process, Queue
+from multiprocessing.connection import Connection
+from multiprocessing.context import SpawnContext
+from multiprocessing.process import BaseProcess
 from pathlib import Path
+from threading import Lock
+from types import ModuleType
 from typing import Final, Protocol
 from typing_extensions import Self, TypeAlias
 
+import atexit
+import google.protobuf.descriptor_pool
 import hashlib
 import importlib
 import importlib.util
+import logging
+import multiprocessing
+import pickle
 import subprocess
 import sys
+import time
+
+LOG = logging.getLogger(__name__)
+
+SERDE_WORKER_TIMEOUT_SECONDS: Final = 10
+DYNAMIC_MESSAGES_CACHE_SIZE: Final = 1000
 
 
 def calculate_class_name(name: str) -> str:
@@ -92,18 +123,68 @@ class _ProtobufModel(Protocol):
         ...
 
 
+def _schema_fingerprint(deps_list: dict[str, dict[str, str]], schema: ProtobufSchema) -> str:
+    root_class_name = ""
+    for value in deps_list.values():
+        root_class_name = root_class_name + value["unique_class_name"]
+    root_class_name = root_class_name + str(schema)
+    return calculate_class_name(root_class_name)
+
+
+def _schema_symbols(schema: ProtobufSchema, file_name: str) -> dict[str, str]:
+    """Top-level symbols defined by the schema and its dependencies, mapped to the file defining them."""
+    symbols: dict[str, str] = {}
+    for dependency in (schema.dependencies or {}).values():
+        assert isinstance(dependency.schema.schema, ProtobufSchema)
+        dependency_file_name = calculate_class_name(f"{dependency.version}_{dependency.name}") + ".proto"
+        symbols.update(_schema_symbols(dependency.schema.schema, dependency_file_name))
+    package = schema.proto_file_element.package_name
+    prefix = f"{package}." if package else ""
+    elements: list[TypeElement | ServiceElement] = [*schema.proto_file_element.types, *schema.proto_file_element.services]
+    for element in elements:
+        symbols[prefix + element.name] = file_name
+        # Enum values are siblings of their enum type
+        if isinstance(element, EnumElement):
+            for constant in element.constants:
+                symbols[prefix + constant.name] = file_name
+    return symbols
+
+
+@dataclass(frozen=True)
+class ProtobufModuleSpec:
+    """Everything needed to compile and import the generated module of a schema, without the parsed schema."""
+
+    proto_name: str
+    proto_text: str
+    dependencies: dict[str, dict[str, str]]
+    symbols: dict[str, str]
+
+    @classmethod
+    def of(cls, schema: ProtobufSchema) -> ProtobufModuleSpec:
+        deps_list = crawl_dependencies(schema)
+        proto_name = _schema_fingerprint(deps_list, schema)
+        return cls(
+            proto_name=proto_name,
+            proto_text=replace_imports(str(schema), deps_list),
+            dependencies=deps_list,
+            symbols=_schema_symbols(schema, f"{proto_name}.proto"),
+        )
+
+
 def get_protobuf_class_instance(
     schema: ProtobufSchema,
     class_name: str,
     cfg: Config,
 ) -> _ProtobufModel:
-    directory = Path(cfg["protobuf_runtime_directory"])
-    deps_list = crawl_dependencies(schema)
-    root_class_name = ""
-    for value in deps_list.values():
-        root_class_name = root_class_name + value["unique_class_name"]
-    root_class_name = root_class_name + str(schema)
-    proto_name = calculate_class_name(root_class_name)
+    module = load_protobuf_module(ProtobufModuleSpec.of(schema), Path(cfg["protobuf_runtime_directory"]))
+    class_to_call = getattr(module, class_name)
+
+    return class_to_call()
+
+
+def load_protobuf_module(spec: ProtobufModuleSpec, directory: Path) -> ModuleType:
+    proto_name = spec.proto_name
+    deps_list = spec.dependencies
 
     main_proto_filename = f"{proto_name}.proto"
     work_dir = directory / Path(proto_name)
@@ -112,7 +193,7 @@ def get_protobuf_class_instance(
 
     if not class_path.exists():
         with open(f"{directory}/{proto_name}/{proto_name}.proto", mode="w", encoding="utf8") as proto_text:
-            proto_text.write(replace_imports(str(schema), deps_list))
+            proto_text.write(spec.proto_text)
 
         protoc_arguments = [
             "protoc",
@@ -138,16 +219,332 @@ def get_protobuf_class_instance(
         # todo: This will leave residues on sys.path in case of exceptions. If really must
         # mutate sys.path, we should at least wrap in try-finally.
         sys.path.append(runtime_proto_path)
-    spec = importlib.util.spec_from_file_location(f"{proto_name}_pb2", class_path)
+    module_spec = importlib.util.spec_from_file_location(f"{proto_name}_pb2", class_path)
     # This is reasonable to assert because we just created this file.
-    assert spec is not None
-    tmp_module = importlib.util.module_from_spec(spec)
-    assert spec.loader is not None
-    spec.loader.exec_module(tmp_module)
+    assert module_spec is not None
+    tmp_module = importlib.util.module_from_spec(module_spec)
+    assert module_spec.loader is not None
+    module_spec.loader.exec_module(tmp_module)
     sys.path.pop()
-    class_to_call = getattr(tmp_module, class_name)
 
-    return class_to_call()
+    return tmp_module
+
+
+@dataclass(frozen=True)
+class DynamicMessages:
+    """Message classes of a schema, built in a descriptor pool of their own.
+
+    Every schema has its own pool, so the symbols of different schemas do not clash
+    and the classes can be used in the calling process.
+    """
+
+    factory: MessageFactory
+    package: str
+
+    def message_class(self, message_name: str) -> type[Message]:
+        full_name = f"{self.package}.{message_name}" if self.package else message_name
+        return self.factory.GetPrototype(self.factory.pool.FindMessageTypeByName(full_name))
+
+
+def _dependency_file_descriptors(schema: ProtobufSchema, files: dict[str, FileDescriptorProto]) -> None:
+    for name, dependency in (schema.dependencies or {}).items():
+        assert isinstance(dependency.schema.schema, ProtobufSchema)
+        dependency_schema = dependency.schema.schema
+        _dependency_file_descriptors(dependency_schema, files)
+        file_descriptor = to_file_descriptor_proto(dependency_schema.proto_file_element, name)
+        if files.setdefault(name, file_descriptor) != file_descriptor:
+            raise UnsupportedDescriptorSchema(f"Conflicting definitions of {name}")
+
+
+def _known_file_descriptor(name: str) -> FileDescriptorProto:
+    # Well-known types, e.g. `google/protobuf/timestamp.proto`, are in the default pool once their module is imported
+    default_pool = google.protobuf.descriptor_pool.Default()
+    try:
+        file = default_pool.FindFileByName(name)
+    except KeyError:
+        try:
+            importlib.import_module(name.removesuffix(".proto").replace("/", ".") + "_pb2")
+            file = default_pool.FindFileByName(name)
+        except (ImportError, KeyError) as e:
+            raise UnsupportedDescriptorSchema(f"Unknown dependency {name}") from e
+    file_descriptor = FileDescriptorProto()
+    file.CopyToProto(file_descriptor)
+    return file_descriptor
+
+
+def _add_file_descriptor(pool: DescriptorPool, name: str, files: dict[str, FileDescriptorProto], added: set[str]) -> None:
+    if name in added:
+        return
+    file_descriptor = files[name] if name in files else _known_file_descriptor(name)
+    for dependency in file_descriptor.dependency:
+        _add_file_descriptor(pool, dependency, files, added)
+    pool.Add(file_descriptor)
+    added.add(name)
+
+
+def build_dynamic_messages(schema: ProtobufSchema) -> DynamicMessages:
+    """Build the message classes of the schema from its descriptors, without protoc and files on disk.
+
+    Raises `UnsupportedDescriptorSchema`, or the `KeyError` and `TypeError` of the descriptor
+    pool, if the schema uses features which are not supported.
+    """
+    files: dict[str, FileDescriptorProto] = {}
+    _dependency_file_descriptors(schema, files)
+    file_descriptor = to_file_descriptor_proto(schema.proto_file_element, f"{calculate_class_name(str(schema))}.proto")
+    files[file_descriptor.name] = file_descriptor
+    pool = DescriptorPool()
+    _add_file_descriptor(pool, file_descriptor.name, files, set())
+    # The pure Python descriptor pool resolves the added files lazily, resolving now reports the errors here
+    pool.FindFileByName(file_descriptor.name)
+    return DynamicMessages(factory=MessageFactory(pool), package=file_descriptor.package)
+
+
+_dynamic_messages_lock = Lock()
+_dynamic_messages: LRUCache[str, DynamicMessages | None] = LRUCache(maxsize=DYNAMIC_MESSAGES_CACHE_SIZE)
+
+
+def get_dynamic_messages(schema: ProtobufSchema) -> DynamicMessages | None:
+    """Message classes of the schema cached by the schema fingerprint, None if the schema needs protoc."""
+    fingerprint = _schema_fingerprint(crawl_dependencies(schema), schema)
+    with _dynamic_messages_lock:
+        if fingerprint in _dynamic_messages:
+            return _dynamic_messages[fingerprint]
+
+    dynamic_messages: DynamicMessages | None
+    try:
+        dynamic_messages = build_dynamic_messages(schema)
+    except (UnsupportedDescriptorSchema, KeyError, TypeError):
+        LOG.debug("Message classes of schema %s can not be built from descriptors, using protoc", fingerprint, exc_info=True)
+        dynamic_messages = None
+    with _dynamic_messages_lock:
+        _dynamic_messages[fingerprint] = dynamic_messages
+    return dynamic_messages
+
+
+class _SerdeOperation(Enum):
+    read = "read"
+    write = "write"
+
+
+@dataclass(frozen=True)
+class _SymbolConflict:
+    message: str
+
+
+def _picklable(exception: BaseException) -> BaseException:
+    try:
+        pickle.dumps(exception)
+    except Exception:  # pylint: disable=broad-except
+        return RuntimeError(repr(exception))
+    return exception
+
+
+def _serde_worker(connection: Connection, runtime_directory: str) -> None:
+    """Serve the serde requests of the parent process until the connection is closed.
+
+    The generated modules stay imported, so later records of the same schema skip the import.
+    """
+    directory = Path(runtime_directory)
+    modules: dict[str, ModuleType] = {}
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+
+        operation, spec, records = request
+        module = modules.get(spec.proto_name)
+        if module is None:
+            try:
+                module = load_protobuf_module(spec, directory)
+            except TypeError as e:
+                # Importing the generated module adds its file to the default descriptor pool,
+                # which fails if another schema imported by this process defines the same symbols.
+                connection.send(_SymbolConflict(str(e)))
+                continue
+            except Exception as e:  # pylint: disable=broad-except
+                connection.send(_picklable(e))
+                continue
+            modules[spec.proto_name] = module
+
+        results: list[object] = []
+        for message_name, payload in records:
+            try:
+                class_instance = getattr(module, message_name)()
+                if operation is _SerdeOperation.read:
+                    class_instance.ParseFromString(payload)
+                    results.append(protobuf_to_dict(class_instance, True))
+                else:
+                    dict_to_protobuf(class_instance, payload)
+                    results.append(class_instance.SerializeToString())
+            except Exception as e:  # pylint: disable=broad-except
+                results.append(_picklable(e))
+        connection.send(results)
+
+
+class _SerdeWorker:
+    def __init__(self, context: SpawnContext, runtime_directory: str) -> None:
+        self.lock = Lock()
+        self._context = context
+        self._runtime_directory = runtime_directory
+        self._process: BaseProcess | None = None
+        self._connection: Connection | None = None
+        # Schemas and symbols imported by the worker process, guarded by the lock of the pool
+        self.proto_names: set[str] = set()
+        self.symbols: dict[str, str] = {}
+        self.last_used = 0.0
+        self.restart_pending = False
+        self.tasks = 0
+        self.start()
+
+    def start(self) -> None:
+        connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_serde_worker,
+            args=(child_connection, self._runtime_directory),
+            name="protobuf-serde",
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        self._process = process
+        self._connection = connection
+        self.tasks = 0
+
+    def stop(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.send(None)
+            except OSError:
+                pass
+            self._connection.close()
+            self._connection = None
+        if self._process is not None:
+            self._process.join(timeout=1)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+            self._process = None
+
+    def call(self, request: tuple[_SerdeOperation, ProtobufModuleSpec, list[tuple[str, object]]]) -> object:
+        assert self._connection is not None, "Worker must be started"
+        self.tasks += 1
+        self._connection.send(request)
+        if not self._connection.poll(SERDE_WORKER_TIMEOUT_SECONDS):
+            raise TimeoutError(f"Protobuf serde worker did not respond in {SERDE_WORKER_TIMEOUT_SECONDS} seconds")
+        return self._connection.recv()
+
+
+class ProtobufSerdePool:
+    """Long-lived worker processes serializing and deserializing Protobuf records.
+
+    Protobuf enum values use C++ scoping rules, meaning that enum values are siblings of their
+    type, not children of it, and every symbol can be defined only once in a process. A schema
+    is therefore sent to a worker which already imported it or which did not import other
+    definitions of its symbols. If every worker has conflicting definitions, the least recently
+    used worker is restarted. Workers are also restarted after `max_tasks` calls.
+    """
+
+    def __init__(self, *, workers: int, max_tasks: int, runtime_directory: str) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._lock = Lock()
+        self._max_tasks = max_tasks
+        self._workers = [_SerdeWorker(context, runtime_directory) for _ in range(workers)]
+
+    def close(self) -> None:
+        for worker in self._workers:
+            with worker.lock:
+                worker.stop()
+
+    def read(self, spec: ProtobufModuleSpec, records: Sequence[tuple[str, bytes]]) -> list[dict | BaseException]:
+        """Deserialize the `(message name, payload)` records, a failed record has the exception as its result."""
+        return self._call(_SerdeOperation.read, spec, list(records))  # type: ignore[return-value]
+
+    def write(
+        self, spec: ProtobufModuleSpec, records: Sequence[tuple[str, dict[object, object]]]
+    ) -> list[bytes | BaseException]:
+        """Serialize the `(message name, datum)` records, a failed record has the exception as its result."""
+        return self._call(_SerdeOperation.write, spec, list(records))  # type: ignore[return-value]
+
+    def _place(self, spec: ProtobufModuleSpec) -> _SerdeWorker:
+        with self._lock:
+            loaded = [worker for worker in self._workers if spec.proto_name in worker.proto_names]
+            if loaded:
+                worker = loaded[0]
+            else:
+                compatible = [
+                    worker
+                    for worker in self._workers
+                    if all(worker.symbols.get(symbol, file_name) == file_name for symbol, file_name in spec.symbols.items())
+                ]
+                if compatible:
+                    worker = min(compatible, key=lambda worker: len(worker.proto_names))
+                else:
+                    worker = min(self._workers, key=lambda worker: worker.last_used)
+                    self._forget(worker)
+                    worker.restart_pending = True
+                worker.proto_names.add(spec.proto_name)
+                worker.symbols.update(spec.symbols)
+            worker.last_used = time.monotonic()
+            return worker
+
+    def _forget(self, worker: _SerdeWorker, spec: ProtobufModuleSpec | None = None) -> None:
+        worker.proto_names = {spec.proto_name} if spec is not None else set()
+        worker.symbols = dict(spec.symbols) if spec is not None else {}
+
+    def _restart(self, worker: _SerdeWorker, spec: ProtobufModuleSpec) -> None:
+        worker.stop()
+        worker.start()
+        with self._lock:
+            worker.restart_pending = False
+            self._forget(worker, spec)
+
+    def _call(self, operation: _SerdeOperation, spec: ProtobufModuleSpec, records: list[tuple[str, object]]) -> list[object]:
+        worker = self._place(spec)
+        with worker.lock:
+            for attempt in range(2):
+                if worker.restart_pending or (self._max_tasks > 0 and worker.tasks >= self._max_tasks):
+                    self._restart(worker, spec)
+                try:
+                    response = worker.call((operation, spec, records))
+                except (EOFError, OSError, TimeoutError):
+                    self._restart(worker, spec)
+                    raise
+                if isinstance(response, _SymbolConflict):
+                    # Imported by another caller placed on this worker, a fresh process has no conflicts
+                    LOG.info("Restarting Protobuf serde worker: %s", response.message)
+                    with self._lock:
+                        worker.restart_pending = True
+                    if attempt == 0:
+                        continue
+                    response = ProtobufTypeException(response.message)
+                if isinstance(response, BaseException):
+                    return [response] * len(records)
+                assert isinstance(response, list)
+                return response
+        raise AssertionError("Unreachable")
+
+
+_serde_pool_lock = Lock()
+_serde_pool: ProtobufSerdePool | None = None
+
+
+def get_serde_pool(config: Config) -> ProtobufSerdePool | None:
+    """The serde worker pool of this process, None if disabled by `protobuf_serde_workers`."""
+    global _serde_pool  # pylint: disable=global-statement
+    if config["protobuf_serde_workers"] <= 0:
+        return None
+    with _serde_pool_lock:
+        if _serde_pool is None:
+            _serde_pool = ProtobufSerdePool(
+                workers=config["protobuf_serde_workers"],
+                max_tasks=config["protobuf_serde_worker_max_tasks"],
+                runtime_directory=config["protobuf_runtime_directory"],
+            )
+            atexit.register(_serde_pool.close)
+        return _serde_pool
 
 
 def read_data(
@@ -236,9 +633,40 @@ class ProtobufDatumReader:
         self._reader_schema = reader_schema
 
     def read(self, bio: BytesIO) -> dict:
+        return self.read_batch([bio])[0]
+
+    def read_batch(self, bios: Sequence[BytesIO]) -> list[dict]:
         if self._reader_schema is None:
             self._reader_schema = self._writer_schema
-        return read_in_forked_multiprocess_process(self.config, self._writer_schema, self._reader_schema, bio)
+        dynamic_messages = get_dynamic_messages(self._writer_schema)
+        if dynamic_messages is not None:
+            if not match_schemas(self._writer_schema, self._reader_schema):
+                fail_msg = "Schemas do not match."
+                raise ProtobufSchemaResolutionException(fail_msg, self._writer_schema, self._reader_schema)
+            results: list[dict] = []
+            for bio in bios:
+                message_class = dynamic_messages.message_class(find_message_name(self._writer_schema, read_indexes(bio)))
+                class_instance = message_class()
+                class_instance.ParseFromString(bio.read())
+                results.append(protobuf_to_dict(class_instance, True))
+            return results
+
+        serde_pool = get_serde_pool(self.config)
+        if serde_pool is None:
+            return [
+                read_in_forked_multiprocess_process(self.config, self._writer_schema, self._reader_schema, bio)
+                for bio in bios
+            ]
+
+        if not match_schemas(self._writer_schema, self._reader_schema):
+            fail_msg = "Schemas do not match."
+            raise ProtobufSchemaResolutionException(fail_msg, self._writer_schema, self._reader_schema)
+        records = [(find_message_name(self._writer_schema, read_indexes(bio)), bio.read()) for bio in bios]
+        serde_results = serde_pool.read(ProtobufModuleSpec.of(self._writer_schema), records)
+        for result in serde_results:
+            if isinstance(result, BaseException):
+                raise result
+        return serde_results  # type: ignore[return-value]
 
 
 _WriterQueue: TypeAlias = "Queue[bytes | str | BaseException]"
@@ -321,4 +749,35 @@ class ProtobufDatumWriter:
         write_indexes(writer, [self._message_index])
 
     def write(self, datum: dict[object, object], writer: BytesIO) -> None:
-        writer.write(write_in_forked_multiprocess_process(self.config, self._writer_schema, self._message_name, datum))
+        writer.write(self.write_batch([datum])[0])
+
+    def write_batch(self, data: Sequence[dict[object, object]]) -> list[bytes]:
+        dynamic_messages = get_dynamic_messages(self._writer_schema)
+        if dynamic_messages is not None:
+            message_class = dynamic_messages.message_class(self._message_name)
+            encoded: list[bytes] = []
+            for datum in data:
+                try:
+                    class_instance = message_class()
+                    dict_to_protobuf(class_instance, datum)
+                    encoded.append(class_instance.SerializeToString())
+                except Exception as e:
+                    raise ProtobufTypeException(self._writer_schema, datum) from e
+            return encoded
+
+        serde_pool = get_serde_pool(self.config)
+        if serde_pool is None:
+            return [
+                write_in_forked_multiprocess_process(self.config, self._writer_schema, self._message_name, datum)
+                for datum in data
+            ]
+
+        results = serde_pool.write(
+            ProtobufModuleSpec.of(self._writer_schema), [(self._message_name, datum) for datum in data]
+        )
+        encoded = []
+        for datum, result in zip(data, results):
+            if isinstance(result, BaseException):
+                raise ProtobufTypeException(self._writer_schema, datum) from result
+            encoded.append(result)
+        return encoded
@@ -8,6 +8,7 @@ from collections.abc import Sequence
 from karapace.errors import InvalidSchema
 from karapace.protobuf.enum_constant_element import EnumConstantElement
 from karapace.protobuf.enum_element import EnumElement
+from karapace.protobuf.exception import UnsupportedDescriptorSchema
 from karapace.protobuf.field import Field
 from karapace.protobuf.field_element import FieldElement
 from karapace.protobuf.kotlin_wrapper import KotlinRange
@@ -328,7 +329,7 @@ def _serialize_options(options: Sequence[OptionElement], result: google.protobuf
             result.ruby_package = opt.value
 
 
-def serialize(schema: ProtoFileElement) -> str:
+def _serialize_file(schema: ProtoFileElement) -> google.protobuf.descriptor_pb2.FileDescriptorProto:
     fd = google.protobuf.descriptor_pb2.FileDescriptorProto()
     if schema.syntax is not None:
         fd.syntax = schema.syntax.value
@@ -348,4 +349,74 @@ def serialize(schema: ProtoFileElement) -> str:
             fd.message_type.append(_serialize_msgtype(t))
         elif isinstance(t, EnumElement):
             fd.enum_type.append(_serialize_enumtype(t))
-    return base64.b64encode(fd.SerializeToString()).decode("utf-8")
+    return fd
+
+
+def serialize(schema: ProtoFileElement) -> str:
+    return base64.b64encode(_serialize_file(schema).SerializeToString()).decode("utf-8")
+
+
+def _check_descriptor_support(fields: Sequence[FieldElement], groups: Sequence[Any]) -> None:
+    if groups:
+        raise UnsupportedDescriptorSchema("Groups are not supported")
+    for field in fields:
+        if field.options or field.default_value is not None:
+            raise UnsupportedDescriptorSchema(f"Options of field {field.name} are not supported")
+
+
+def _check_msgtype_support(t: MessageElement) -> None:
+    _check_descriptor_support(t.fields, t.groups)
+    for oneof in t.one_ofs:
+        _check_descriptor_support(oneof.fields, oneof.groups)
+    for nt in t.nested_types:
+        if isinstance(nt, MessageElement):
+            _check_msgtype_support(nt)
+
+
+def _map_entry_name(field_name: str) -> str:
+    # Same as protoc, e.g. `my_field` has the entry type `MyFieldEntry`
+    return "".join(part[:1].upper() + part[1:] for part in field_name.split("_")) + "Entry"
+
+
+def _prepare_msgtype(d: google.protobuf.descriptor_pb2.DescriptorProto, proto3: bool) -> None:
+    for nested in d.nested_type:
+        _prepare_msgtype(nested, proto3)
+    for field in d.field:
+        if field.type_name.startswith("map<") and field.type_name.endswith(">"):
+            key_type, value_type = (element_type.strip() for element_type in field.type_name[4:-1].split(",", 1))
+            entry = d.nested_type.add()
+            entry.name = _map_entry_name(field.name)
+            entry.options.map_entry = True
+            for tag, (entry_field_name, element_type) in enumerate((("key", key_type), ("value", value_type)), start=1):
+                entry_field = FieldElement(DEFAULT_LOCATION, element_type=element_type, name=entry_field_name, tag=tag)
+                entry.field.append(_serialize_field(entry_field))
+            field.label = google.protobuf.descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED
+            field.type_name = entry.name
+        if field.proto3_optional:
+            if proto3:
+                # Optional fields of proto3 are members of a synthetic oneof, after the declared ones
+                field.oneof_index = len(d.oneof_decl)
+                d.oneof_decl.add().name = f"_{field.name}"
+            else:
+                field.ClearField("proto3_optional")
+
+
+def to_file_descriptor_proto(schema: ProtoFileElement, name: str) -> google.protobuf.descriptor_pb2.FileDescriptorProto:
+    """Descriptor of the schema for building message classes in a descriptor pool.
+
+    Unlike `serialize`, maps get their entry types and the optional fields of proto3 their
+    synthetic oneofs. Raises `UnsupportedDescriptorSchema` if the schema uses features the
+    descriptor would not carry, like field options, groups and extensions.
+    """
+    if schema.extend_declarations:
+        raise UnsupportedDescriptorSchema("Extensions are not supported")
+    for t in schema.types:
+        if isinstance(t, MessageElement):
+            _check_msgtype_support(t)
+
+    fd = _serialize_file(schema)
+    fd.name = name
+    proto3 = schema.syntax == Syntax.PROTO_3
+    for message_type in fd.message_type:
+        _prepare_msgtype(message_type, proto3)
+    return fd
@@ -7,12 +7,13 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 from accept_types import get_best_match
+from collections.abc import Iterable, Iterator
 from http import HTTPStatus
 from karapace.config import Config, create_server_ssl_context
 from karapace.statsd import StatsClient
 from karapace.utils import json_decode, json_encode
 from karapace.version import __version__
-from typing import Callable, NoReturn, Optional, overload, Union
+from typing import Any, Callable, NoReturn, Optional, overload, Union
 
 import aiohttp
 import aiohttp.web
@@ -39,6 +40,8 @@ SCHEMA_ACCEPT_VALUES = [
     JSON_CONTENT_TYPE,
 ]
 
+STREAM_CHUNK_SIZE = 64 * 1024
+
 # TODO -> accept more general values as well
 REST_CONTENT_TYPE_RE = re.compile(
     r"application/((vnd\.kafka(\.(?P<embedded_format>avro|json|protobuf|binary|jsonschema))?(\.(?P<api_version>v[12]))?"
@@ -107,6 +110,38 @@ class HTTPRequest:
         return f"HTTPRequest(url={self.url} query={self.query} method={self.method} json={self.json!r})"
 
 
+class JSONArrayStream:
+    """Body of a response streaming a JSON array.
+
+    The items are encoded one at a time and written in chunks of about `chunk_size` bytes, the event loop runs
+    between the chunks. The items are consumed while the response is written, an iterator bounds the memory of
+    a large listing by the chunk size. The body is not known before it is written, a streamed response only has
+    an entity tag when its route has an `etag_generation`.
+    """
+
+    def __init__(self, items: Iterable[Any], *, chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+        self.items = items
+        self.chunk_size = chunk_size
+
+    def chunks(self) -> Iterator[bytes]:
+        chunk = bytearray(b"[")
+        separator = b""
+        for item in self.items:
+            chunk += separator
+            chunk += json_encode(item, sort_keys=True, binary=True)
+            separator = b","
+            if len(chunk) >= self.chunk_size:
+                yield bytes(chunk)
+                chunk.clear()
+        chunk += b"]"
+        yield bytes(chunk)
+
+
+class _StreamAborted(Exception):
+    """Raised out of the request handler when a streamed response fails after its headers were sent,
+    aiohttp then drops the connection instead of writing an error response."""
+
+
 class HTTPResponse(Exception):
     """A custom Response object derived from Exception so it can be raised
     in response handler callbacks."""
@@ -129,6 +164,9 @@ class HTTPResponse(Exception):
         if isinstance(body, (dict, list)):
             self.headers["Content-Type"] = JSON_CONTENT_TYPE
             self.json = body
+        elif isinstance(body, JSONArrayStream):
+            self.headers["Content-Type"] = JSON_CONTENT_TYPE
+            self.json = None
         else:
             self.json = None
         if content_type:
@@ -143,6 +181,13 @@ class HTTPResponse(Exception):
         return f"HTTPResponse(status={self.status} body={self.body})"
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if the `If-None-Match` header lists the entity tag, weak tags compare equal to strong ones"""
+    if not if_none_match:
+        return False
+    return etag.replace("W/", "") in {tag.strip().replace("W/", "") for tag in if_none_match.split(",")}
+
+
 def http_error(message, content_type: str, code: HTTPStatus) -> NoReturn:
     raise HTTPResponse(
         body=json_encode(
@@ -262,6 +307,7 @@ class RestApp:
         json_request=False,
         rest_request=False,
         user=None,
+        etag_generation: Optional[Callable[[], Optional[str]]] = None,
     ):
         start_time = time.monotonic()
         resp = None
@@ -334,9 +380,22 @@ class RestApp:
             if user is not None:
                 callback_kwargs["user"] = user
 
+            etag = None
             try:
                 if self.not_ready_handler is not None:
                     await self.not_ready_handler(rapu_request)
+                generation = etag_generation() if etag_generation is not None and request.method == "GET" else None
+                if generation is not None:
+                    # The response is a function of the state generation and of the request, a client polling an
+                    # unchanged state is answered without running the callback
+                    variant = f"{request.path_qs}\0{callback_kwargs.get('content_type')}\0{user.username if user else ''}"
+                    etag = f'W/"{generation}-{hashlib.md5(variant.encode()).hexdigest()}"'
+                    if etag_matches(request.headers.get("if-none-match"), etag):
+                        raise HTTPResponse(
+                            body=b"",
+                            status=HTTPStatus.NOT_MODIFIED,
+                            headers={"access-control-expose-headers": "etag", "etag": etag},
+                        )
                 data = await callback(**callback_kwargs)
                 status = HTTPStatus.OK
                 headers = {}
@@ -354,6 +413,9 @@ class RestApp:
                 status = HTTPStatus.INTERNAL_SERVER_ERROR
             headers.update(self.cors_and_server_headers_for_request(request=rapu_request))
 
+            if isinstance(data, JSONArrayStream):
+                resp = await self._stream_response(request, data, status=status, headers=headers, etag=etag)
+                return resp
             if isinstance(data, (dict, list)):
                 resp_bytes = json_encode(data, sort_keys=True, binary=True)
             elif isinstance(data, str):
@@ -365,12 +427,9 @@ class RestApp:
 
             # On 204 - NO CONTENT there is no point of calculating cache headers
             if is_success(status):
-                if resp_bytes:
-                    etag = f'"{hashlib.md5(resp_bytes).hexdigest()}"'
-                else:
-                    etag = '""'
-                if_none_match = request.headers.get("if-none-match")
-                if if_none_match and if_none_match.replace("W/", "") == etag:
+                if etag is None:
+                    etag = f'"{hashlib.md5(resp_bytes).hexdigest()}"' if resp_bytes else '""'
+                if etag_matches(request.headers.get("if-none-match"), etag):
                     status = HTTPStatus.NOT_MODIFIED
                     resp_bytes = b""
 
@@ -378,6 +437,8 @@ class RestApp:
                 headers["etag"] = etag
 
             resp = aiohttp.web.Response(body=resp_bytes, status=status.value, headers=headers)
+        except _StreamAborted:
+            raise
         except HTTPResponse as ex:
             if isinstance(ex.body, str):
                 resp = aiohttp.web.Response(text=ex.body, status=ex.status.value, headers=ex.headers)
@@ -420,6 +481,34 @@ class RestApp:
 
         return resp
 
+    async def _stream_response(
+        self,
+        request: aiohttp.web.Request,
+        body: JSONArrayStream,
+        *,
+        status: HTTPStatus,
+        headers: dict[str, str],
+        etag: Optional[str],
+    ) -> aiohttp.web.StreamResponse:
+        if etag is not None:
+            headers["access-control-expose-headers"] = "etag"
+            headers["etag"] = etag
+        resp = aiohttp.web.StreamResponse(status=status.value, headers=headers)
+        resp.enable_chunked_encoding()
+        await resp.prepare(request)
+        try:
+            for chunk in body.chunks():
+                await resp.write(chunk)
+                # Lets the other requests run between the chunks of a large response
+                await asyncio.sleep(0)
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as ex:
+            self.log.exception("Error streaming the response: %s %s", request.method, request.url)
+            raise _StreamAborted() from ex
+        await resp.write_eof()
+        return resp
+
     def route(
         self,
         path,
@@ -431,7 +520,14 @@ class RestApp:
         json_body=None,
         rest_request=False,
         auth=None,
+        etag_generation: Optional[Callable[[], Optional[str]]] = None,
     ):
+        """Adds a route calling `callback`.
+
+        `etag_generation` makes a GET route cacheable. It is called once the `not_ready_handler` let the request through
+        and returns the generation of the state the responses are built from, or `None` when unknown. The generation
+        must change whenever the state changes.
+        """
         # pretty path for statsd reporting
         path_for_stats = re.sub(r"<[\w:]+>", "x", path)
 
@@ -461,6 +557,7 @@ class RestApp:
                 json_request=json_body,
                 rest_request=rest_request,
                 user=user,
+                etag_generation=etag_generation,
             )
 
         async def wrapped_cors(request):
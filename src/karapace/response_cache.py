@@ -0,0 +1,80 @@
+"""
+karapace - cache of serialized responses of the schema registry
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from cachetools import LRUCache
+from collections.abc import Hashable, Iterable
+from karapace.typing import SchemaId, Subject
+from threading import Lock
+from typing import Final
+
+Tag = tuple[str, Hashable]
+TagVersions = tuple[tuple[Tag, int], ...]
+
+
+def response_tags(*, subjects: Iterable[Subject] = (), schema_ids: Iterable[SchemaId] = ()) -> tuple[Tag, ...]:
+    return tuple(("subject", subject) for subject in subjects) + tuple(("id", schema_id) for schema_id in schema_ids)
+
+
+class ResponseCache:
+    """Bounded LRU cache of serialized responses of the schema registry GET routes.
+
+    A response is tagged with the subjects and schema ids it is built from, the schema
+    reader invalidates the tags of the records it applies. Invalidating a tag bumps its
+    version instead of looking up the responses, a response is only served while the
+    versions of its tags are the ones taken before building it. A response built
+    concurrently with an invalidation is therefore never served. The cache is shared by
+    the schema reader thread and the REST API.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._lock = Lock()
+        self._responses: Final[LRUCache[Hashable, tuple[bytes, TagVersions]]] = LRUCache(maxsize=max(maxsize, 0))
+        self._tag_versions: dict[Tag, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._responses.maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def tag_versions(self, tags: Iterable[Tag]) -> TagVersions:
+        """Versions of the tags to `put` a response with, taken before reading the state it is built from."""
+        with self._lock:
+            return tuple((tag, self._tag_versions.get(tag, 0)) for tag in tags)
+
+    def get(self, key: Hashable) -> bytes | None:
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is not None:
+                body, tag_versions = entry
+                if all(self._tag_versions.get(tag, 0) == version for tag, version in tag_versions):
+                    self.hits += 1
+                    return body
+                del self._responses[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, body: bytes, tag_versions: TagVersions) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._responses[key] = (body, tag_versions)
+
+    def invalidate(self, tags: Iterable[Tag]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._responses.clear()
@@ -6,6 +6,7 @@ from __future__ import annotations
 
 from avro.errors import SchemaParseException
 from avro.schema import parse as avro_parse, Schema as AvroSchema
+from cachetools import LRUCache
 from collections.abc import Collection, Mapping, Sequence
 from dataclasses import dataclass
 from jsonschema import Draft7Validator
@@ -27,6 +28,7 @@ from karapace.schema_references import Reference
 from karapace.schema_type import SchemaType
 from karapace.typing import JsonObject, SchemaId, Subject, Version, VersionTag
 from karapace.utils import assert_never, json_decode, json_encode, JSONDecodeError
+from threading import Lock
 from typing import Any, cast, Final, final
 
 import hashlib
@@ -108,6 +110,8 @@ class TypedSchema:
         schema: Draft7Validator | AvroSchema | ProtobufSchema | None = None,
         references: Sequence[Reference] | None = None,
         dependencies: Mapping[str, Dependency] | None = None,
+        parsed_schema_cache: ParsedSchemaCache | None = None,
+        schema_str_normalized: bool = False,
     ) -> None:
         """Schema with type information
 
@@ -116,13 +120,18 @@ class TypedSchema:
             schema_str (str): The original schema string
             schema (Optional[Union[Draft7Validator, AvroSchema, ProtobufSchema]]): The parsed and validated schema
             references (Optional[List[Dependency]]): The references of schema
+            parsed_schema_cache (Optional[ParsedSchemaCache]): Cache used when the parsed schema is accessed
+            schema_str_normalized (bool): The schema string is already normalized, e.g. restored from a snapshot
         """
         self.schema_type: Final = schema_type
         self.references: Final = references
         self.dependencies: Final = dependencies
-        self.schema_str: Final = TypedSchema.normalize_schema_str(schema_str, schema_type, schema)
+        self.schema_str: Final = (
+            schema_str if schema_str_normalized else TypedSchema.normalize_schema_str(schema_str, schema_type, schema)
+        )
         self.max_id: SchemaId | None = None
         self._fingerprint_cached: str | None = None
+        self._parsed_schema_cache: Final = parsed_schema_cache
 
     def to_dict(self) -> JsonObject:
         if self.schema_type is SchemaType.PROTOBUF:
@@ -183,6 +192,13 @@ class TypedSchema:
 
     @property
     def schema(self) -> Draft7Validator | AvroSchema | ProtobufSchema:
+        if self._parsed_schema_cache is not None:
+            return self._parsed_schema_cache.parse(
+                self,
+                references=self.references,
+                dependencies=self.dependencies,
+                validate=True,
+            ).schema
         parsed_typed_schema = parse(
             schema_type=self.schema_type,
             schema_str=self.schema_str,
@@ -405,6 +421,97 @@ class ValidatedTypedSchema(ParsedTypedSchema):
         return cast(ValidatedTypedSchema, parsed_schema)
 
 
+def _dependencies_key(dependencies: Mapping[str, Dependency] | None) -> tuple:
+    if not dependencies:
+        return ()
+    return tuple(
+        sorted(
+            (
+                name,
+                dependency.subject,
+                dependency.version.value,
+                dependency.schema.fingerprint(),
+                _dependencies_key(dependency.schema.dependencies),
+            )
+            for name, dependency in dependencies.items()
+        )
+    )
+
+
+class _EvictionCountingLRUCache(LRUCache):
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize=maxsize)
+        self.evictions = 0
+
+    def popitem(self) -> tuple[Any, Any]:
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class ParsedSchemaCache:
+    """Bounded LRU cache of parsed schemas.
+
+    Stored schemas are parsed again for every compatibility check and schema
+    lookup. The parsed Avro, JSON Schema and Protobuf objects are cached by the
+    schema fingerprint, the parsing options and the resolved dependencies. The
+    cache is shared by the schema reader thread and the REST API.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._lock = Lock()
+        self._cache: Final = _EvictionCountingLRUCache(maxsize=max(maxsize, 0))
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def evictions(self) -> int:
+        return self._cache.evictions
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def parse(
+        self,
+        schema: TypedSchema,
+        *,
+        references: Sequence[Reference] | None = None,
+        dependencies: Mapping[str, Dependency] | None = None,
+        normalize: bool = False,
+        validate: bool = False,
+    ) -> ParsedTypedSchema:
+        """Parse `schema` or return the cached parsed schema.
+
+        The validate flag selects between `ValidatedTypedSchema.parse` and
+        `ParsedTypedSchema.parse` semantics, entries of the two are kept apart.
+        """
+        key = (schema.schema_type, schema.fingerprint(), _dependencies_key(dependencies), normalize, validate)
+        with self._lock:
+            parsed_schema = self._cache.get(key)
+            if parsed_schema is not None:
+                self.hits += 1
+                return parsed_schema
+            self.misses += 1
+
+        parsed_schema = parse(
+            schema_type=schema.schema_type,
+            schema_str=schema.schema_str,
+            validate_avro_enum_symbols=validate,
+            validate_avro_names=validate,
+            references=references,
+            dependencies=dependencies,
+            normalize=normalize,
+        )
+        if self._cache.maxsize > 0:
+            with self._lock:
+                self._cache[key] = parsed_schema
+        return parsed_schema
+
+
 @dataclass
 class SchemaVersion:
     subject: Subject
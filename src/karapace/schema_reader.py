@@ -21,17 +21,20 @@ from aiokafka.errors import (
     UnknownTopicOrPartitionError,
 )
 from avro.schema import Schema as AvroSchema
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from confluent_kafka import Message, TopicCollection, TopicPartition
 from contextlib import closing, ExitStack
+from dataclasses import dataclass
 from enum import Enum
 from jsonschema.validators import Draft7Validator
 from karapace import constants
 from karapace.config import Config
 from karapace.coordinator.master_coordinator import MasterCoordinator
 from karapace.dependency import Dependency
-from karapace.errors import InvalidReferences, InvalidSchema, InvalidVersion, ShutdownException
-from karapace.in_memory_database import KarapaceDatabase
+from karapace.errors import InvalidReferences, InvalidSchema, InvalidSnapshot, InvalidVersion, ShutdownException
+from karapace.in_memory_database import InMemoryDatabase, KarapaceDatabase
 from karapace.kafka.admin import KafkaAdminClient
 from karapace.kafka.common import translate_from_kafkaerror
 from karapace.kafka.consumer import KafkaConsumer
@@ -40,17 +43,29 @@ from karapace.key_format import is_key_in_canonical_format, KeyFormatter, KeyMod
 from karapace.offset_watcher import OffsetWatcher
 from karapace.protobuf.exception import ProtobufException
 from karapace.protobuf.schema import ProtobufSchema
-from karapace.schema_models import parse_protobuf_schema_definition, SchemaType, TypedSchema, ValidatedTypedSchema
+from karapace.response_cache import response_tags, ResponseCache
+from karapace.schema_models import (
+    parse_protobuf_schema_definition,
+    ParsedSchemaCache,
+    SchemaType,
+    SchemaVersion,
+    TypedSchema,
+    ValidatedTypedSchema,
+)
 from karapace.schema_references import LatestVersionReference, Reference, reference_from_mapping, Referents
+from karapace.schema_snapshot import create_snapshot, read_snapshot, restore_snapshot, write_snapshot
 from karapace.statsd import StatsClient
-from karapace.typing import JsonObject, SchemaId, SchemaReaderStoppper, Subject, Version
+from karapace.typing import JsonObject, SchemaId, SchemaReaderParsePool, SchemaReaderStoppper, Subject, Version
 from karapace.utils import json_decode, JSONDecodeError, shutdown
+from pathlib import Path
 from threading import Event, Lock, Thread
-from typing import Final
+from typing import cast, Final
 
 import asyncio
+import itertools
 import json
 import logging
+import multiprocessing
 import time
 
 LOG = logging.getLogger(__name__)
@@ -78,6 +93,10 @@ MAX_MESSAGES_TO_CONSUME_ON_STARTUP: Final = 1000
 MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP: Final = 1
 MESSAGE_CONSUME_TIMEOUT_SECONDS: Final = 0.2
 
+# While replaying the schemas topic on startup the progress is logged
+# periodically instead of logging every applied record.
+REPLAY_PROGRESS_LOG_INTERVAL_SECONDS: Final = 10.0
+
 # Metric names
 METRIC_SCHEMA_TOPIC_RECORDS_PROCESSED_COUNT: Final = "karapace_schema_reader_records_processed"
 METRIC_SCHEMA_TOPIC_RECORDS_PER_KEYMODE_GAUGE: Final = "karapace_schema_reader_records_per_keymode"
@@ -93,12 +112,60 @@ class MessageType(Enum):
     no_operation = "NOOP"
 
 
-def _create_consumer_from_config(config: Config) -> KafkaConsumer:
+@dataclass(frozen=True)
+class _ParsedRecord:
+    key: dict
+    value: dict | None
+    # Normalized schema of a schema record, None if the schema is normalized when the record is applied
+    normalized_schema_str: str | None
+
+
+def _normalize_schema_record(value: dict) -> str | None:
+    schema_type = SchemaType(value.get("schemaType", "AVRO"))
+    schema_str = value["schema"]
+    if schema_type is SchemaType.PROTOBUF:
+        if value.get("references"):
+            # Parsing needs the referenced schemas from the database
+            return None
+        parsed_schema = parse_protobuf_schema_definition(
+            schema_str,
+            None,
+            None,
+            validate_references=False,
+            normalize=False,
+        )
+        return TypedSchema.normalize_schema_str(str(parsed_schema), schema_type, parsed_schema)
+    return TypedSchema.normalize_schema_str(json.dumps(json.loads(schema_str), sort_keys=True), schema_type)
+
+
+def _parse_record(raw_key: bytes | None, raw_value: bytes | None) -> _ParsedRecord | None:
+    """Parse stage of the startup replay, runs in the parse worker pool.
+
+    Decodes the record and normalizes the schema of a schema record without accessing the
+    database. Returns None if the record can not be parsed, the reader thread then processes
+    the record from scratch, including the error handling.
+    """
+    if raw_key is None:
+        return None
+    try:
+        key = json_decode(raw_key)
+        value = json_decode(raw_value) if raw_value else None
+        if not isinstance(key, dict) or not (value is None or isinstance(value, dict)):
+            return None
+        normalized_schema_str = None
+        if value and key.get("keytype") == MessageType.schema.value:
+            normalized_schema_str = _normalize_schema_record(value)
+        return _ParsedRecord(key=key, value=value, normalized_schema_str=normalized_schema_str)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def _create_consumer_from_config(config: Config, *, subscribe: bool = True) -> KafkaConsumer:
     # Group not set on purpose, all consumers read the same data
     session_timeout_ms = config["session_timeout_ms"]
     return KafkaConsumer(
         bootstrap_servers=config["bootstrap_uri"],
-        topic=config["topic_name"],
+        topic=config["topic_name"] if subscribe else None,
         enable_auto_commit=False,
         client_id=config["client_id"],
         fetch_max_wait_ms=50,
@@ -137,6 +204,8 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         key_formatter: KeyFormatter,
         database: KarapaceDatabase,
         master_coordinator: MasterCoordinator | None = None,
+        parsed_schema_cache: ParsedSchemaCache | None = None,
+        response_cache: ResponseCache | None = None,
     ) -> None:
         Thread.__init__(self, name="schema-reader")
         self.master_coordinator = master_coordinator
@@ -145,6 +214,21 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         self.config = config
 
         self.database = database
+        self.parsed_schema_cache = (
+            parsed_schema_cache
+            if parsed_schema_cache is not None
+            else ParsedSchemaCache(maxsize=config["parsed_schema_cache_size"])
+        )
+        # Serialized responses of the REST API, invalidated after applying the records changing them
+        self.response_cache = response_cache if response_cache is not None else ResponseCache(maxsize=0)
+        # Validated schemas of referenced subject versions. Resolving a reference
+        # reuses these instead of resolving and validating the whole reference
+        # tree again. An entry is invalidated together with the entries of the
+        # versions referencing it, the generation prevents storing a schema
+        # which was resolved concurrently with an invalidation.
+        self._referenced_schemas_lock = Lock()
+        self._referenced_schemas: dict[tuple[Subject, Version], ValidatedTypedSchema] = {}
+        self._referenced_schemas_generation = 0
         self.admin_client: KafkaAdminClient | None = None
         self.topic_replication_factor = self.config["replication_factor"]
         self.consumer: KafkaConsumer | None = None
@@ -183,17 +267,32 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         self.processed_deprecated_karapace_keys_total = 0
         self.last_check = time.monotonic()
         self.start_time = time.monotonic()
+        self.last_progress_log = self.start_time
         self.startup_previous_processed_offset = 0
+        self._record_log_level = logging.INFO
 
         self.consecutive_unexpected_errors: int = 0
         self.consecutive_unexpected_errors_start: float = 0
 
+        # The topic partition is assigned explicitly when snapshots are enabled, so
+        # consuming can continue after the offset of a restored snapshot.
+        snapshot_path = self.config["schema_reader_snapshot_path"]
+        self._snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._snapshot_offset = OFFSET_UNINITIALIZED
+        self._last_snapshot_time = time.monotonic()
+
+        # Records of the startup replay are parsed in a worker pool, created on first
+        # use and shut down when the reader is ready.
+        self._parse_workers = self.config["schema_reader_parse_workers"]
+        self._parse_executor: Executor | None = None
+
     def close(self) -> None:
         LOG.info("Closing schema_reader")
         self._stop_schema_reader.set()
 
     def run(self) -> None:
         with ExitStack() as stack:
+            stack.callback(self._shutdown_parse_executor)
             while not self._stop_schema_reader.is_set() and self.admin_client is None:
                 try:
                     self.admin_client = _create_admin_client_from_config(self.config)
@@ -213,7 +312,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
 
             while not self._stop_schema_reader.is_set() and self.consumer is None:
                 try:
-                    self.consumer = _create_consumer_from_config(self.config)
+                    self.consumer = _create_consumer_from_config(self.config, subscribe=self._snapshot_path is None)
                     stack.enter_context(closing(self.consumer))
                 except (NodeNotReadyError, NoBrokersAvailable, AssertionError):
                     LOG.warning("[Consumer] No Brokers available yet. Retrying")
@@ -259,9 +358,14 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                     # Handles also a unusual case of purged schemas topic where starting offset can be > 0
                     # and no records to process.
                     self.offset = self._get_beginning_offset()
+                    if self._snapshot_path is not None and self.offset != OFFSET_UNINITIALIZED:
+                        self._restore_snapshot(self._snapshot_path)
+                        self.consumer.assign([TopicPartition(self.config["topic_name"], 0, self.offset + 1)])
                 try:
                     self.handle_messages()
                     self.consecutive_unexpected_errors = 0
+                    if self._snapshot_path is not None and self._should_write_snapshot():
+                        self._write_snapshot(self._snapshot_path)
                 except ShutdownException:
                     self._stop_schema_reader.set()
                     shutdown()
@@ -275,6 +379,64 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                         self.consecutive_unexpected_errors_start = time.monotonic()
                     LOG.warning("Unexpected exception in schema reader loop - %s", e)
 
+            if self._snapshot_path is not None and self.ready() and self.offset > self._snapshot_offset:
+                self._write_snapshot(self._snapshot_path)
+
+    def _restore_snapshot(self, path: Path) -> None:
+        """Restore the snapshot if it continues the current schemas topic, otherwise the topic is replayed."""
+        assert self.consumer is not None, "Thread must be started"
+        start_time = time.monotonic()
+        try:
+            snapshot = read_snapshot(path)
+            if snapshot.topic_name != self.config["topic_name"]:
+                raise InvalidSnapshot(f"Snapshot is for topic {snapshot.topic_name!r}")
+            _, end_offset = self.consumer.get_watermark_offsets(TopicPartition(self.config["topic_name"], 0))
+            # The records after the snapshot offset must still be in the topic and the topic
+            # must not have been recreated in the meantime.
+            if not self.offset <= snapshot.offset < end_offset:
+                raise InvalidSnapshot(
+                    f"Snapshot offset {snapshot.offset} is out of the topic offsets {self.offset + 1}-{end_offset - 1}"
+                )
+            restore_snapshot(snapshot, cast(InMemoryDatabase, self.database), self.parsed_schema_cache)
+        except InvalidSnapshot as e:
+            LOG.warning("Not restoring the schema reader snapshot, replaying the schemas topic: %s", e)
+            return
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.exception("Failed to restore the schema reader snapshot, replaying the schemas topic")
+            self.stats.unexpected_exception(ex=e, where="schema_reader_restore_snapshot")
+            return
+
+        self.config["compatibility"] = snapshot.compatibility
+        self.key_formatter.set_keymode(snapshot.keymode)
+        self.offset = snapshot.offset
+        self._snapshot_offset = snapshot.offset
+        LOG.info("Restored snapshot at offset %s in %s seconds", snapshot.offset, time.monotonic() - start_time)
+
+    def _should_write_snapshot(self) -> bool:
+        return (
+            self.ready()
+            and self.offset > self._snapshot_offset
+            and time.monotonic() - self._last_snapshot_time >= self.config["schema_reader_snapshot_interval_seconds"]
+        )
+
+    def _write_snapshot(self, path: Path) -> None:
+        self._last_snapshot_time = time.monotonic()
+        try:
+            snapshot = create_snapshot(
+                cast(InMemoryDatabase, self.database),
+                topic_name=self.config["topic_name"],
+                offset=self.offset,
+                compatibility=self.config["compatibility"],
+                keymode=self.key_formatter.get_keymode(),
+            )
+            write_snapshot(path, snapshot)
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.exception("Failed to write the schema reader snapshot")
+            self.stats.unexpected_exception(ex=e, where="schema_reader_write_snapshot")
+            return
+        self._snapshot_offset = snapshot.offset
+        LOG.info("Wrote snapshot at offset %s in %s seconds", snapshot.offset, time.monotonic() - self._last_snapshot_time)
+
     async def is_healthy(self) -> bool:
         if (
             self.consecutive_unexpected_errors >= UNHEALTHY_CONSECUTIVE_ERRORS
@@ -347,20 +509,24 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         # Reduce by one for actual highest offset.
         self._highest_offset = end_offset - 1
         cur_time = time.monotonic()
-        time_from_last_check = cur_time - self.last_check
-        progress_pct = 0 if not self._highest_offset else round((self.offset / self._highest_offset) * 100, 2)
-        startup_processed_message_per_second = (self.offset - self.startup_previous_processed_offset) / time_from_last_check
-        LOG.info(
-            "Replay progress (%s): %s/%s (%s %%) (recs/s %s)",
-            round(time_from_last_check, 2),
-            self.offset,
-            self._highest_offset,
-            progress_pct,
-            startup_processed_message_per_second,
-        )
         self.last_check = cur_time
-        self.startup_previous_processed_offset = self.offset
         ready = self.offset >= self._highest_offset
+        time_from_last_progress_log = cur_time - self.last_progress_log
+        if ready or time_from_last_progress_log >= REPLAY_PROGRESS_LOG_INTERVAL_SECONDS:
+            progress_pct = 0 if not self._highest_offset else round((self.offset / self._highest_offset) * 100, 2)
+            startup_processed_message_per_second = (
+                self.offset - self.startup_previous_processed_offset
+            ) / time_from_last_progress_log
+            LOG.info(
+                "Replay progress (%s): %s/%s (%s %%) (recs/s %s)",
+                round(time_from_last_progress_log, 2),
+                self.offset,
+                self._highest_offset,
+                progress_pct,
+                startup_processed_message_per_second,
+            )
+            self.last_progress_log = cur_time
+            self.startup_previous_processed_offset = self.offset
         if ready:
             self.max_messages_to_process = MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP
             LOG.info("Ready in %s seconds", time.monotonic() - self.start_time)
@@ -404,9 +570,58 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         self.consume_messages(msgs, watch_offsets)
 
     def consume_messages(self, msgs: list[Message], watch_offsets: bool) -> None:
+        if self.ready():
+            self._consume_messages(msgs, watch_offsets, bulk_load=False)
+            return
+
+        # Catching up with the schemas topic, nothing is served from the database yet.
+        with self.database.bulk_load():
+            self._record_log_level = logging.DEBUG
+            try:
+                self._consume_messages(msgs, watch_offsets, bulk_load=True)
+            finally:
+                self._record_log_level = logging.INFO
+
+    def _parse_records(self, msgs: list[Message]) -> Iterator[_ParsedRecord | None]:
+        """Parse the records of a startup replay batch in the parse worker pool.
+
+        The results are yielded in offset order while the later records are still being parsed.
+        """
+        if self._parse_workers <= 0 or len(msgs) < 2:
+            return itertools.repeat(None)
+        if self._parse_executor is None:
+            if self.config["schema_reader_parse_pool"] == SchemaReaderParsePool.thread:
+                self._parse_executor = ThreadPoolExecutor(max_workers=self._parse_workers, thread_name_prefix="schema-parse")
+            else:
+                # The reader runs next to other threads, forking would copy their locks
+                self._parse_executor = ProcessPoolExecutor(
+                    max_workers=self._parse_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        raw_keys = [msg.key() if msg.error() is None else None for msg in msgs]
+        raw_values = [msg.value() for msg in msgs]
+        chunksize = max(1, len(msgs) // (self._parse_workers * 4))
+        parsed_records = self._parse_executor.map(_parse_record, raw_keys, raw_values, chunksize=chunksize)
+        return self._parsed_records_or_none(parsed_records)
+
+    def _parsed_records_or_none(self, parsed_records: Iterator[_ParsedRecord | None]) -> Iterator[_ParsedRecord | None]:
+        try:
+            yield from parsed_records
+        except BrokenProcessPool:
+            LOG.exception("Schema parse workers failed, parsing the schemas topic on the reader thread")
+            self._shutdown_parse_executor()
+            self._parse_workers = 0
+        yield from itertools.repeat(None)
+
+    def _shutdown_parse_executor(self) -> None:
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
+            self._parse_executor = None
+
+    def _consume_messages(self, msgs: list[Message], watch_offsets: bool, *, bulk_load: bool) -> None:
         schema_records_processed_keymode_canonical = 0
         schema_records_processed_keymode_deprecated_karapace = 0
-        for msg in msgs:
+        parsed_records = self._parse_records(msgs) if bulk_load else itertools.repeat(None)
+        for msg, parsed_record in zip(msgs, parsed_records):
             try:
                 message_key = msg.key()
                 message_error = msg.error()
@@ -414,7 +629,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                     raise translate_from_kafkaerror(message_error)
 
                 assert message_key is not None
-                key = json_decode(message_key)
+                key = parsed_record.key if parsed_record is not None else json_decode(message_key)
             except AssertionError as exc:
                 LOG.warning("Empty msg.key() at offset %s", msg.offset())
                 self.offset = msg.offset()  # Invalid entry shall also move the offset so Karapace makes progress.
@@ -448,7 +663,9 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
 
             value = None
             message_value = msg.value()
-            if message_value:
+            if parsed_record is not None:
+                value = parsed_record.value
+            elif message_value:
                 try:
                     value = self._parse_message_value(message_value)
                 except (JSONDecodeError, TypeError) as exc:
@@ -458,7 +675,9 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                     continue  # [non-strict mode]
 
             try:
-                self.handle_msg(key, value)
+                self.handle_msg(
+                    key, value, normalized_schema_str=parsed_record.normalized_schema_str if parsed_record else None
+                )
             except (InvalidSchema, InvalidVersion, TypeError) as exc:
                 self.kafka_error_handler.handle_error(location=KafkaErrorLocation.SCHEMA_READER, error=exc)
                 continue
@@ -477,6 +696,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         self._report_schema_metrics(
             schema_records_processed_keymode_canonical,
             schema_records_processed_keymode_deprecated_karapace,
+            report_gauges=not bulk_load,
         )
 
     def _update_is_ready_flag(self) -> None:
@@ -491,11 +711,17 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             new_ready_flag = self._is_ready()
             with self._ready_lock:
                 self._ready = new_ready_flag
+            if new_ready_flag:
+                # The gauges are not updated during the startup replay.
+                self._report_schema_gauges()
+                self._shutdown_parse_executor()
 
     def _report_schema_metrics(
         self,
         schema_records_processed_keymode_canonical: int,
         schema_records_processed_keymode_deprecated_karapace: int,
+        *,
+        report_gauges: bool = True,
     ) -> None:
         # Update processing counter always.
         self.stats.increase(
@@ -515,47 +741,58 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         )
         if records_processed:
             self.processed_canonical_keys_total += schema_records_processed_keymode_canonical
-            self.stats.gauge(
-                metric=METRIC_SCHEMA_TOPIC_RECORDS_PER_KEYMODE_GAUGE,
-                value=self.processed_canonical_keys_total,
-                tags={"keymode": KeyMode.CANONICAL},
-            )
             self.processed_deprecated_karapace_keys_total += schema_records_processed_keymode_deprecated_karapace
-            self.stats.gauge(
-                metric=METRIC_SCHEMA_TOPIC_RECORDS_PER_KEYMODE_GAUGE,
-                value=self.processed_deprecated_karapace_keys_total,
-                tags={"keymode": KeyMode.DEPRECATED_KARAPACE},
-            )
-            num_schemas = self.database.num_schemas()
-            num_subjects = self.database.num_subjects()
-            self.stats.gauge(metric=METRIC_SCHEMAS_GAUGE, value=num_schemas)
-            self.stats.gauge(metric=METRIC_SUBJECTS_GAUGE, value=num_subjects)
-            live_versions, soft_deleted_versions = self.database.num_schema_versions()
-            self.stats.gauge(
-                metric=METRIC_SUBJECT_DATA_SCHEMA_VERSIONS_GAUGE,
-                value=live_versions,
-                tags={"state": "live"},
-            )
-            self.stats.gauge(
-                metric=METRIC_SUBJECT_DATA_SCHEMA_VERSIONS_GAUGE,
-                value=soft_deleted_versions,
-                tags={"state": "soft_deleted"},
-            )
+            if report_gauges:
+                self._report_schema_gauges()
+
+    def _report_schema_gauges(self) -> None:
+        self.stats.gauge(
+            metric=METRIC_SCHEMA_TOPIC_RECORDS_PER_KEYMODE_GAUGE,
+            value=self.processed_canonical_keys_total,
+            tags={"keymode": KeyMode.CANONICAL},
+        )
+        self.stats.gauge(
+            metric=METRIC_SCHEMA_TOPIC_RECORDS_PER_KEYMODE_GAUGE,
+            value=self.processed_deprecated_karapace_keys_total,
+            tags={"keymode": KeyMode.DEPRECATED_KARAPACE},
+        )
+        num_schemas = self.database.num_schemas()
+        num_subjects = self.database.num_subjects()
+        self.stats.gauge(metric=METRIC_SCHEMAS_GAUGE, value=num_schemas)
+        self.stats.gauge(metric=METRIC_SUBJECTS_GAUGE, value=num_subjects)
+        live_versions, soft_deleted_versions = self.database.num_schema_versions()
+        self.stats.gauge(
+            metric=METRIC_SUBJECT_DATA_SCHEMA_VERSIONS_GAUGE,
+            value=live_versions,
+            tags={"state": "live"},
+        )
+        self.stats.gauge(
+            metric=METRIC_SUBJECT_DATA_SCHEMA_VERSIONS_GAUGE,
+            value=soft_deleted_versions,
+            tags={"state": "soft_deleted"},
+        )
 
     def _handle_msg_config(self, key: dict, value: dict | None) -> None:
         subject = key.get("subject")
         if subject is not None:
             if self.database.find_subject(subject=subject) is None:
-                LOG.info("Adding first version of subject: %r with no schemas", subject)
+                LOG.log(self._record_log_level, "Adding first version of subject: %r with no schemas", subject)
                 self.database.insert_subject(subject=subject)
+                self.response_cache.invalidate(response_tags(subjects=[subject]))
             if not value:
-                LOG.info("Deleting compatibility config completely for subject: %r", subject)
+                LOG.log(self._record_log_level, "Deleting compatibility config completely for subject: %r", subject)
                 self.database.delete_subject_compatibility(subject=subject)
             else:
-                LOG.info("Setting subject: %r config to: %r, value: %r", subject, value["compatibilityLevel"], value)
+                LOG.log(
+                    self._record_log_level,
+                    "Setting subject: %r config to: %r, value: %r",
+                    subject,
+                    value["compatibilityLevel"],
+                    value,
+                )
                 self.database.set_subject_compatibility(subject=subject, compatibility=value["compatibilityLevel"])
         elif value is not None:
-            LOG.info("Setting global config to: %r, value: %r", value["compatibilityLevel"], value)
+            LOG.log(self._record_log_level, "Setting global config to: %r, value: %r", value["compatibilityLevel"], value)
             self.config["compatibility"] = value["compatibilityLevel"]
 
     def _handle_msg_delete_subject(self, key: dict, value: dict | None) -> None:  # pylint: disable=unused-argument
@@ -568,24 +805,41 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         if self.database.find_subject(subject=subject) is None:
             LOG.warning("Subject: %r did not exist, should have", subject)
         else:
-            LOG.info("Deleting subject: %r, value: %r", subject, value)
+            LOG.log(self._record_log_level, "Deleting subject: %r, value: %r", subject, value)
             self.database.delete_subject(subject=subject, version=version)
+            deleted_versions = [
+                schema_version
+                for subject_version, schema_version in self.database.find_subject_schemas(
+                    subject=subject, include_deleted=True
+                ).items()
+                if subject_version <= version
+            ]
+            self._invalidate_referenced_schemas(subject, [schema_version.version for schema_version in deleted_versions])
+            self.response_cache.invalidate(
+                response_tags(
+                    subjects=[subject], schema_ids=[schema_version.schema_id for schema_version in deleted_versions]
+                )
+            )
 
     def _handle_msg_schema_hard_delete(self, key: dict) -> None:
         subject, version = key["subject"], Version(key["version"])
 
+        subject_schemas = self.database.find_subject_schemas(subject=subject, include_deleted=True)
         if self.database.find_subject(subject=subject) is None:
             LOG.warning("Hard delete: Subject %s did not exist, should have", subject)
-        elif version not in self.database.find_subject_schemas(subject=subject, include_deleted=True):
+        elif version not in subject_schemas:
             LOG.warning("Hard delete: version: %r for subject: %r did not exist, should have", version, subject)
         else:
-            LOG.info("Hard delete: subject: %r version: %r", subject, version)
+            LOG.log(self._record_log_level, "Hard delete: subject: %r version: %r", subject, version)
+            schema_id = subject_schemas[version].schema_id
             self.database.delete_subject_schema(subject=subject, version=version)
             if not self.database.find_subject_schemas(subject=subject, include_deleted=True):
-                LOG.info("Hard delete last version, subject %r is gone", subject)
+                LOG.log(self._record_log_level, "Hard delete last version, subject %r is gone", subject)
                 self.database.delete_subject_hard(subject=subject)
+            self._invalidate_referenced_schemas(subject, [version])
+            self.response_cache.invalidate(response_tags(subjects=[subject], schema_ids=[schema_id]))
 
-    def _handle_msg_schema(self, key: dict, value: dict | None) -> None:
+    def _handle_msg_schema(self, key: dict, value: dict | None, *, normalized_schema_str: str | None = None) -> None:
         if not value:
             self._handle_msg_schema_hard_delete(key)
             return
@@ -614,7 +868,10 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
 
         parsed_schema: Draft7Validator | AvroSchema | ProtobufSchema | None = None
         resolved_dependencies: dict[str, Dependency] | None = None
-        if schema_type_parsed in [SchemaType.AVRO, SchemaType.JSONSCHEMA]:
+        if normalized_schema_str is not None:
+            # Normalized by the parse stage of the startup replay
+            schema_str = normalized_schema_str
+        elif schema_type_parsed in [SchemaType.AVRO, SchemaType.JSONSCHEMA]:
             try:
                 schema_str = json.dumps(json.loads(schema_str), sort_keys=True)
             except json.JSONDecodeError as exc:
@@ -647,6 +904,8 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                 references=resolved_references,
                 dependencies=resolved_dependencies,
                 schema=parsed_schema,
+                parsed_schema_cache=self.parsed_schema_cache,
+                schema_str_normalized=normalized_schema_str is not None,
             )
         except (InvalidSchema, JSONDecodeError) as exc:
             raise InvalidSchema from exc
@@ -659,12 +918,14 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             schema=typed_schema,
             references=resolved_references,
         )
+        self._invalidate_referenced_schemas(schema_subject, [schema_version])
+        self.response_cache.invalidate(response_tags(subjects=[schema_subject], schema_ids=[schema_id]))
 
         if resolved_references:
             for ref in resolved_references:
                 self.database.insert_referenced_by(subject=ref.subject, version=ref.version, schema_id=schema_id)
 
-    def handle_msg(self, key: dict, value: dict | None) -> None:
+    def handle_msg(self, key: dict, value: dict | None, *, normalized_schema_str: str | None = None) -> None:
         if "keytype" in key:
             try:
                 message_type = MessageType(key["keytype"])
@@ -672,7 +933,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                 if message_type == MessageType.config:
                     self._handle_msg_config(key, value)
                 elif message_type == MessageType.schema:
-                    self._handle_msg_schema(key, value)
+                    self._handle_msg_schema(key, value, normalized_schema_str=normalized_schema_str)
                 elif message_type == MessageType.delete_subject:
                     self._handle_msg_delete_subject(key, value)
                 elif message_type == MessageType.no_operation:
@@ -705,12 +966,48 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         references, dependencies = (
             self.resolve_references(schema.references) if schema.references else (schema.references, schema.dependencies)
         )
-        return ValidatedTypedSchema.parse(
-            schema_type=schema.schema_type,
-            schema_str=schema.schema_str,
+        validated_schema = self.parsed_schema_cache.parse(
+            schema,
             references=references,
             dependencies=dependencies,
+            validate=True,
         )
+        return cast(ValidatedTypedSchema, validated_schema)
+
+    def _get_referenced_schema(self, schema_version: SchemaVersion) -> ValidatedTypedSchema:
+        key = (schema_version.subject, schema_version.version)
+        with self._referenced_schemas_lock:
+            validated_schema = self._referenced_schemas.get(key)
+            generation = self._referenced_schemas_generation
+        if validated_schema is not None:
+            return validated_schema
+
+        validated_schema = self._resolve_and_validate(schema_version.schema)
+        with self._referenced_schemas_lock:
+            if generation == self._referenced_schemas_generation:
+                self._referenced_schemas[key] = validated_schema
+        return validated_schema
+
+    def _invalidate_referenced_schemas(self, subject: Subject, versions: Iterable[Version]) -> None:
+        """Drop the cached schemas of the subject versions and of all versions referencing them."""
+        with self._referenced_schemas_lock:
+            self._referenced_schemas_generation += 1
+            if not self._referenced_schemas:
+                return
+
+            pending = [(subject, version) for version in versions]
+            seen: set[tuple[Subject, Version]] = set()
+            while pending:
+                key = pending.pop()
+                if key in seen:
+                    continue
+                seen.add(key)
+                self._referenced_schemas.pop(key, None)
+                for schema_id in self.database.get_referenced_by(*key) or []:
+                    for referencing_version in self.database.find_schema_versions_by_schema_id(
+                        schema_id=schema_id, include_deleted=True
+                    ):
+                        pending.append((referencing_version.subject, referencing_version.version))
 
     def _resolve_reference(
         self,
@@ -734,7 +1031,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         if not schema_version.schema:
             raise InvalidReferences(f"No schema in {reference.subject} with version {reference.version}.")
 
-        validated_schema = self._resolve_and_validate(schema_version.schema)
+        validated_schema = self._get_referenced_schema(schema_version)
 
         return reference, Dependency.of(reference, validated_schema)
 
@@ -6,7 +6,8 @@ from __future__ import annotations
 
 from avro.compatibility import SchemaCompatibilityResult, SchemaCompatibilityType
 from collections.abc import Sequence
-from contextlib import AsyncExitStack, closing
+from contextlib import AsyncExitStack, closing, suppress
+from dataclasses import dataclass, field
 from karapace.compatibility import CompatibilityModes
 from karapace.compatibility.jsonschema.checks import is_incompatible
 from karapace.compatibility.schema_compatibility import SchemaCompatibility
@@ -15,6 +16,7 @@ from karapace.coordinator.master_coordinator import MasterCoordinator
 from karapace.dependency import Dependency
 from karapace.errors import (
     IncompatibleSchema,
+    InvalidSchema,
     ReferenceExistsException,
     SchemasNotFoundException,
     SchemaVersionNotSoftDeletedException,
@@ -28,10 +30,20 @@ from karapace.in_memory_database import InMemoryDatabase
 from karapace.key_format import KeyFormatter
 from karapace.messaging import KarapaceProducer
 from karapace.offset_watcher import OffsetWatcher
-from karapace.schema_models import ParsedTypedSchema, SchemaType, SchemaVersion, TypedSchema, ValidatedTypedSchema, Versioner
+from karapace.response_cache import ResponseCache
+from karapace.schema_models import (
+    ParsedSchemaCache,
+    ParsedTypedSchema,
+    SchemaType,
+    SchemaVersion,
+    TypedSchema,
+    ValidatedTypedSchema,
+    Versioner,
+)
 from karapace.schema_reader import KafkaSchemaReader
 from karapace.schema_references import LatestVersionReference, Reference
 from karapace.typing import JsonObject, Mode, SchemaId, Subject, Version
+from typing import Any, cast
 
 import asyncio
 import logging
@@ -39,6 +51,19 @@ import logging
 LOG = logging.getLogger(__name__)
 
 
+@dataclass
+class _SchemaWriteGroup:
+    """Schema registrations written to Kafka together by a single group commit."""
+
+    messages: list[tuple[dict[str, Any], dict[str, Any] | None]] = field(default_factory=list)
+    results: list[asyncio.Future[None]] = field(default_factory=list)
+    subjects: set[Subject] = field(default_factory=set)
+    schema_ids: dict[tuple[SchemaType, str], tuple[TypedSchema, SchemaId]] = field(default_factory=dict)
+    sealed: asyncio.Event = field(default_factory=asyncio.Event)
+    committed: asyncio.Future[None] = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+    task: asyncio.Task[None] | None = None
+
+
 class KarapaceSchemaRegistry:
     def __init__(self, config: Config) -> None:
         self.config = config
@@ -51,18 +76,28 @@ class KarapaceSchemaRegistry:
 
         self.mc = MasterCoordinator(config=self.config)
         self.database = InMemoryDatabase()
+        self.parsed_schema_cache = ParsedSchemaCache(maxsize=self.config["parsed_schema_cache_size"])
+        self.response_cache = ResponseCache(maxsize=self.config["registry_response_cache_size"])
         self.schema_reader = KafkaSchemaReader(
             config=self.config,
             offset_watcher=offset_watcher,
             key_formatter=self._key_formatter,
             master_coordinator=self.mc,
             database=self.database,
+            parsed_schema_cache=self.parsed_schema_cache,
+            response_cache=self.response_cache,
         )
         self.mc.set_stoppper(self.schema_reader)
 
         self.schema_lock = asyncio.Lock()
         self._master_lock = asyncio.Lock()
 
+        self._group_commit_delay = self.config["schema_write_group_commit_ms"] / 1000
+        self._open_write_group: _SchemaWriteGroup | None = None
+        # Groups are removed only after the schema reader has consumed them, until then the
+        # registered subjects and schema ids are not visible in the database.
+        self._pending_write_groups: list[_SchemaWriteGroup] = []
+
     def subjects_list(self, include_deleted: bool = False) -> list[Subject]:
         return self.database.find_subjects(include_deleted=include_deleted)
 
@@ -77,13 +112,14 @@ class KarapaceSchemaRegistry:
     async def start(self) -> None:
         self.mc.start()
         self.schema_reader.start()
-        self.producer.initialize_karapace_producer()
+        await self.producer.initialize_karapace_producer()
 
     async def close(self) -> None:
         async with AsyncExitStack() as stack:
             stack.push_async_callback(self.mc.close)
             stack.enter_context(closing(self.schema_reader))
-            stack.enter_context(closing(self.producer))
+            stack.push_async_callback(self.producer.close)
+            stack.push_async_callback(self._commit_pending_writes)
 
     async def get_master(self, ignore_readiness: bool = False) -> tuple[bool, str | None]:
         """Resolve if current node is the primary and the primary node address.
@@ -132,6 +168,7 @@ class KarapaceSchemaRegistry:
 
     async def subject_delete_local(self, subject: Subject, permanent: bool) -> list[Version]:
         async with self.schema_lock:
+            await self._commit_pending_writes()
             schema_versions = self.subject_get(subject, include_deleted=True)
 
             # Subject can be permanently deleted if no schemas or all are soft deleted.
@@ -162,7 +199,7 @@ class KarapaceSchemaRegistry:
                         version_id,
                         schema_version.schema_id,
                     )
-                    self.send_schema_message(
+                    await self.send_schema_message(
                         subject=subject,
                         schema=None,
                         schema_id=schema_version.schema_id,
@@ -188,12 +225,13 @@ class KarapaceSchemaRegistry:
                 referenced_by = self.schema_reader.get_referenced_by(subject, latest_version_id)
                 if referenced_by and len(referenced_by) > 0:
                     raise ReferenceExistsException(referenced_by, latest_version_id)
-                self.send_delete_subject_message(subject, latest_version_id)
+                await self.send_delete_subject_message(subject, latest_version_id)
 
             return version_list
 
     async def subject_version_delete_local(self, subject: Subject, version: Version, permanent: bool) -> Version:
         async with self.schema_lock:
+            await self._commit_pending_writes()
             schema_versions = self.subject_get(subject, include_deleted=True)
             if not permanent and version.is_latest:
                 schema_versions = {
@@ -217,7 +255,7 @@ class KarapaceSchemaRegistry:
             if referenced_by and len(referenced_by) > 0:
                 raise ReferenceExistsException(referenced_by, resolved_version)
 
-            self.send_schema_message(
+            await self.send_schema_message(
                 subject=subject,
                 schema=None if permanent else schema_version.schema,
                 schema_id=schema_version.schema_id,
@@ -286,12 +324,7 @@ class KarapaceSchemaRegistry:
 
     def resolve_and_parse(self, schema: TypedSchema) -> ParsedTypedSchema:
         references, dependencies = self.resolve_references(schema.references) if schema.references else (None, None)
-        return ParsedTypedSchema.parse(
-            schema_type=schema.schema_type,
-            schema_str=schema.schema_str,
-            references=references,
-            dependencies=dependencies,
-        )
+        return self.parsed_schema_cache.parse(schema, references=references, dependencies=dependencies)
 
     async def write_new_schema_local(
         self,
@@ -304,43 +337,11 @@ class KarapaceSchemaRegistry:
         This function is allowed to be called only from the Karapace master node.
         """
         LOG.info("Writing new schema locally since we're the master")
-        async with self.schema_lock:
-            # When waiting for a lock, another writer may have written the schema.
-            # Fast path check for resolving.
-            maybe_schema_id = self.database.get_schema_id_if_exists(
-                subject=subject, schema=new_schema, include_deleted=False
-            )
-            if maybe_schema_id is not None:
-                LOG.debug("Schema id %r found from subject+schema cache", maybe_schema_id)
-                return maybe_schema_id
-
-            all_schema_versions = self.database.find_subject_schemas(subject=subject, include_deleted=True)
-            if not all_schema_versions:
-                version = Version(1)
-                schema_id = self.database.get_schema_id(new_schema)
-                LOG.debug(
-                    "Registering new subject: %r, id: %r with version: %r with schema %r, schema_id: %r",
-                    subject,
-                    schema_id,
-                    version,
-                    new_schema.schema_str,
-                    schema_id,
-                )
-            else:
-                # First check if any of the existing schemas for the subject match
-                live_versions = self.get_live_versions_sorted(all_schema_versions)
-                if not live_versions:  # Previous ones have been deleted by the user.
-                    version = self.database.get_next_version(subject=subject)
-                    schema_id = self.database.get_schema_id(new_schema)
-                    LOG.debug(
-                        "Registering subject: %r, id: %r new version: %r with schema %r, schema_id: %r",
-                        subject,
-                        schema_id,
-                        version,
-                        new_schema.schema_str,
-                        schema_id,
-                    )
-                    self.send_schema_message(
+        if self._group_commit_delay <= 0:
+            async with self.schema_lock:
+                schema_id, version = self._prepare_new_schema(subject, new_schema)
+                if version is not None:
+                    await self.send_schema_message(
                         subject=subject,
                         schema=new_schema,
                         schema_id=schema_id,
@@ -348,41 +349,226 @@ class KarapaceSchemaRegistry:
                         deleted=False,
                         references=new_schema_references,
                     )
-                    return schema_id
+                return schema_id
+
+        while True:
+            async with self.schema_lock:
+                # The compatibility check and the next version need the previous registration of
+                # the subject to be visible in the database, wait for its group to be committed.
+                pending_group = self._pending_write_group_for_subject(subject)
+                if pending_group is None:
+                    schema_id, version = self._prepare_new_schema(subject, new_schema)
+                    if version is None:
+                        return schema_id
+                    group = self._open_write_group
+                    if group is None:
+                        group = self._open_write_group = self._new_write_group()
+                        group.task = asyncio.create_task(self._commit_write_group_after_delay(group))
+                    written = self._add_to_write_group(
+                        group,
+                        subject=subject,
+                        schema=new_schema,
+                        schema_id=schema_id,
+                        version=version,
+                        references=new_schema_references,
+                    )
+                    break
+            await asyncio.shield(pending_group.committed)
 
-                result = self.check_schema_compatibility(new_schema, subject)
+        await written
+        return schema_id
 
-                if is_incompatible(result):
-                    LOG.warning(
-                        "Incompatible schema: %s, incompatibilities: %s", result.compatibility, result.incompatibilities
-                    )
-                    compatibility_mode = self.get_compatibility_mode(subject=subject)
-                    raise IncompatibleSchema(
-                        f"Incompatible schema, compatibility_mode={compatibility_mode.value}. "
-                        f"Incompatibilities: {', '.join(result.messages)[:300]}"
+    async def write_new_schemas_local(
+        self,
+        new_schemas: Sequence[tuple[Subject, ValidatedTypedSchema, Sequence[Reference] | None]],
+    ) -> list[SchemaId | Exception]:
+        """Write a batch of new schemas and return the id or the error of each of them
+
+        The registrations follow the same rules as `write_new_schema_local` and are written to Kafka
+        with a single flush. A subject registered more than once is written in the order given, the
+        batch is flushed before registering the subject again so that the compatibility is checked
+        against the previous registration.
+
+        This function is allowed to be called only from the Karapace master node.
+        """
+        LOG.info("Writing %d new schemas locally since we're the master", len(new_schemas))
+        results: list[SchemaId | Exception] = []
+        written: dict[int, asyncio.Future[None]] = {}
+        async with self.schema_lock:
+            await self._commit_pending_writes()
+            group = self._new_write_group()
+            for subject, new_schema, new_schema_references in new_schemas:
+                if subject in group.subjects:
+                    await self._commit_write_group(group)
+                    group = self._new_write_group()
+                try:
+                    schema_id, version = self._prepare_new_schema(subject, new_schema)
+                except (IncompatibleSchema, InvalidSchema) as e:
+                    results.append(e)
+                    continue
+                except Exception as e:  # pylint: disable=broad-except
+                    # The earlier entries may be committed already, the error is reported for this entry only
+                    LOG.exception("Error registering a new schema of subject %r", subject)
+                    results.append(e)
+                    continue
+                if version is not None:
+                    written[len(results)] = self._add_to_write_group(
+                        group,
+                        subject=subject,
+                        schema=new_schema,
+                        schema_id=schema_id,
+                        version=version,
+                        references=new_schema_references,
                     )
+                results.append(schema_id)
+            await self._commit_write_group(group)
 
-                # We didn't find an existing schema and the schema is compatible so go and create one
-                version = self.database.get_next_version(subject=subject)
-                schema_id = self.database.get_schema_id(new_schema)
-                LOG.debug(
-                    "Registering subject: %r, id: %r new version: %r with schema %s, schema_id: %r",
-                    subject,
-                    schema_id,
-                    version,
-                    new_schema,
-                    schema_id,
-                )
-
-            self.send_schema_message(
-                subject=subject,
-                schema=new_schema,
-                schema_id=schema_id,
-                version=version,
-                deleted=False,
-                references=new_schema_references,
+        for index, result in written.items():
+            error = result.exception()
+            if error is not None:
+                results[index] = cast(Exception, error)
+        return results
+
+    def _prepare_new_schema(self, subject: Subject, new_schema: ValidatedTypedSchema) -> tuple[SchemaId, Version | None]:
+        """Assign the schema id and the version for a new schema of the subject.
+
+        The version is `None` when the schema is already registered in the subject and
+        nothing needs to be written. Must be called with the `schema_lock` held.
+        """
+        # When waiting for a lock, another writer may have written the schema.
+        # Fast path check for resolving.
+        maybe_schema_id = self.database.get_schema_id_if_exists(subject=subject, schema=new_schema, include_deleted=False)
+        if maybe_schema_id is not None:
+            LOG.debug("Schema id %r found from subject+schema cache", maybe_schema_id)
+            return maybe_schema_id, None
+
+        all_schema_versions = self.database.find_subject_schemas(subject=subject, include_deleted=True)
+        if not all_schema_versions:
+            version = Version(1)
+            schema_id = self._get_schema_id(new_schema)
+            LOG.debug(
+                "Registering new subject: %r, id: %r with version: %r with schema %r, schema_id: %r",
+                subject,
+                schema_id,
+                version,
+                new_schema.schema_str,
+                schema_id,
+            )
+            return schema_id, version
+
+        # First check if any of the existing schemas for the subject match
+        live_versions = self.get_live_versions_sorted(all_schema_versions)
+        if not live_versions:  # Previous ones have been deleted by the user.
+            version = self.database.get_next_version(subject=subject)
+            schema_id = self._get_schema_id(new_schema)
+            LOG.debug(
+                "Registering subject: %r, id: %r new version: %r with schema %r, schema_id: %r",
+                subject,
+                schema_id,
+                version,
+                new_schema.schema_str,
+                schema_id,
+            )
+            return schema_id, version
+
+        result = self.check_schema_compatibility(new_schema, subject)
+
+        if is_incompatible(result):
+            LOG.warning("Incompatible schema: %s, incompatibilities: %s", result.compatibility, result.incompatibilities)
+            compatibility_mode = self.get_compatibility_mode(subject=subject)
+            raise IncompatibleSchema(
+                f"Incompatible schema, compatibility_mode={compatibility_mode.value}. "
+                f"Incompatibilities: {', '.join(result.messages)[:300]}"
             )
-            return schema_id
+
+        # We didn't find an existing schema and the schema is compatible so go and create one
+        version = self.database.get_next_version(subject=subject)
+        schema_id = self._get_schema_id(new_schema)
+        LOG.debug(
+            "Registering subject: %r, id: %r new version: %r with schema %s, schema_id: %r",
+            subject,
+            schema_id,
+            version,
+            new_schema,
+            schema_id,
+        )
+        return schema_id, version
+
+    def _get_schema_id(self, new_schema: TypedSchema) -> SchemaId:
+        """Schema id for the new schema, reusing the ids of not yet committed registrations."""
+        content_key = (new_schema.schema_type, new_schema.fingerprint())
+        for group in self._pending_write_groups:
+            pending = group.schema_ids.get(content_key)
+            if pending is not None and pending[0] == new_schema:
+                return pending[1]
+        return self.database.get_schema_id(new_schema)
+
+    def _pending_write_group_for_subject(self, subject: Subject) -> _SchemaWriteGroup | None:
+        for group in self._pending_write_groups:
+            if subject in group.subjects:
+                return group
+        return None
+
+    def _new_write_group(self) -> _SchemaWriteGroup:
+        group = _SchemaWriteGroup()
+        self._pending_write_groups.append(group)
+        return group
+
+    def _add_to_write_group(
+        self,
+        group: _SchemaWriteGroup,
+        *,
+        subject: Subject,
+        schema: ValidatedTypedSchema,
+        schema_id: SchemaId,
+        version: Version,
+        references: Sequence[Reference] | None,
+    ) -> asyncio.Future[None]:
+        """Queue a schema registration to the write group, returns the result of the write."""
+        key, value = self._schema_message(
+            subject=subject, schema=schema, schema_id=schema_id, version=version, deleted=False, references=references
+        )
+        result: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        group.messages.append((key, value))
+        group.results.append(result)
+        group.subjects.add(subject)
+        group.schema_ids.setdefault((schema.schema_type, schema.fingerprint()), (schema, schema_id))
+        return result
+
+    async def _commit_write_group_after_delay(self, group: _SchemaWriteGroup) -> None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(group.sealed.wait(), timeout=self._group_commit_delay)
+        if self._open_write_group is group:
+            self._open_write_group = None
+        await self._commit_write_group(group)
+
+    async def _commit_write_group(self, group: _SchemaWriteGroup) -> None:
+        try:
+            errors: list[Exception | None] = await self.producer.send_messages(group.messages) if group.messages else []
+        except asyncio.CancelledError:
+            for result in group.results:
+                result.cancel()
+            raise
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.exception("Failed to write a group of %d schemas", len(group.messages))
+            errors = [e] * len(group.messages)
+        finally:
+            self._pending_write_groups.remove(group)
+            group.committed.set_result(None)
+
+        for result, error in zip(group.results, errors):
+            if result.done():  # The request was cancelled
+                continue
+            if error is None:
+                result.set_result(None)
+            else:
+                result.set_exception(error)
+
+    async def _commit_pending_writes(self) -> None:
+        """Write the open group immediately and wait until all pending groups are committed."""
+        for group in list(self._pending_write_groups):
+            group.sealed.set()
+            await asyncio.shield(group.committed)
 
     def get_subject_versions_for_schema(
         self, schema_id: SchemaId, *, include_deleted: bool = False
@@ -403,7 +589,7 @@ class KarapaceSchemaRegistry:
     def get_subject_mode(self) -> Mode:
         return Mode.readwrite
 
-    def send_schema_message(
+    async def send_schema_message(
         self,
         *,
         subject: Subject,
@@ -413,7 +599,23 @@ class KarapaceSchemaRegistry:
         deleted: bool,
         references: Sequence[Reference] | None,
     ) -> None:
-        key = {"subject": subject, "version": version.value, "magic": 1, "keytype": "SCHEMA"}
+        key, value = self._schema_message(
+            subject=subject, schema=schema, schema_id=schema_id, version=version, deleted=deleted, references=references
+        )
+        await self.producer.send_message(key=key, value=value)
+
+    @staticmethod
+    def _schema_message(
+        *,
+        subject: Subject,
+        schema: TypedSchema | None,
+        schema_id: int,
+        version: Version,
+        deleted: bool,
+        references: Sequence[Reference] | None,
+    ) -> tuple[dict[str, Any], dict[str, Any] | None]:
+        key: dict[str, Any] = {"subject": subject, "version": version.value, "magic": 1, "keytype": "SCHEMA"}
+        value: dict[str, Any] | None
         if schema:
             value = {
                 "subject": subject,
@@ -428,16 +630,16 @@ class KarapaceSchemaRegistry:
                 value["schemaType"] = schema.schema_type
         else:
             value = None
-        self.producer.send_message(key=key, value=value)
+        return key, value
 
-    def send_config_message(self, compatibility_level: CompatibilityModes, subject: Subject | None = None) -> None:
+    async def send_config_message(self, compatibility_level: CompatibilityModes, subject: Subject | None = None) -> None:
         key = {"subject": subject, "magic": 0, "keytype": "CONFIG"}
         value = {"compatibilityLevel": compatibility_level.value}
-        self.producer.send_message(key=key, value=value)
+        await self.producer.send_message(key=key, value=value)
 
-    def send_config_subject_delete_message(self, subject: Subject) -> None:
+    async def send_config_subject_delete_message(self, subject: Subject) -> None:
         key = {"subject": subject, "magic": 0, "keytype": "CONFIG"}
-        self.producer.send_message(key=key, value=None)
+        await self.producer.send_message(key=key, value=None)
 
     def resolve_references(
         self,
@@ -445,10 +647,10 @@ class KarapaceSchemaRegistry:
     ) -> tuple[Sequence[Reference], dict[str, Dependency]] | tuple[None, None]:
         return self.schema_reader.resolve_references(references) if references else (None, None)
 
-    def send_delete_subject_message(self, subject: Subject, version: Version) -> None:
+    async def send_delete_subject_message(self, subject: Subject, version: Version) -> None:
         key = {"subject": subject, "magic": 0, "keytype": "DELETE_SUBJECT"}
         value = {"subject": subject, "version": version.value}
-        self.producer.send_message(key=key, value=value)
+        await self.producer.send_message(key=key, value=value)
 
     def check_schema_compatibility(
         self,
@@ -5,6 +5,8 @@ See LICENSE for details
 from __future__ import annotations
 
 from avro.errors import SchemaParseException
+from collections import defaultdict
+from collections.abc import Awaitable, Hashable, Iterable, Iterator, Sequence
 from contextlib import AsyncExitStack
 from enum import Enum, unique
 from http import HTTPStatus
@@ -31,13 +33,14 @@ from karapace.errors import (
 )
 from karapace.karapace import HealthCheck, KarapaceBase
 from karapace.protobuf.exception import ProtobufUnresolvedDependencyException
-from karapace.rapu import HTTPRequest, HTTPResponse, JSON_CONTENT_TYPE, SERVER_NAME
+from karapace.rapu import HTTPRequest, HTTPResponse, JSON_CONTENT_TYPE, JSONArrayStream, SERVER_NAME
+from karapace.response_cache import response_tags, Tag
 from karapace.schema_models import ParsedTypedSchema, SchemaType, SchemaVersion, TypedSchema, ValidatedTypedSchema, Versioner
 from karapace.schema_references import LatestVersionReference, Reference, reference_from_mapping
 from karapace.schema_registry import KarapaceSchemaRegistry
 from karapace.typing import JsonData, JsonObject, SchemaId, Subject, Version
-from karapace.utils import JSONDecodeError
-from typing import Any
+from karapace.utils import json_encode, JSONDecodeError
+from typing import Any, Callable, cast
 
 import aiohttp
 import async_timeout
@@ -88,7 +91,12 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
         self._auth: HTTPAuthorizer | None = None
         if self.config["registry_authfile"] is not None:
-            self._auth = HTTPAuthorizer(str(self.config["registry_authfile"]))
+            self._auth = HTTPAuthorizer(
+                str(self.config["registry_authfile"]),
+                stats=self.stats,
+                credentials_cache_size=self.config["registry_authfile_cache_size"],
+                credentials_cache_ttl=self.config["registry_authfile_cache_ttl_seconds"],
+            )
             self.app.on_startup.append(self._start_authorizer)
 
         self.schema_registry = KarapaceSchemaRegistry(config)
@@ -123,6 +131,44 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
         return HealthCheck(status=resp, healthy=healthy)
 
+    def _state_generation(self) -> str:
+        """Generation of the state the cacheable routes respond from, the offset of the last record read"""
+        offset = self.schema_registry.schema_reader.offset
+        if self._auth is not None:
+            # Reloading the authfile changes what the users are authorized to see
+            return f"{offset}-{self._auth.authfile_last_modified}"
+        return str(offset)
+
+    async def _respond_cached(
+        self,
+        key: tuple[Hashable, ...],
+        tags: tuple[Tag, ...],
+        content_type: str,
+        user: User | None,
+        respond: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Responds with the serialized response cached for `key`, or caches the OK response of `respond`."""
+        if self._auth is not None:
+            # Reloading the authfile changes what the users are authorized to see
+            key += (user.username if user else None, self._auth.authfile_last_modified)
+        response_cache = self.schema_registry.response_cache
+        body = response_cache.get(key)
+        if body is None:
+            tag_versions = response_cache.tag_versions(tags)
+            try:
+                await respond()
+            except HTTPResponse as response:
+                if response.status != HTTPStatus.OK:
+                    raise
+                if isinstance(response.body, (dict, list)):
+                    body = json_encode(response.body, sort_keys=True, binary=True)
+                elif isinstance(response.body, str):
+                    body = response.body.encode("utf-8")
+                else:
+                    raise
+                response_cache.put(key, body, tag_versions)
+        raise HTTPResponse(body=body, status=HTTPStatus.OK, content_type=content_type)
+
     async def _start_schema_registry(self, app: aiohttp.web.Application) -> None:  # pylint: disable=unused-argument
         """Callback for aiohttp.Application.on_startup"""
         await self.schema_registry.start()
@@ -183,6 +229,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             with_request=True,
             json_body=False,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/config/<subject:path>",
@@ -206,6 +253,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             method="GET",
             schema_request=True,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/master_available",
@@ -228,6 +276,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             with_request=True,
             json_body=False,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/schemas/ids/<schema_id:path>/versions",
@@ -237,6 +286,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             with_request=True,
             json_body=False,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/schemas/ids/<schema_id:path>",
@@ -246,6 +296,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             with_request=True,
             json_body=False,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route("/schemas/types", callback=self.schemas_types, method="GET", schema_request=True, auth=None)
         self.route(
@@ -256,6 +307,14 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             with_request=True,
             json_body=False,
             auth=self._auth,
+            etag_generation=self._state_generation,
+        )
+        self.route(
+            "/subjects",
+            callback=self.subjects_batch_post,
+            method="POST",
+            schema_request=True,
+            auth=self._auth,
         )
         self.route(
             "/subjects/<subject:path>/versions",
@@ -279,6 +338,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             with_request=True,
             json_body=False,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/subjects/<subject:path>/versions/<version>",
@@ -288,6 +348,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             with_request=True,
             json_body=False,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/subjects/<subject:path>/versions/<version:path>",  # needs
@@ -304,6 +365,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             method="GET",
             schema_request=True,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/subjects/<subject:path>/versions/<version>/referencedby",
@@ -311,6 +373,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             method="GET",
             schema_request=True,
             auth=self._auth,
+            etag_generation=self._state_generation,
         )
         self.route(
             "/subjects/<subject:path>",
@@ -427,30 +490,53 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         latest_only = request.query.get("latestOnly", "false").lower() == "true"
 
         schemas = await self.schema_registry.schemas_list(include_deleted=deleted, latest_only=latest_only)
-        response_schemas = []
-        for subject, schema_versions in schemas.items():
-            if self._auth and not self._auth.check_authorization(user, Operation.Read, f"Subject:{subject}"):
-                continue
-            for schema_version in schema_versions:
-                response_schema = {
-                    "subject": schema_version.subject,
-                    "version": schema_version.version.value,
-                    "id": schema_version.schema_id,
-                    "schemaType": schema_version.schema.schema_type,
-                }
-                if schema_version.references:
-                    response_schema["references"] = [r.to_dict() for r in schema_version.references]
-                response_schema["schema"] = schema_version.schema.schema_str
-                response_schemas.append(response_schema)
 
+        def response_schemas() -> Iterator[JsonObject]:
+            for subject, schema_versions in schemas.items():
+                if self._auth and not self._auth.check_authorization(user, Operation.Read, f"Subject:{subject}"):
+                    continue
+                for schema_version in schema_versions:
+                    response_schema = {
+                        "subject": schema_version.subject,
+                        "version": schema_version.version.value,
+                        "id": schema_version.schema_id,
+                        "schemaType": schema_version.schema.schema_type,
+                    }
+                    if schema_version.references:
+                        response_schema["references"] = [r.to_dict() for r in schema_version.references]
+                    response_schema["schema"] = schema_version.schema.schema_str
+                    yield response_schema
+
+        # The listing holds references to the schema versions only, the entries are built and encoded while
+        # the response is streamed
         self.r(
-            body=response_schemas,
+            body=JSONArrayStream(response_schemas()),
             content_type=content_type,
             status=HTTPStatus.OK,
         )
 
     async def schemas_get(
         self, content_type: str, *, request: HTTPRequest, user: User | None = None, schema_id: str
+    ) -> None:
+        async def respond() -> None:
+            await self._schemas_get(content_type, request=request, user=user, schema_id=schema_id)
+
+        if request.query.get("fetchMaxId", "false").lower() == "true":
+            # The maximum schema id changes with every new schema
+            await respond()
+            return
+        key = (
+            "schemas_get",
+            schema_id,
+            request.query.get("includeSubjects", "false").lower(),
+            request.query.get("format", "").lower(),
+            content_type,
+        )
+        tags = response_tags(schema_ids=[SchemaId(int(schema_id))]) if schema_id.isdigit() else ()
+        await self._respond_cached(key, tags, content_type, user, respond)
+
+    async def _schemas_get(
+        self, content_type: str, *, request: HTTPRequest, user: User | None = None, schema_id: str
     ) -> None:
         try:
             parsed_schema_id = SchemaId(int(schema_id))
@@ -576,7 +662,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
         are_we_master, master_url = await self.schema_registry.get_master()
         if are_we_master:
-            self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=None)
+            await self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=None)
         elif not master_url:
             self.no_master_error(content_type)
         else:
@@ -647,7 +733,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
         are_we_master, master_url = await self.schema_registry.get_master()
         if are_we_master:
-            self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=subject)
+            await self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=subject)
         elif not master_url:
             self.no_master_error(content_type)
         else:
@@ -672,7 +758,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
         are_we_master, master_url = await self.schema_registry.get_master()
         if are_we_master:
-            self.schema_registry.send_config_subject_delete_message(subject=subject)
+            await self.schema_registry.send_config_subject_delete_message(subject=subject)
         elif not master_url:
             self.no_master_error(content_type)
         else:
@@ -713,15 +799,13 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
     async def subjects_list(self, content_type: str, *, request: HTTPRequest, user: User | None = None) -> None:
         deleted = request.query.get("deleted", "false").lower() == "true"
-        subjects = self.schema_registry.database.find_subjects(include_deleted=deleted)
+        subjects: Iterable[Subject] = self.schema_registry.database.find_subjects(include_deleted=deleted)
         if self._auth is not None:
-            subjects = list(
-                filter(
-                    lambda subject: self._auth.check_authorization(user, Operation.Read, f"Subject:{subject}"),
-                    subjects,
-                )
+            subjects = filter(
+                lambda subject: self._auth.check_authorization(user, Operation.Read, f"Subject:{subject}"),
+                subjects,
             )
-        self.r(subjects, content_type, status=HTTPStatus.OK)
+        self.r(JSONArrayStream(subjects), content_type, status=HTTPStatus.OK)
 
     async def subject_delete(
         self, content_type: str, *, subject: str, request: HTTPRequest, user: User | None = None
@@ -783,6 +867,15 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
     async def subject_version_get(
         self, content_type: str, *, subject: str, version: str, request: HTTPRequest, user: User | None = None
+    ) -> None:
+        async def respond() -> None:
+            await self._subject_version_get(content_type, subject=subject, version=version, request=request, user=user)
+
+        key = ("subject_version_get", subject, version, request.query.get("deleted", "false").lower(), content_type)
+        await self._respond_cached(key, response_tags(subjects=[Subject(subject)]), content_type, user, respond)
+
+    async def _subject_version_get(
+        self, content_type: str, *, subject: str, version: str, request: HTTPRequest, user: User | None = None
     ) -> None:
         self._check_authorization(user, Operation.Read, f"Subject:{subject}")
 
@@ -890,6 +983,15 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
     async def subject_version_schema_get(
         self, content_type: str, *, subject: str, version: str, user: User | None = None
+    ) -> None:
+        async def respond() -> None:
+            await self._subject_version_schema_get(content_type, subject=subject, version=version, user=user)
+
+        key = ("subject_version_schema_get", subject, version, content_type)
+        await self._respond_cached(key, response_tags(subjects=[Subject(subject)]), content_type, user, respond)
+
+    async def _subject_version_schema_get(
+        self, content_type: str, *, subject: str, version: str, user: User | None = None
     ) -> None:
         self._check_authorization(user, Operation.Read, f"Subject:{subject}")
 
@@ -1144,9 +1246,8 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         for schema_version in sorted(subject_data.values(), key=lambda item: item.version, reverse=True):
             other_references, other_dependencies = self.schema_registry.resolve_references(schema_version.references)
             try:
-                parsed_typed_schema = ParsedTypedSchema.parse(
-                    schema_version.schema.schema_type,
-                    schema_version.schema.schema_str,
+                parsed_typed_schema = self.schema_registry.parsed_schema_cache.parse(
+                    schema_version.schema,
                     references=other_references,
                     dependencies=other_dependencies,
                     normalize=normalize,
@@ -1206,36 +1307,8 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         self.log.debug("POST with subject: %r, request: %r", subject, body)
         self._validate_subject(content_type, subject)
         self._validate_schema_request_body(content_type, body)
-        schema_type = self._validate_schema_type(content_type, body)
-        self._validate_schema_key(content_type, body)
         normalize = request.query.get("normalize", "false").lower() == "true"
-        references = self._validate_references(content_type, schema_type, body)
-
-        try:
-            references, resolved_dependencies = self.schema_registry.resolve_references(references)
-            new_schema = ValidatedTypedSchema.parse(
-                schema_type=schema_type,
-                schema_str=body["schema"],
-                references=references,
-                dependencies=resolved_dependencies,
-                normalize=normalize,
-                use_protobuf_formatter=self.config["use_protobuf_formatter"],
-            )
-        except (InvalidReferences, InvalidSchema, InvalidSchemaType) as e:
-            self.log.warning("Invalid schema: %r", body["schema"], exc_info=True)
-            if isinstance(e.__cause__, (SchemaParseException, JSONDecodeError, ProtobufUnresolvedDependencyException)):
-                human_error = f"{e.__cause__.args[0]}"  # pylint: disable=no-member
-            else:
-                from_body_schema_str = body["schema"]
-                human_error = f"Invalid schema {from_body_schema_str} with refs {references} of type {schema_type}"
-            self.r(
-                body={
-                    "error_code": SchemaErrorCodes.INVALID_SCHEMA.value,
-                    "message": f"Invalid {schema_type.value} schema. Error: {human_error}",
-                },
-                content_type=content_type,
-                status=HTTPStatus.UNPROCESSABLE_ENTITY,
-            )
+        schema_type, new_schema, references = self._parse_new_schema(content_type, body, normalize=normalize)
 
         schema_id = self.get_schema_id_if_exists(subject=subject, schema=new_schema, include_deleted=False)
         if schema_id is not None:
@@ -1285,6 +1358,213 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             url = f"{master_url}/subjects/{subject}/versions"
             await self._forward_request_remote(request=request, body=body, url=url, content_type=content_type, method="POST")
 
+    def _parse_new_schema(
+        self, content_type: str, body: dict, *, normalize: bool
+    ) -> tuple[SchemaType, ValidatedTypedSchema, list[Reference] | None]:
+        schema_type = self._validate_schema_type(content_type, body)
+        self._validate_schema_key(content_type, body)
+        references = self._validate_references(content_type, schema_type, body)
+
+        try:
+            references, resolved_dependencies = self.schema_registry.resolve_references(references)
+            new_schema = ValidatedTypedSchema.parse(
+                schema_type=schema_type,
+                schema_str=body["schema"],
+                references=references,
+                dependencies=resolved_dependencies,
+                normalize=normalize,
+                use_protobuf_formatter=self.config["use_protobuf_formatter"],
+            )
+        except (InvalidReferences, InvalidSchema, InvalidSchemaType) as e:
+            self.log.warning("Invalid schema: %r", body["schema"], exc_info=True)
+            if isinstance(e.__cause__, (SchemaParseException, JSONDecodeError, ProtobufUnresolvedDependencyException)):
+                human_error = f"{e.__cause__.args[0]}"  # pylint: disable=no-member
+            else:
+                from_body_schema_str = body["schema"]
+                human_error = f"Invalid schema {from_body_schema_str} with refs {references} of type {schema_type}"
+            self.r(
+                body={
+                    "error_code": SchemaErrorCodes.INVALID_SCHEMA.value,
+                    "message": f"Invalid {schema_type.value} schema. Error: {human_error}",
+                },
+                content_type=content_type,
+                status=HTTPStatus.UNPROCESSABLE_ENTITY,
+            )
+        return schema_type, new_schema, references
+
+    async def subjects_batch_post(self, content_type: str, *, request: HTTPRequest, user: User | None = None) -> None:
+        """Register a batch of schemas, the response has the id or the error of each entry in order.
+
+        An entry referencing a subject registered in the same batch is registered after it,
+        each round of dependent entries is written with a single flush.
+        """
+        body = request.json
+        if not isinstance(body, dict) or not isinstance(body.get("schemas"), list):
+            self.r(
+                body={
+                    "error_code": SchemaErrorCodes.HTTP_BAD_REQUEST.value,
+                    "message": "Malformed request, expected array of `schemas`",
+                },
+                content_type=content_type,
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        entries = body["schemas"]
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("subject"), str):
+                self.r(
+                    body={
+                        "error_code": SchemaErrorCodes.HTTP_BAD_REQUEST.value,
+                        "message": "Malformed request, every entry of `schemas` needs a `subject`",
+                    },
+                    content_type=content_type,
+                    status=HTTPStatus.BAD_REQUEST,
+                )
+            self._check_authorization(user, Operation.Write, f"Subject:{entry['subject']}")
+
+        are_we_master, master_url = await self.schema_registry.get_master()
+        if not are_we_master:
+            if not master_url:
+                self.no_master_error(content_type)
+            url = f"{master_url}/subjects"
+            await self._forward_request_remote(request=request, body=body, url=url, content_type=content_type, method="POST")
+
+        normalize = request.query.get("normalize", "false").lower() == "true"
+        results: list[JsonObject | None] = [None] * len(entries)
+        dependencies = self._batch_dependencies(entries)
+        for batch_round in self._batch_rounds(entries, dependencies, results):
+            new_schemas: list[tuple[Subject, ValidatedTypedSchema, Sequence[Reference] | None]] = []
+            indexes: list[int] = []
+            schema_types: list[SchemaType] = []
+            for index in batch_round:
+                entry = entries[index]
+                failed_subjects = [
+                    entries[dependency]["subject"]
+                    for dependency in dependencies[index]
+                    if "error_code" in (results[dependency] or {})
+                ]
+                if failed_subjects:
+                    results[index] = {
+                        "error_code": SchemaErrorCodes.INVALID_SCHEMA.value,
+                        "message": f"Referenced schema of subject {failed_subjects[0]} was not registered",
+                    }
+                    continue
+                try:
+                    self._validate_subject(content_type, entry["subject"])
+                    self._validate_schema_request_body(content_type, {k: v for k, v in entry.items() if k != "subject"})
+                    schema_type, new_schema, references = self._parse_new_schema(content_type, entry, normalize=normalize)
+                except HTTPResponse as e:
+                    results[index] = e.json
+                    continue
+                except InvalidReferences:
+                    results[index] = {
+                        "error_code": SchemaErrorCodes.INVALID_SCHEMA.value,
+                        "message": "Provided references is not valid",
+                    }
+                    continue
+                new_schemas.append((Subject(entry["subject"]), new_schema, references))
+                indexes.append(index)
+                schema_types.append(schema_type)
+
+            if not new_schemas:
+                continue
+            written = await self.schema_registry.write_new_schemas_local(new_schemas)
+            for index, schema_type, result in zip(indexes, schema_types, written):
+                results[index] = self._batch_result(schema_type, result)
+
+        self.r(body=results, content_type=content_type)
+
+    @staticmethod
+    def _batch_dependencies(entries: list[dict]) -> list[list[int]]:
+        """Indexes of the other entries registering a subject referenced by each entry"""
+        indexes_of_subject: defaultdict[str, list[int]] = defaultdict(list)
+        for index, entry in enumerate(entries):
+            indexes_of_subject[entry["subject"]].append(index)
+
+        dependencies: list[list[int]] = []
+        for index, entry in enumerate(entries):
+            references = entry.get("references")
+            if not isinstance(references, list):
+                dependencies.append([])
+                continue
+            referenced_subjects = {
+                reference.get("subject")
+                for reference in references
+                if isinstance(reference, dict) and isinstance(reference.get("subject"), str)
+            }
+            dependencies.append(
+                sorted(
+                    other
+                    for subject in referenced_subjects
+                    for other in indexes_of_subject.get(subject, [])
+                    if other != index
+                )
+            )
+        return dependencies
+
+    @staticmethod
+    def _batch_rounds(
+        entries: list[dict], dependencies: list[list[int]], results: list[JsonObject | None]
+    ) -> list[list[int]]:
+        """Group the entries so that each entry is registered after the entries it references.
+
+        Entries in a reference cycle cannot be registered, their result is set to an error.
+        """
+        # Depth-first walk of the references, without recursion as a batch may hold a long chain of references
+        rounds: dict[int, int | None] = {}
+        for start in range(len(entries)):
+            if start in rounds:
+                continue
+            path = [start]
+            on_path = {start}
+            pending = [iter(dependencies[start])]
+            while path:
+                dependency = next(pending[-1], None)
+                if dependency is None:
+                    index = path.pop()
+                    on_path.discard(index)
+                    pending.pop()
+                    # A dependency without a round is either in a cycle with this entry or depends on one
+                    dependency_rounds = [rounds.get(other) for other in dependencies[index]]
+                    if None in dependency_rounds:
+                        rounds[index] = None
+                    else:
+                        rounds[index] = max((cast(int, r) + 1 for r in dependency_rounds), default=0)
+                elif dependency not in rounds and dependency not in on_path:
+                    path.append(dependency)
+                    on_path.add(dependency)
+                    pending.append(iter(dependencies[dependency]))
+
+        grouped: list[list[int]] = []
+        for index, entry in enumerate(entries):
+            entry_round = rounds[index]
+            if entry_round is None:
+                results[index] = {
+                    "error_code": SchemaErrorCodes.INVALID_SCHEMA.value,
+                    "message": f"Circular reference between the schemas of subject {entry['subject']}",
+                }
+                continue
+            while len(grouped) <= entry_round:
+                grouped.append([])
+            grouped[entry_round].append(index)
+        return grouped
+
+    @staticmethod
+    def _batch_result(schema_type: SchemaType, result: SchemaId | Exception) -> JsonObject:
+        if isinstance(result, IncompatibleSchema):
+            return {"error_code": SchemaErrorCodes.HTTP_CONFLICT.value, "message": str(result)}
+        if isinstance(result, InvalidSchema):
+            return {
+                "error_code": SchemaErrorCodes.INVALID_SCHEMA.value,
+                "message": f"Invalid {schema_type.value} schema. Error: {str(result)}",
+            }
+        if isinstance(result, InvalidReferences):
+            return {"error_code": SchemaErrorCodes.INVALID_SCHEMA.value, "message": "Provided references is not valid"}
+        if isinstance(result, SchemaTooLargeException):
+            return {"error_code": SchemaErrorCodes.SCHEMA_TOO_LARGE_ERROR_CODE.value, "message": "Schema is too large"}
+        if isinstance(result, Exception):
+            return {"error_code": SchemaErrorCodes.HTTP_INTERNAL_SERVER_ERROR.value, "message": str(result)}
+        return {"id": result}
+
     async def get_global_mode(
         self,
         content_type: str,
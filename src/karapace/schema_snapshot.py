@@ -0,0 +1,253 @@
+"""
+karapace - Snapshot of the schema registry state
+
+The schema reader periodically writes the state of the in memory database
+together with the offset of the last consumed record of the schemas topic.
+On restart the snapshot is restored and only the records after that offset
+are consumed, instead of replaying and parsing the whole topic.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from karapace.dependency import Dependency
+from karapace.errors import InvalidSchema, InvalidSnapshot
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.key_format import KeyMode
+from karapace.schema_models import ParsedSchemaCache, SchemaType, TypedSchema, ValidatedTypedSchema
+from karapace.schema_references import Reference
+from karapace.typing import JsonObject, SchemaId, Subject, Version
+from karapace.utils import json_decode, json_encode, JSONDecodeError
+from pathlib import Path
+from typing import Any, cast, Final
+
+import hashlib
+import logging
+import os
+
+LOG = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION: Final = 1
+
+
+@dataclass(frozen=True)
+class SchemaSnapshot:
+    topic_name: str
+    offset: int
+    compatibility: str
+    keymode: KeyMode
+    payload: dict[str, Any]
+
+
+def create_snapshot(
+    database: InMemoryDatabase,
+    *,
+    topic_name: str,
+    offset: int,
+    compatibility: str,
+    keymode: KeyMode,
+) -> SchemaSnapshot:
+    """Snapshot the database state after consuming the record at `offset`.
+
+    Schemas are stored once and ordered so that referenced schemas come before
+    the schemas referencing them.
+    """
+    schema_indexes: dict[int, int] = {}
+    schemas: list[JsonObject] = []
+
+    def add_schema(schema: TypedSchema) -> int:
+        index = schema_indexes.get(id(schema))
+        if index is not None:
+            return index
+        for reference in schema.references or []:
+            referenced_version = database.find_subject_schemas(subject=reference.subject, include_deleted=True).get(
+                reference.version
+            )
+            if referenced_version is None:
+                raise InvalidSnapshot(f"Referenced version {reference.subject}:{reference.version} does not exist")
+            add_schema(referenced_version.schema)
+        schema_indexes[id(schema)] = len(schemas)
+        schemas.append(
+            {
+                "schemaType": schema.schema_type.value,
+                "schema": schema.schema_str,
+                "references": [reference.to_dict() for reference in schema.references] if schema.references else None,
+            }
+        )
+        return schema_indexes[id(schema)]
+
+    with database.schema_lock_thread:
+        schema_ids = [[schema_id, add_schema(schema)] for schema_id, schema in database.schemas.items()]
+        subjects = [
+            {
+                "subject": subject,
+                "compatibility": subject_data.compatibility,
+                "versions": [
+                    [version.value, schema_version.schema_id, add_schema(schema_version.schema), schema_version.deleted]
+                    for version, schema_version in subject_data.schemas.items()
+                ],
+            }
+            for subject, subject_data in database.subjects.items()
+        ]
+        referenced_by = [
+            [subject, version.value, list(referents)]
+            for (subject, version), referents in database.referenced_by.items()
+            if referents
+        ]
+        global_schema_id = database.global_schema_id
+
+    return SchemaSnapshot(
+        topic_name=topic_name,
+        offset=offset,
+        compatibility=compatibility,
+        keymode=keymode,
+        payload={
+            "topic_name": topic_name,
+            "offset": offset,
+            "compatibility": compatibility,
+            "keymode": keymode.value,
+            "global_schema_id": global_schema_id,
+            "schemas": schemas,
+            "schema_ids": schema_ids,
+            "subjects": subjects,
+            "referenced_by": referenced_by,
+        },
+    )
+
+
+def write_snapshot(path: Path, snapshot: SchemaSnapshot) -> None:
+    """Atomically replace the snapshot file.
+
+    The file has a header line with the format version and the checksum of the payload,
+    followed by the payload.
+    """
+    payload = json_encode(snapshot.payload, binary=True, compact=True)
+    header = json_encode(
+        {"format": SNAPSHOT_FORMAT_VERSION, "checksum": hashlib.sha256(payload).hexdigest()},
+        binary=True,
+        compact=True,
+    )
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("wb") as fp:
+        fp.write(header + b"\n" + payload)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: Path) -> SchemaSnapshot:
+    """Read and verify the snapshot file, raises `InvalidSnapshot` if it is missing or corrupt."""
+    try:
+        content = path.read_bytes()
+    except OSError as e:
+        raise InvalidSnapshot(f"Snapshot {path} can not be read: {e}") from e
+
+    header_bytes, _, payload_bytes = content.partition(b"\n")
+    try:
+        header = json_decode(header_bytes, dict[str, Any])
+        if header.get("format") != SNAPSHOT_FORMAT_VERSION:
+            raise InvalidSnapshot(f"Unsupported snapshot format {header.get('format')!r}")
+        if header.get("checksum") != hashlib.sha256(payload_bytes).hexdigest():
+            raise InvalidSnapshot("Snapshot checksum does not match")
+        payload = json_decode(payload_bytes, dict[str, Any])
+        return SchemaSnapshot(
+            topic_name=payload["topic_name"],
+            offset=payload["offset"],
+            compatibility=payload["compatibility"],
+            keymode=KeyMode(payload["keymode"]),
+            payload=payload,
+        )
+    except (AttributeError, JSONDecodeError, KeyError, TypeError, UnicodeDecodeError, ValueError) as e:
+        raise InvalidSnapshot(f"Snapshot {path} is corrupt: {e}") from e
+
+
+def restore_snapshot(
+    snapshot: SchemaSnapshot,
+    database: InMemoryDatabase,
+    parsed_schema_cache: ParsedSchemaCache,
+) -> None:
+    """Insert the snapshot state into an empty database.
+
+    Only the referenced schemas are parsed, to resolve the dependencies of the schemas
+    referencing them. The database is modified only if the whole snapshot is valid.
+    """
+    payload = snapshot.payload
+    try:
+        subject_versions: dict[tuple[Subject, Version], int] = {
+            (Subject(subject_data["subject"]), Version(version)): schema_index
+            for subject_data in payload["subjects"]
+            for version, _, schema_index, _ in subject_data["versions"]
+        }
+
+        schemas: list[TypedSchema] = []
+        for schema_data in payload["schemas"]:
+            references = (
+                [Reference.from_dict(reference) for reference in schema_data["references"]]
+                if schema_data["references"]
+                else None
+            )
+            dependencies: dict[str, Dependency] | None = None
+            if references:
+                dependencies = {}
+                for reference in references:
+                    referenced_schema = schemas[subject_versions[(reference.subject, reference.version)]]
+                    validated_schema = parsed_schema_cache.parse(
+                        referenced_schema,
+                        references=referenced_schema.references,
+                        dependencies=referenced_schema.dependencies,
+                        validate=True,
+                    )
+                    dependencies[reference.name] = Dependency.of(reference, cast(ValidatedTypedSchema, validated_schema))
+            schemas.append(
+                TypedSchema(
+                    schema_type=SchemaType(schema_data["schemaType"]),
+                    schema_str=schema_data["schema"],
+                    references=references,
+                    dependencies=dependencies,
+                    parsed_schema_cache=parsed_schema_cache,
+                    schema_str_normalized=True,
+                )
+            )
+
+        schema_ids = [(SchemaId(schema_id), schemas[schema_index]) for schema_id, schema_index in payload["schema_ids"]]
+        subjects = [
+            (
+                Subject(subject_data["subject"]),
+                subject_data["compatibility"],
+                [
+                    (Version(version), SchemaId(schema_id), schemas[schema_index], bool(deleted))
+                    for version, schema_id, schema_index, deleted in subject_data["versions"]
+                ],
+            )
+            for subject_data in payload["subjects"]
+        ]
+        referenced_by = [
+            (Subject(subject), Version(version), [SchemaId(schema_id) for schema_id in referents])
+            for subject, version, referents in payload["referenced_by"]
+        ]
+        global_schema_id = SchemaId(payload["global_schema_id"])
+    except (IndexError, InvalidSchema, KeyError, TypeError, ValueError) as e:
+        raise InvalidSnapshot(f"Snapshot content is invalid: {e}") from e
+
+    with database.bulk_load():
+        for schema_id, schema in schema_ids:
+            database.insert_schema(schema_id=schema_id, schema=schema)
+        for subject, compatibility, versions in subjects:
+            database.insert_subject(subject=subject)
+            for version, schema_id, schema, deleted in versions:
+                database.insert_schema_version(
+                    subject=subject,
+                    schema_id=schema_id,
+                    version=version,
+                    deleted=deleted,
+                    schema=schema,
+                    references=schema.references,
+                )
+            if compatibility is not None:
+                database.set_subject_compatibility(subject=subject, compatibility=compatibility)
+        for subject, version, referents in referenced_by:
+            for schema_id in referents:
+                database.insert_referenced_by(subject=subject, version=version, schema_id=schema_id)
+        database.global_schema_id = max(database.global_schema_id, global_schema_id)
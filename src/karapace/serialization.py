@@ -8,12 +8,15 @@ from aiohttp import BasicAuth
 from avro.io import BinaryDecoder, BinaryEncoder, DatumReader, DatumWriter
 from cachetools import TTLCache
 from collections.abc import MutableMapping
-from functools import lru_cache
+from concurrent.futures import Executor, ThreadPoolExecutor
 from google.protobuf.message import DecodeError
-from jsonschema import ValidationError
+from jsonschema import Draft7Validator, ValidationError
+from karapace.async_cache import AsyncTTLCache
+from karapace.avro_compiler import compile_decoder, compile_encoder, union_branch_name
 from karapace.client import Client
 from karapace.dependency import Dependency
 from karapace.errors import InvalidReferences
+from karapace.jsonschema_compiler import compile_validator
 from karapace.protobuf.exception import ProtobufTypeException
 from karapace.protobuf.io import ProtobufDatumReader, ProtobufDatumWriter
 from karapace.protobuf.schema import ProtobufSchema
@@ -33,6 +36,8 @@ import struct
 START_BYTE = 0x0
 HEADER_FORMAT = ">bI"
 HEADER_SIZE = 5
+REGISTRY_CLIENT_CACHE_MAXSIZE = 1000
+REGISTRY_CLIENT_CACHE_TTL = 300
 
 
 class DeserializationError(Exception):
@@ -110,9 +115,17 @@ class SchemaRegistryClient:
         schema_registry_url: str = "http://localhost:8081",
         server_ca: str | None = None,
         session_auth: BasicAuth | None = None,
+        cache_maxsize: int = REGISTRY_CLIENT_CACHE_MAXSIZE,
+        cache_ttl: float = REGISTRY_CLIENT_CACHE_TTL,
     ):
         self.client = Client(server_uri=schema_registry_url, server_ca=server_ca, session_auth=session_auth)
         self.base_url = schema_registry_url
+        self.schema_cache: AsyncTTLCache[
+            tuple[Subject, Version | None], tuple[SchemaId, ValidatedTypedSchema, Version]
+        ] = AsyncTTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        self.schema_for_id_cache: AsyncTTLCache[SchemaId, tuple[TypedSchema, list[Subject]]] = AsyncTTLCache(
+            maxsize=cache_maxsize, ttl=cache_ttl
+        )
 
     async def post_new_schema(
         self, subject: str, schema: ValidatedTypedSchema, references: Reference | None = None
@@ -180,7 +193,6 @@ class SchemaRegistryClient:
         except InvalidSchema as e:
             raise SchemaRetrievalError(f"Failed to parse schema string from response: {json_result}") from e
 
-    @lru_cache(maxsize=100)
     async def get_schema(
         self,
         subject: Subject,
@@ -189,6 +201,8 @@ class SchemaRegistryClient:
         """
         Retrieves the schema and its dependencies for the specified subject.
 
+        The result is cached for `cache_ttl` seconds, the latest version included.
+
         Args:
             subject (Subject): The subject for which to retrieve the schema.
             version (Optional[Version]): The specific version of the schema to retrieve.
@@ -200,9 +214,18 @@ class SchemaRegistryClient:
                 - ValidatedTypedSchema: The retrieved schema, validated and typed.
                 - Version: The version of the schema that was retrieved.
         """
-        return await self._get_schema_recursive(subject, set(), version)
+        return await self.schema_cache.get((subject, version), lambda: self._get_schema_recursive(subject, set(), version))
 
-    async def get_schema_for_id(self, schema_id: SchemaId) -> tuple[TypedSchema, list[Subject]]:
+    async def get_schema_for_id(self, schema_id: SchemaId, *, refresh: bool = False) -> tuple[TypedSchema, list[Subject]]:
+        """Retrieves the schema with `schema_id` and the subjects using it, cached for `cache_ttl` seconds.
+
+        `refresh` bypasses the cached result, e.g. when the subjects of the schema are outdated.
+        """
+        if refresh:
+            self.schema_for_id_cache.pop(schema_id)
+        return await self.schema_for_id_cache.get(schema_id, lambda: self._get_schema_for_id(schema_id))
+
+    async def _get_schema_for_id(self, schema_id: SchemaId) -> tuple[TypedSchema, list[Subject]]:
         result = await self.client.get(f"schemas/ids/{schema_id}", params={"includeSubjects": "True"})
         if not result.ok:
             raise SchemaRetrievalError(result.json()["message"])
@@ -248,6 +271,8 @@ class SchemaRegistryClient:
             raise SchemaRetrievalError(f"Failed to parse schema string from response: {json_result}") from e
 
     async def close(self):
+        self.schema_cache.clear()
+        self.schema_for_id_cache.clear()
         await self.client.close()
 
 
@@ -296,13 +321,31 @@ class SchemaRegistrySerializer:
             registry_client = SchemaRegistryClient(registry_url, session_auth=session_auth)
         self.registry_client: SchemaRegistryClient | None = registry_client
         self.ids_to_schemas: dict[int, TypedSchema] = {}
+        self.ids_to_avro_codecs: dict[int, AvroCodec | CompiledAvroCodec] = {}
+        self.ids_to_json_schema_validators: dict[int, JsonSchemaValidator] = {}
         self.ids_to_subjects: MutableMapping[int, list[Subject]] = TTLCache(maxsize=10000, ttl=600)
         self.schemas_to_ids: dict[str, SchemaId] = {}
+        self._serialization_executor: ThreadPoolExecutor | None = None
 
     async def close(self) -> None:
         if self.registry_client:
             await self.registry_client.close()
             self.registry_client = None
+        if self._serialization_executor is not None:
+            self._serialization_executor.shutdown(wait=False)
+            self._serialization_executor = None
+
+    def serialization_executor(self) -> Executor | None:
+        """Executor for serializing large batches of records off the event loop, shared by all the users.
+
+        `None` if `rest_serialization_workers` is not positive.
+        """
+        workers = self.config.get("rest_serialization_workers", 0)
+        if workers <= 0:
+            return None
+        if self._serialization_executor is None:
+            self._serialization_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rest-serialize")
+        return self._serialization_executor
 
     async def get_schema_for_subject(self, subject: Subject) -> TypedSchema:
         assert self.registry_client, "must not call this method after the object is closed."
@@ -339,8 +382,10 @@ class SchemaRegistrySerializer:
         if schema_id in self.ids_to_subjects:
             if need_new_call is None or not need_new_call(self.ids_to_schemas[schema_id], self.ids_to_subjects[schema_id]):
                 return self.ids_to_schemas[schema_id], self.ids_to_subjects[schema_id]
+            schema_typed, subjects = await self.registry_client.get_schema_for_id(schema_id, refresh=True)
+        else:
+            schema_typed, subjects = await self.registry_client.get_schema_for_id(schema_id)
 
-        schema_typed, subjects = await self.registry_client.get_schema_for_id(schema_id)
         schema_ser = str(schema_typed)
         async with self.state_lock:
             # todo: get rid of the schema caching and use the same caching used in UserRestProxy
@@ -349,12 +394,41 @@ class SchemaRegistrySerializer:
             self.ids_to_subjects[schema_id] = subjects
         return schema_typed, subjects
 
+    def _get_avro_codec(self, schema_id: SchemaId, schema: TypedSchema) -> AvroCodec | CompiledAvroCodec | None:
+        if schema.schema_type is not SchemaType.AVRO:
+            return None
+        codec = self.ids_to_avro_codecs.get(schema_id)
+        if codec is None:
+            codec = CompiledAvroCodec(schema.schema) if self.config.get("avro_compiled_codec") else AvroCodec(schema.schema)
+            self.ids_to_avro_codecs[schema_id] = codec
+        return codec
+
+    def _get_json_schema_validator(self, schema_id: SchemaId, schema: TypedSchema) -> JsonSchemaValidator | None:
+        if schema.schema_type is not SchemaType.JSONSCHEMA:
+            return None
+        validator = self.ids_to_json_schema_validators.get(schema_id)
+        if validator is None:
+            validator = JsonSchemaValidator(schema.schema)
+            self.ids_to_json_schema_validators[schema_id] = validator
+        return validator
+
     async def serialize(self, schema: TypedSchema, value: dict) -> bytes:
+        return self.serialize_sync(schema, value)
+
+    def serialize_sync(self, schema: TypedSchema, value: dict) -> bytes:
+        """Serializes with a schema already known to the serializer, can be called from the `serialization_executor`."""
         schema_id = self.schemas_to_ids[str(schema)]
         with io.BytesIO() as bio:
             bio.write(struct.pack(HEADER_FORMAT, START_BYTE, schema_id))
             try:
-                write_value(self.config, schema, bio, value)
+                write_value(
+                    self.config,
+                    schema,
+                    bio,
+                    value,
+                    avro_codec=self._get_avro_codec(schema_id, schema),
+                    json_schema_validator=self._get_json_schema_validator(schema_id, schema),
+                )
                 return bio.getvalue()
             except ProtobufTypeException as e:
                 raise InvalidMessageSchema("Object does not fit to stored schema") from e
@@ -372,7 +446,13 @@ class SchemaRegistrySerializer:
                 schema, _ = await self.get_schema_for_id(schema_id)
                 if schema is None:
                     raise InvalidPayload("No schema with ID from payload")
-                ret_val = read_value(self.config, schema, bio)
+                ret_val = read_value(
+                    self.config,
+                    schema,
+                    bio,
+                    avro_codec=self._get_avro_codec(schema_id, schema),
+                    json_schema_validator=self._get_json_schema_validator(schema_id, schema),
+                )
                 return ret_val
             except (UnicodeDecodeError, TypeError, avro.errors.InvalidAvroBinaryEncoding) as e:
                 raise InvalidPayload("Data does not contain a valid message") from e
@@ -419,19 +499,11 @@ def flatten_unions(schema: avro.schema.Schema, value: Any) -> Any:
         return result
 
     if isinstance(schema, avro.schema.UnionSchema) and isinstance(value, dict):
-
-        def get_name(obj) -> str:
-            if isinstance(obj, avro.schema.PrimitiveSchema):
-                return obj.fullname
-            if isinstance(obj, (avro.schema.ArraySchema, avro.schema.MapSchema)):
-                return obj.type
-            return obj.name
-
-        f = next((s for s in schema.schemas if get_name(s) in value), None)
+        f = next((s for s in schema.schemas if union_branch_name(s) in value), None)
         if f is not None:
             # Note: This is intentionally skipping the dictionary, here the JSON representation
             # is flattened to the Python representation
-            return flatten_unions(f, value[get_name(f)])
+            return flatten_unions(f, value[union_branch_name(f)])
 
     if isinstance(schema, avro.schema.ArraySchema) and isinstance(value, list):
         return [flatten_unions(schema.items, v) for v in value]
@@ -442,14 +514,119 @@ def flatten_unions(schema: avro.schema.Schema, value: Any) -> Any:
     return value
 
 
-def read_value(config: dict, schema: TypedSchema, bio: io.BytesIO):
+def _union_branch(schema: avro.schema.UnionSchema, datum: Any) -> int | None:
+    """Index of the union branch of the datum, or None if the datum matches no branch.
+
+    Only the top level of the datum is checked, the rest is checked while it is written. The whole
+    datum is validated only if several branches match, in that case the last valid branch is used
+    as in `DatumWriter.write_union`.
+    """
+    candidates = [index for index, branch in enumerate(schema.schemas) if branch.validate(datum) is not None]
+    if len(candidates) == 1:
+        return candidates[0]
+    return next((index for index in reversed(candidates) if avro.io.validate(schema.schemas[index], datum)), None)
+
+
+class _ValidatingDatumWriter(DatumWriter):
+    """Avro writer validating the datum while it is written, instead of in a separate pass over the whole datum."""
+
+    def write(self, datum: object, encoder: BinaryEncoder) -> None:
+        self.write_data(self.writers_schema, datum, encoder)
+
+    def write_data(self, writers_schema: avro.schema.Schema, datum: object, encoder: BinaryEncoder) -> None:
+        if not isinstance(writers_schema, avro.schema.UnionSchema) and writers_schema.validate(datum) is None:
+            raise avro.errors.AvroTypeException(writers_schema, datum)
+        super().write_data(writers_schema, datum, encoder)
+
+    def write_union(self, writers_schema: avro.schema.UnionSchema, datum: object, encoder: BinaryEncoder) -> None:
+        index = _union_branch(writers_schema, datum)
+        if index is None:
+            raise avro.errors.AvroTypeException(writers_schema, datum)
+
+        encoder.write_long(index)
+        self.write_data(writers_schema.schemas[index], datum, encoder)
+
+
+class AvroCodec:
+    """Avro writer and reader of a schema, reused for all the records of the schema.
+
+    As before the writer validated the data, the data is written as is if it is valid as a whole,
+    otherwise all its tagged unions are flattened with `flatten_unions` and it is written again.
+    """
+
+    def __init__(self, schema: avro.schema.Schema) -> None:
+        self._schema = schema
+        self._writer = _ValidatingDatumWriter(schema)
+        self._reader = DatumReader(writers_schema=schema)
+
+    def write(self, bio: io.BytesIO, value: Any) -> None:
+        start = bio.tell()
+        try:
+            self._writer.write(value, BinaryEncoder(bio))
+        except avro.errors.AvroTypeException:
+            bio.seek(start)
+            bio.truncate()
+            self._writer.write(flatten_unions(self._schema, value), BinaryEncoder(bio))
+
+    def read(self, bio: io.BytesIO) -> Any:
+        return self._reader.read(BinaryDecoder(bio))
+
+
+class CompiledAvroCodec:
+    """Avro codec with the encoder and the decoder compiled from the schema.
+
+    Writes and reads the same data as `AvroCodec`, also flattening the tagged unions of data
+    which is not valid as is.
+    """
+
+    def __init__(self, schema: avro.schema.Schema) -> None:
+        self._schema = schema
+        self._encoder = compile_encoder(schema)
+        self._decoder = compile_decoder(schema)
+
+    def write(self, bio: io.BytesIO, value: Any) -> None:
+        try:
+            encoded = self._encoder(value)
+        except avro.errors.AvroTypeException:
+            encoded = self._encoder(flatten_unions(self._schema, value))
+        bio.write(encoded)
+
+    def read(self, bio: io.BytesIO) -> Any:
+        value, end = self._decoder(bio.getvalue(), bio.tell())
+        bio.seek(end)
+        return value
+
+
+class JsonSchemaValidator:
+    """Validator of JSON Schema instances with the schema compiled by `karapace.jsonschema_compiler`.
+
+    The `Draft7Validator` validates the instances of schemas which can not be compiled, and
+    reports the errors of invalid instances.
+    """
+
+    def __init__(self, validator: Draft7Validator) -> None:
+        self._validator = validator
+        self._is_valid = compile_validator(validator)
+
+    def validate(self, value: Any) -> None:
+        if self._is_valid is None or not self._is_valid(value):
+            self._validator.validate(value)
+
+
+def read_value(
+    config: dict,
+    schema: TypedSchema,
+    bio: io.BytesIO,
+    *,
+    avro_codec: AvroCodec | CompiledAvroCodec | None = None,
+    json_schema_validator: JsonSchemaValidator | None = None,
+):
     if schema.schema_type is SchemaType.AVRO:
-        reader = DatumReader(writers_schema=schema.schema)
-        return reader.read(BinaryDecoder(bio))
+        return (avro_codec or AvroCodec(schema.schema)).read(bio)
     if schema.schema_type is SchemaType.JSONSCHEMA:
         value = json_decode(bio)
         try:
-            schema.schema.validate(value)
+            (json_schema_validator or schema.schema).validate(value)
         except ValidationError as e:
             raise InvalidPayload from e
         return value
@@ -464,19 +641,21 @@ def read_value(config: dict, schema: TypedSchema, bio: io.BytesIO):
     raise ValueError("Unknown schema type")
 
 
-def write_value(config: dict, schema: TypedSchema, bio: io.BytesIO, value: dict) -> None:
+def write_value(
+    config: dict,
+    schema: TypedSchema,
+    bio: io.BytesIO,
+    value: dict,
+    *,
+    avro_codec: AvroCodec | CompiledAvroCodec | None = None,
+    json_schema_validator: JsonSchemaValidator | None = None,
+) -> None:
     if schema.schema_type is SchemaType.AVRO:
         # Backwards compatibility: Support JSON encoded data without the tags for unions.
-        if avro.io.validate(schema.schema, value):
-            data = value
-        else:
-            data = flatten_unions(schema.schema, value)
-
-        writer = DatumWriter(writers_schema=schema.schema)
-        writer.write(data, BinaryEncoder(bio))
+        (avro_codec or AvroCodec(schema.schema)).write(bio, value)
     elif schema.schema_type is SchemaType.JSONSCHEMA:
         try:
-            schema.schema.validate(value)
+            (json_schema_validator or schema.schema).validate(value)
         except ValidationError as e:
             raise InvalidPayload from e
         bio.write(json_encode(value, binary=True))
@@ -52,6 +52,12 @@ class NameStrategy(StrEnum, Enum):
     topic_record_name = "topic_record_name"
 
 
+@unique
+class SchemaReaderParsePool(StrEnum, Enum):
+    process = "process"
+    thread = "thread"
+
+
 @unique
 class SubjectType(StrEnum, Enum):
     key = "key"
@@ -76,9 +76,10 @@ class Producer:
         timestamp: int | None = -1,
         headers: dict[str | None, bytes | None] | list[tuple[str | None, bytes | None]] | None = None,
     ) -> None: ...
-    def flush(self, timeout: float = -1) -> None: ...
+    def flush(self, timeout: float = -1) -> int: ...
     def list_topics(self, topic: str | None = None, timeout: float = -1) -> ClusterMetadata: ...
     def poll(self, timeout: float = -1) -> int: ...
+    def __len__(self) -> int: ...
 
 class Consumer:
     def subscribe(
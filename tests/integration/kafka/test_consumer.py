@@ -382,6 +382,42 @@ class TestAsyncPoll:
         assert message_none is None
 
 
+class TestAsyncConsume:
+    async def test_async_consume(
+        self,
+        new_topic: NewTopic,
+        asyncproducer: AsyncKafkaProducer,
+        asyncconsumer: AsyncKafkaConsumer,
+    ) -> None:
+        await asyncconsumer.subscribe([new_topic.topic])
+        for i in range(3):
+            aiofut = await asyncproducer.send(new_topic.topic, value=f"value-{i}")
+            await aiofut
+
+        messages = []
+        expiration = Expiration.from_timeout(30)
+        while len(messages) < 3:
+            expiration.raise_timeout_if_expired(
+                "Timeout elapsed waiting for messages. Only received {messages}",
+                messages=messages,
+            )
+            messages.extend(await asyncconsumer.consume(num_messages=3 - len(messages), timeout=POLL_TIMEOUT_S))
+
+        assert [message.offset() for message in messages] == [0, 1, 2]
+        assert [message.value() for message in messages] == [b"value-0", b"value-1", b"value-2"]
+
+    async def test_async_consume_no_message(
+        self,
+        new_topic: NewTopic,
+        asyncconsumer: AsyncKafkaConsumer,
+    ) -> None:
+        await asyncconsumer.subscribe([new_topic.topic])
+
+        messages = await asyncconsumer.consume(num_messages=10, timeout=1)
+
+        assert messages == []
+
+
 async def test_pattern_subscription_async(
     admin_client: KafkaAdminClient,
     asyncproducer: AsyncKafkaProducer,
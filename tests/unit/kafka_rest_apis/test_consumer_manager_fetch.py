@@ -0,0 +1,115 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from confluent_kafka import KafkaError
+from http import HTTPStatus
+from karapace.config import DEFAULTS
+from karapace.kafka.types import Timestamp
+from karapace.kafka_rest_apis.consumer_manager import ConsumerManager, MAX_CONSUME_BATCH_SIZE, TypedConsumer
+from karapace.rapu import HTTPResponse
+from unittest.mock import Mock
+
+import asyncio
+import base64
+import pytest
+
+INTERNAL_NAME = ("group", "instance")
+CONTENT_TYPE = "application/vnd.kafka.binary.v2+json"
+
+
+class FakeMessage:
+    def __init__(self, offset: int, value: bytes | None, error: KafkaError | None = None) -> None:
+        self._offset = offset
+        self._value = value
+        self._error = error
+
+    def topic(self) -> str:
+        return "topic"
+
+    def partition(self) -> int:
+        return 0
+
+    def offset(self) -> int:
+        return self._offset
+
+    def timestamp(self) -> tuple[int, int]:
+        return Timestamp.CREATE_TIME, 1000 + self._offset
+
+    def key(self) -> bytes | None:
+        return None
+
+    def value(self) -> bytes | None:
+        return self._value
+
+    def error(self) -> KafkaError | None:
+        return self._error
+
+
+class FakeConsumer:
+    def __init__(self, messages: list[FakeMessage]) -> None:
+        self.messages = messages
+        self.batch_sizes: list[int] = []
+
+    async def consume(self, num_messages: int, timeout: float) -> list[FakeMessage]:
+        self.batch_sizes.append(num_messages)
+        batch, self.messages = self.messages[:num_messages], self.messages[num_messages:]
+        if not batch:
+            await asyncio.sleep(timeout)
+        return batch
+
+
+async def fetch(consumer: FakeConsumer, query_params: dict) -> HTTPResponse:
+    manager = ConsumerManager(config=DEFAULTS, deserializer=Mock())
+    manager.consumers[INTERNAL_NAME] = TypedConsumer(
+        consumer=consumer, serialization_format="binary", config={"consumer.request.timeout.ms": 100}
+    )
+    with pytest.raises(HTTPResponse) as exc_info:
+        await manager.fetch(INTERNAL_NAME, CONTENT_TYPE, {"embedded_format": "binary"}, query_params)
+    return exc_info.value
+
+
+async def test_fetch_consumes_batches_until_max_bytes() -> None:
+    consumer = FakeConsumer([FakeMessage(offset, b"0123456789") for offset in range(100)])
+
+    response = await fetch(consumer, {"max_bytes": "205"})
+
+    assert response.status == HTTPStatus.OK
+    assert [record["offset"] for record in response.json] == list(range(21))
+    assert response.json[0] == {
+        "topic": "topic",
+        "partition": 0,
+        "offset": 0,
+        "timestamp": 1000,
+        "key": None,
+        "value": base64.b64encode(b"0123456789").decode(),
+    }
+    assert consumer.batch_sizes == [1, 19, 1]
+
+
+async def test_fetch_of_many_small_messages_takes_few_batches() -> None:
+    consumer = FakeConsumer([FakeMessage(offset, b"v") for offset in range(10_000)])
+
+    response = await fetch(consumer, {})
+
+    assert [record["offset"] for record in response.json] == list(range(10_000))
+    assert max(consumer.batch_sizes) == MAX_CONSUME_BATCH_SIZE
+    assert len(consumer.batch_sizes) <= 10_000 // MAX_CONSUME_BATCH_SIZE + 3
+
+
+async def test_fetch_returns_when_the_timeout_expires() -> None:
+    consumer = FakeConsumer([FakeMessage(0, b"value"), FakeMessage(1, None)])
+
+    response = await fetch(consumer, {"timeout": "50"})
+
+    assert [record["value"] for record in response.json] == [base64.b64encode(b"value").decode(), None]
+
+
+async def test_fetch_reports_the_errors_of_the_batch() -> None:
+    consumer = FakeConsumer([FakeMessage(0, b"value"), FakeMessage(1, None, KafkaError(KafkaError.UNKNOWN_TOPIC_OR_PART))])
+
+    response = await fetch(consumer, {"max_bytes": "1000"})
+
+    assert response.status == HTTPStatus.NOT_FOUND
@@ -3,18 +3,26 @@
 Copyright (c) 2024 Aiven Ltd
 See LICENSE for details
 """
+from __future__ import annotations
+
 from karapace.config import DEFAULTS
-from karapace.kafka_rest_apis import UserRestProxy
+from karapace.kafka_rest_apis import METRIC_CLUSTER_METADATA_REFRESH_TIME, UserRestProxy
 from karapace.serialization import SchemaRegistrySerializer
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+import asyncio
 import copy
+import pytest
+import threading
 
 
-def user_rest_proxy(max_age_metadata: int = 5) -> UserRestProxy:
-    configs = {**DEFAULTS, **{"admin_metadata_max_age": max_age_metadata}}
+def user_rest_proxy(max_age_metadata: int = 5, max_stale_age_metadata: int = 0) -> UserRestProxy:
+    configs = {
+        **DEFAULTS,
+        **{"admin_metadata_max_age": max_age_metadata, "admin_metadata_max_stale_age": max_stale_age_metadata},
+    }
     serializer = SchemaRegistrySerializer(configs)
-    return UserRestProxy(configs, 1, serializer, auth_expiry=None, verify_connection=False)
+    return UserRestProxy(configs, 1, serializer, auth_expiry=None, verify_connection=False, stats=MagicMock())
 
 
 EMPTY_REPLY = {
@@ -386,3 +394,71 @@ async def test_update_local_cache_not_evict_all_the_global_cache_if_new_broker_d
             await proxy.cluster_metadata(["topic_a"])
 
     assert not proxy._cluster_metadata_complete, "new broker data incoming, should update the global metadata next!"
+
+
+async def test_old_topic_metadata_is_served_while_refreshed_in_the_background() -> None:
+    proxy = user_rest_proxy(max_age_metadata=10, max_stale_age_metadata=30)
+    proxy._global_metadata_birth = 200
+    proxy._cluster_metadata_complete = True
+    proxy._cluster_metadata = copy.deepcopy(ALL_TOPIC_REQUEST)
+    proxy._cluster_metadata_topic_birth = {"topic_a": 200, "topic_b": 200, "__consumer_offsets": 200}
+
+    with patch(
+        "karapace.kafka.admin.KafkaAdminClient.cluster_metadata", return_value=TOPIC_REQUEST_WITH_CHANGED_REPLICA
+    ) as mocked_cluster_metadata:
+        with patch("time.monotonic", return_value=220):
+            res = await proxy.cluster_metadata(["topic_a"])
+            assert res["topics"] == {"topic_a": ALL_TOPIC_REQUEST["topics"]["topic_a"]}, "the old metadata is served"
+            await asyncio.gather(*proxy._metadata_refreshes.values())
+
+            assert proxy._cluster_metadata_topic_birth["topic_a"] == 220
+            res = await proxy.cluster_metadata(["topic_a"])
+
+    mocked_cluster_metadata.assert_called_once_with(["topic_a"])
+    assert res["topics"] == TOPIC_REQUEST_WITH_CHANGED_REPLICA["topics"]
+    assert not proxy._metadata_refreshes
+
+
+async def test_expired_topic_metadata_waits_for_the_refresh() -> None:
+    proxy = user_rest_proxy(max_age_metadata=10, max_stale_age_metadata=30)
+    proxy._cluster_metadata = copy.deepcopy(ALL_TOPIC_REQUEST)
+    proxy._cluster_metadata_topic_birth = {"topic_a": 200, "topic_b": 200, "__consumer_offsets": 200}
+
+    with patch(
+        "karapace.kafka.admin.KafkaAdminClient.cluster_metadata", return_value=TOPIC_REQUEST_WITH_CHANGED_REPLICA
+    ) as mocked_cluster_metadata:
+        with patch("time.monotonic", return_value=241):
+            res = await proxy.cluster_metadata(["topic_a"])
+
+    mocked_cluster_metadata.assert_called_once_with(["topic_a"])
+    assert res == TOPIC_REQUEST_WITH_CHANGED_REPLICA
+
+
+@pytest.mark.parametrize("topics", [None, ["topic_a"]])
+async def test_concurrent_misses_share_one_refresh(topics: list[str] | None) -> None:
+    proxy = user_rest_proxy()
+    reply = threading.Event()
+
+    def cluster_metadata(_: list[str] | None) -> dict:
+        reply.wait(timeout=10)
+        return TOPIC_REQUEST
+
+    with patch("karapace.kafka.admin.KafkaAdminClient.cluster_metadata", side_effect=cluster_metadata) as mocked:
+        requests = [asyncio.create_task(proxy.cluster_metadata(topics)) for _ in range(10)]
+        await asyncio.sleep(0.1)
+        assert not any(request.done() for request in requests), "the event loop is not blocked by the refresh"
+        requests[0].cancel()
+        reply.set()
+        results = await asyncio.gather(*requests[1:])
+
+    mocked.assert_called_once_with(topics)
+    assert all(result == TOPIC_REQUEST for result in results)
+    assert not proxy._metadata_refreshes
+
+
+async def test_refresh_latency_metric() -> None:
+    proxy = user_rest_proxy()
+    with patch("karapace.kafka.admin.KafkaAdminClient.cluster_metadata", return_value=ALL_TOPIC_REQUEST):
+        await proxy.cluster_metadata(None)
+
+    proxy.stats.timing_manager.assert_called_once_with(METRIC_CLUSTER_METADATA_REFRESH_TIME, tags={"topics": "all"})
@@ -0,0 +1,94 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.config import DEFAULTS
+from karapace.kafka_rest_apis import UserRestProxy
+from karapace.schema_models import SchemaType, ValidatedTypedSchema
+from karapace.serialization import InvalidMessageSchema, SchemaRegistrySerializer
+from karapace.typing import SchemaId, Subject
+from tests.utils import schema_avro_json, test_objects_avro
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+import threading
+
+SCHEMA_ID = SchemaId(1)
+
+
+def user_rest_proxy(**config: Any) -> UserRestProxy:
+    configs = {**DEFAULTS, **config}
+    serializer = SchemaRegistrySerializer(configs)
+    schema = ValidatedTypedSchema.parse(SchemaType.AVRO, schema_avro_json)
+    serializer.ids_to_schemas[SCHEMA_ID] = schema
+    serializer.ids_to_subjects[SCHEMA_ID] = [Subject("topic-value")]
+    serializer.schemas_to_ids[str(schema)] = SCHEMA_ID
+    return UserRestProxy(configs, 1, serializer, auth_expiry=None, verify_connection=False)
+
+
+async def prepare_records(proxy: UserRestProxy, records: list[dict]) -> list[tuple]:
+    try:
+        return await proxy._prepare_records(  # pylint: disable=protected-access
+            content_type="application/vnd.kafka.avro.v2+json",
+            data={"records": records},
+            ser_format="avro",
+            key_schema_id=SCHEMA_ID,
+            value_schema_id=SCHEMA_ID,
+            default_partition=3,
+        )
+    finally:
+        await proxy.serializer.close()
+
+
+RECORDS = [
+    {"key": test_objects_avro[i % 3] if i % 2 else None, "value": test_objects_avro[i % 3], "partition": i % 5}
+    for i in range(1000)
+] + [{"value": None}]
+
+
+async def serializing_threads(proxy: UserRestProxy, records: list[dict]) -> set[str]:
+    threads = set()
+    serialize_sync = proxy.serializer.serialize_sync
+
+    def record_thread(*args: Any) -> bytes:
+        threads.add(threading.current_thread().name)
+        return serialize_sync(*args)
+
+    with patch.object(proxy.serializer, "serialize_sync", side_effect=record_thread):
+        await prepare_records(proxy, records)
+    return threads
+
+
+async def test_large_batches_are_serialized_in_the_executor_in_order() -> None:
+    expected = await prepare_records(user_rest_proxy(rest_serialization_workers=0), RECORDS)
+    proxy = user_rest_proxy(rest_serialization_workers=2, rest_serialization_batch_threshold=10)
+
+    assert await prepare_records(proxy, RECORDS) == expected
+    assert expected[0] == (None, expected[0][1], 0)
+    assert expected[-1] == (None, b"", 3)
+
+    threads = await serializing_threads(
+        user_rest_proxy(rest_serialization_workers=2, rest_serialization_batch_threshold=10), RECORDS
+    )
+    assert threads and all(thread.startswith("rest-serialize") for thread in threads)
+
+
+async def test_small_batches_are_serialized_on_the_event_loop() -> None:
+    proxy = user_rest_proxy(rest_serialization_workers=2, rest_serialization_batch_threshold=10)
+
+    assert await serializing_threads(proxy, RECORDS[:9]) == {threading.current_thread().name}
+
+
+@pytest.mark.parametrize("rest_serialization_workers", [0, 2])
+async def test_first_invalid_record_of_a_batch_is_reported(rest_serialization_workers: int) -> None:
+    records = list(RECORDS)
+    records[300] = {"value": {"name": "Foo", "favorite_number": "300", "favorite_color": "bar"}}
+    records[700] = {"value": {"name": "Foo", "favorite_number": "700", "favorite_color": "bar"}}
+    proxy = user_rest_proxy(rest_serialization_workers=rest_serialization_workers, rest_serialization_batch_threshold=10)
+
+    with pytest.raises(InvalidMessageSchema) as exc_info:
+        await prepare_records(proxy, records)
+
+    _, datum = exc_info.value.__cause__.args
+    assert datum == "300"
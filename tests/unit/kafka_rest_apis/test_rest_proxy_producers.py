@@ -0,0 +1,92 @@
+# pylint: disable=protected-access
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from karapace.config import DEFAULTS
+from karapace.kafka_rest_apis import METRIC_PRODUCER_QUEUE_DEPTH, UserRestProxy
+from karapace.serialization import SchemaRegistrySerializer
+from unittest.mock import call, MagicMock, Mock
+
+import asyncio
+
+
+class FakeProducer:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, bytes | None, bytes, int | None]] = []
+
+    async def send(self, topic: str, *, key: bytes | None, value: bytes, partition: int | None) -> asyncio.Future:
+        self.sent.append((topic, key, value, partition))
+        result = asyncio.get_running_loop().create_future()
+        result.set_result(Mock(**{"offset.return_value": len(self.sent) - 1, "partition.return_value": partition or 0}))
+        return result
+
+    def queue_depth(self) -> int:
+        return len(self.sent)
+
+
+def user_rest_proxy(producer_count: int) -> UserRestProxy:
+    configs = {**DEFAULTS, "producer_count": producer_count}
+    proxy = UserRestProxy(
+        configs, 1, SchemaRegistrySerializer(configs), auth_expiry=None, verify_connection=False, stats=MagicMock()
+    )
+    proxy._async_producers = [FakeProducer() for _ in range(producer_count)]
+    return proxy
+
+
+async def test_records_of_a_partition_are_sent_in_order_by_one_producer() -> None:
+    proxy = user_rest_proxy(producer_count=5)
+    records = [(None, f"{i}".encode(), i % 10) for i in range(1000)]
+
+    results = await proxy.produce_messages(topic="topic", prepared_records=records)
+
+    assert [result["partition"] for result in results] == [i % 10 for i in range(1000)]
+    sent_by_partition = defaultdict(list)
+    producers_of_partition = defaultdict(set)
+    for index, producer in enumerate(proxy._async_producers):
+        for _, _, value, partition in producer.sent:
+            sent_by_partition[partition].append(value)
+            producers_of_partition[partition].add(index)
+    for partition in range(10):
+        assert sent_by_partition[partition] == [value for _, value, p in records if p == partition]
+        assert len(producers_of_partition[partition]) == 1
+    assert len(set.union(*producers_of_partition.values())) > 1, "the partitions are spread over the producers"
+
+
+async def test_keyed_records_are_routed_by_key() -> None:
+    proxy = user_rest_proxy(producer_count=5)
+    records = [(f"key-{i % 20}".encode(), b"value", None) for i in range(200)]
+
+    await proxy.produce_messages(topic="topic", prepared_records=records)
+
+    producers_of_key = defaultdict(set)
+    for index, producer in enumerate(proxy._async_producers):
+        for _, key, _, _ in producer.sent:
+            producers_of_key[key].add(index)
+    assert len(producers_of_key) == 20
+    assert all(len(producers) == 1 for producers in producers_of_key.values())
+
+
+async def test_records_without_key_and_partition_are_spread() -> None:
+    proxy = user_rest_proxy(producer_count=4)
+
+    await proxy.produce_messages(topic="topic", prepared_records=[(None, b"value", None)] * 100)
+
+    assert [producer.queue_depth() for producer in proxy._async_producers] == [25, 25, 25, 25]
+    assert proxy.stats.gauge.call_args_list == [
+        call(METRIC_PRODUCER_QUEUE_DEPTH, 25, tags={"producer": index}) for index in range(4)
+    ]
+
+
+async def test_producer_count_producers_are_created() -> None:
+    proxy = user_rest_proxy(producer_count=3)
+    proxy._async_producers = []
+    created = [FakeProducer() for _ in range(3)]
+    proxy._create_async_producer = Mock(side_effect=[asyncio.sleep(0, producer) for producer in created])
+
+    assert await proxy._maybe_create_async_producers() == created
+    assert await proxy._maybe_create_async_producers() == created
+    assert proxy._create_async_producer.call_count == 3
@@ -2,13 +2,24 @@
 Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
+from karapace.config import DEFAULTS
 from karapace.dependency import Dependency
-from karapace.protobuf.io import crawl_dependencies
+from karapace.protobuf.io import (
+    crawl_dependencies,
+    get_dynamic_messages,
+    get_protobuf_class_instance,
+    ProtobufModuleSpec,
+    ProtobufSerdePool,
+)
+from karapace.protobuf.protobuf_to_dict import dict_to_protobuf, protobuf_to_dict
 from karapace.protobuf.schema import ProtobufSchema
 from karapace.schema_models import ValidatedTypedSchema
 from karapace.schema_type import SchemaType
 from karapace.typing import Subject
+from pathlib import Path
+from unittest.mock import patch
 
+import pytest
 import textwrap
 
 
@@ -70,3 +81,135 @@ def test_crawl_dependencies() -> None:
             "unique_class_name": "c_df098b6b018617c2b8eb95156535dec6",
         },
     }
+
+
+def _speed_schema(*enum_values: str) -> ProtobufSchema:
+    constants = "\n".join(f"  {value} = {index};" for index, value in enumerate(enum_values))
+    schema = ValidatedTypedSchema.parse(
+        schema_type=SchemaType.PROTOBUF,
+        schema_str=f'syntax = "proto3";\n\nmessage Speed {{\n  Enum speed = 1;\n}}\n\nenum Enum {{\n{constants}\n}}\n',
+    )
+    assert isinstance(schema.schema, ProtobufSchema)
+    return schema.schema
+
+
+def test_module_spec_symbols() -> None:
+    spec = ProtobufModuleSpec.of(_speed_schema("HIGH", "LOW"))
+
+    file_name = f"{spec.proto_name}.proto"
+    assert spec.symbols == {"Speed": file_name, "Enum": file_name, "HIGH": file_name, "LOW": file_name}
+
+
+def test_serde_pool_isolates_conflicting_schemas(tmp_path: Path) -> None:
+    first = ProtobufModuleSpec.of(_speed_schema("HIGH", "LOW"))
+    second = ProtobufModuleSpec.of(_speed_schema("FAST", "SLOW"))
+    pool = ProtobufSerdePool(workers=1, max_tasks=0, runtime_directory=str(tmp_path))
+    try:
+        for spec, values in [(first, ["HIGH", "LOW"]), (second, ["SLOW", "FAST"]), (first, ["LOW", "HIGH"])]:
+            encoded = pool.write(spec, [("Speed", {"speed": value}) for value in values])
+            assert all(isinstance(record, bytes) for record in encoded)
+            assert pool.read(spec, [("Speed", record) for record in encoded]) == [{"speed": value} for value in values]
+    finally:
+        pool.close()
+
+
+def test_serde_pool_reports_errors_per_record(tmp_path: Path) -> None:
+    spec = ProtobufModuleSpec.of(_speed_schema("HIGH", "LOW"))
+    pool = ProtobufSerdePool(workers=2, max_tasks=1, runtime_directory=str(tmp_path))
+    try:
+        encoded, invalid = pool.write(spec, [("Speed", {"speed": "LOW"}), ("Speed", {"speed": "UNKNOWN"})])
+        assert encoded == b"\x08\x01"
+        assert isinstance(invalid, Exception)
+        [missing] = pool.read(spec, [("Missing", encoded)])
+        assert isinstance(missing, AttributeError)
+    finally:
+        pool.close()
+
+
+DYNAMIC_REFERENCED = """\
+syntax = "proto3";
+package units;
+
+enum Unit {
+  CELSIUS = 0;
+  FAHRENHEIT = 1;
+}
+"""
+
+DYNAMIC_SCHEMA = """\
+syntax = "proto3";
+package measurements;
+
+import "units.proto";
+
+message Measurement {
+  message Location {
+    string name = 1;
+  }
+  optional string sensor_id = 1;
+  repeated double values = 2;
+  map<string, Location> sensor_locations = 3;
+  units.Unit unit = 4;
+  oneof source {
+    string device = 5;
+    int64 gateway = 6;
+  }
+}
+"""
+
+
+def _dynamic_schema() -> ProtobufSchema:
+    referenced = ValidatedTypedSchema.parse(SchemaType.PROTOBUF, DYNAMIC_REFERENCED)
+    dependency = Dependency(name="units.proto", subject=Subject("units"), version=1, target_schema=referenced)
+    schema = ValidatedTypedSchema.parse(SchemaType.PROTOBUF, DYNAMIC_SCHEMA, dependencies={"units.proto": dependency})
+    assert isinstance(schema.schema, ProtobufSchema)
+    return schema.schema
+
+
+def test_dynamic_messages_match_protoc_generated_classes() -> None:
+    schema = _dynamic_schema()
+    datum = {
+        "sensor_id": "",
+        "values": [1.5, -2.0],
+        "sensor_locations": {"a": {"name": "attic"}, "b": {"name": "basement"}},
+        "unit": "FAHRENHEIT",
+        "gateway": 7,
+    }
+
+    dynamic_messages = get_dynamic_messages(schema)
+    assert dynamic_messages is not None
+    assert get_dynamic_messages(schema) is dynamic_messages
+    dynamic_instance = dynamic_messages.message_class("Measurement")()
+    dict_to_protobuf(dynamic_instance, datum)
+    generated_instance = get_protobuf_class_instance(schema, "Measurement", DEFAULTS)
+    dict_to_protobuf(generated_instance, datum)
+
+    encoded = dynamic_instance.SerializeToString(deterministic=True)
+    assert encoded == generated_instance.SerializeToString(deterministic=True)
+    decoded = dynamic_messages.message_class("Measurement")()
+    decoded.ParseFromString(encoded)
+    assert decoded.HasField("sensor_id")
+    assert protobuf_to_dict(decoded, True) == protobuf_to_dict(generated_instance, True)
+
+
+@pytest.mark.parametrize(
+    "schema_str",
+    [
+        'syntax = "proto3";\nmessage Packed {\n  repeated int32 values = 1 [packed = false];\n}\n',
+        'syntax = "proto2";\nmessage Defaults {\n  optional int32 value = 1 [default = 5];\n}\n',
+    ],
+)
+def test_dynamic_messages_are_not_built_for_unsupported_schemas(schema_str: str) -> None:
+    schema = ValidatedTypedSchema.parse(SchemaType.PROTOBUF, schema_str)
+    assert isinstance(schema.schema, ProtobufSchema)
+
+    assert get_dynamic_messages(schema.schema) is None
+
+
+def test_dynamic_messages_do_not_hide_errors() -> None:
+    schema = ValidatedTypedSchema.parse(SchemaType.PROTOBUF, 'syntax = "proto3";\nmessage Hidden {\n  int32 value = 1;\n}\n')
+    assert isinstance(schema.schema, ProtobufSchema)
+
+    with patch("karapace.protobuf.io.to_file_descriptor_proto", side_effect=NotImplementedError("bug")):
+        with pytest.raises(NotImplementedError):
+            get_dynamic_messages(schema.schema)
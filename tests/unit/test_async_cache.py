@@ -0,0 +1,100 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from karapace.async_cache import AsyncTTLCache, CacheInfo
+
+import asyncio
+import pytest
+
+
+class Loader:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error: Exception | None = None
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.calls
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_concurrent_lookups_share_a_single_load() -> None:
+    cache: AsyncTTLCache[str, int] = AsyncTTLCache(maxsize=10, ttl=60)
+    loader = Loader()
+
+    lookups = [asyncio.create_task(cache.get("key", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await asyncio.gather(*lookups) == [1] * 10
+    assert await cache.get("key", loader) == 1
+    assert loader.calls == 1
+    assert cache.cache_info() == CacheInfo(hits=10, misses=1, maxsize=10, currsize=1)
+
+
+async def test_failures_are_shared_but_not_cached() -> None:
+    cache: AsyncTTLCache[str, int] = AsyncTTLCache(maxsize=10, ttl=60)
+    loader = Loader()
+    loader.error = ValueError("failed")
+
+    lookups = [asyncio.create_task(cache.get("key", loader)) for _ in range(2)]
+    await asyncio.sleep(0)
+    loader.release.set()
+    results = await asyncio.gather(*lookups, return_exceptions=True)
+
+    assert results == [loader.error, loader.error]
+    loader.error = None
+    assert await cache.get("key", loader) == 2
+
+
+async def test_cancelled_lookup_does_not_cancel_the_shared_load() -> None:
+    cache: AsyncTTLCache[str, int] = AsyncTTLCache(maxsize=10, ttl=60)
+    loader = Loader()
+
+    cancelled = asyncio.create_task(cache.get("key", loader))
+    waiting = asyncio.create_task(cache.get("key", loader))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await waiting == 1
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+async def test_values_expire_and_are_evicted_least_recently_used_first() -> None:
+    timer = Timer()
+    cache: AsyncTTLCache[str, int] = AsyncTTLCache(maxsize=2, ttl=60, timer=timer)
+    loader = Loader()
+    loader.release.set()
+
+    assert await cache.get("a", loader) == 1
+    assert await cache.get("b", loader) == 2
+    assert await cache.get("a", loader) == 1
+    assert await cache.get("c", loader) == 3
+    assert await cache.get("a", loader) == 1
+    assert await cache.get("b", loader) == 4
+
+    timer.now = 61
+    assert await cache.get("b", loader) == 5
+    cache.pop("b")
+    assert await cache.get("b", loader) == 6
+    cache.pop("missing")
+    timer.now = 122
+    cache.pop("b")
+    assert await cache.get("b", loader) == 7
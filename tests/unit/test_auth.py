@@ -2,8 +2,25 @@
 Copyright (c) 2024 Aiven Ltd
 See LICENSE for details
 """
-from karapace.auth import ACLAuthorizer, ACLEntry, hash_password, HashAlgorithm, Operation, User
+from karapace.auth import (
+    ACLAuthorizer,
+    ACLEntry,
+    combine_patterns,
+    hash_password,
+    HashAlgorithm,
+    HTTPAuthorizer,
+    METRIC_CREDENTIALS_CACHE_HIT,
+    METRIC_CREDENTIALS_CACHE_MISS,
+    Operation,
+    User,
+)
+from karapace.utils import json_encode
+from pathlib import Path
+from unittest.mock import call, Mock, patch
 
+import aiohttp
+import aiohttp.web
+import pytest
 import re
 
 
@@ -222,3 +239,96 @@ def test_acl_authorizer() -> None:
             "Subject:readwrite_subject",
         ],
     )
+
+
+def _write_authfile(path: Path, password: str) -> None:
+    user = {
+        "username": "user",
+        "algorithm": "scrypt",
+        "salt": "salt",
+        "password_hash": hash_password(algorithm=HashAlgorithm.SCRYPT, salt="salt", plaintext_password=password),
+    }
+    path.write_text(json_encode({"users": [user], "permissions": []}))
+
+
+def _request(username: str, password: str) -> Mock:
+    return Mock(headers={"Authorization": aiohttp.BasicAuth(username, password).encode()})
+
+
+async def test_http_authorizer_caches_verified_credentials(tmp_path: Path) -> None:
+    authfile = tmp_path / "authfile.json"
+    _write_authfile(authfile, "password")
+    stats = Mock()
+    authorizer = HTTPAuthorizer(str(authfile), stats=stats, credentials_cache_size=10, credentials_cache_ttl=60)
+
+    with patch("karapace.auth.hash_password", wraps=hash_password) as hashing:
+        for _ in range(3):
+            assert authorizer.authenticate(_request("user", "password")).username == "user"
+        assert hashing.call_count == 1
+
+        for _ in range(2):
+            with pytest.raises(aiohttp.web.HTTPUnauthorized):
+                authorizer.authenticate(_request("user", "wrong"))
+        assert hashing.call_count == 3
+
+    hit, miss = METRIC_CREDENTIALS_CACHE_HIT, METRIC_CREDENTIALS_CACHE_MISS
+    assert stats.increase.call_args_list == [call(metric) for metric in (miss, hit, hit, miss, miss)]
+
+
+async def test_http_authorizer_credentials_cache_is_cleared_on_reload(tmp_path: Path) -> None:
+    authfile = tmp_path / "authfile.json"
+    _write_authfile(authfile, "password")
+    authorizer = HTTPAuthorizer(str(authfile), credentials_cache_size=10, credentials_cache_ttl=60)
+    authorizer.authenticate(_request("user", "password"))
+
+    _write_authfile(authfile, "new_password")
+    authorizer._load_authfile()  # pylint: disable=protected-access
+
+    with pytest.raises(aiohttp.web.HTTPUnauthorized):
+        authorizer.authenticate(_request("user", "password"))
+    assert authorizer.authenticate(_request("user", "new_password")).username == "user"
+
+
+@pytest.mark.parametrize(
+    ("resources", "combined_count"),
+    [
+        (["Subject:a.*", "Subject:b$", "Config:", "Config:"], 1),
+        (["Subject:(foo|bar)-.*", "Subject:baz"], 1),
+        (["Subject:(x)\\1", "Subject:y"], 2),
+        (["(?i)subject:upper", "Subject:lower"], 2),
+        (["Subject:(?P<name>n)(?P=name)", "Subject:(?P<name>m)", "Subject:(?P<name>o)"], 3),
+    ],
+)
+def test_combined_patterns_match_like_the_patterns(resources: list[str], combined_count: int) -> None:
+    patterns = [re.compile(resource) for resource in resources]
+    combined = combine_patterns(patterns)
+
+    assert len(combined) == combined_count
+    for resource in [
+        "Subject:a",
+        "Subject:b",
+        "Subject:bc",
+        "Config:",
+        "Subject:foo-1",
+        "Subject:xx",
+        "Subject:xy",
+        "SUBJECT:UPPER",
+        "Subject:LOWER",
+        "Subject:nn",
+        "Subject:o",
+    ]:
+        expected = any(pattern.match(resource) for pattern in patterns)
+        assert any(pattern.match(resource) for pattern in combined) == expected, resource
+
+
+def test_acl_authorizer_decisions_are_cleared_with_the_permissions() -> None:
+    user = User(username="user", algorithm=HashAlgorithm.SHA256, salt="salt", password_hash="")
+    authorizer = ACLAuthorizer(permissions=[ACLEntry("user", Operation.Read, re.compile("Subject:a"))])
+    assert authorizer.check_authorization(user, Operation.Read, "Subject:a")
+    assert not authorizer.check_authorization(user, Operation.Write, "Subject:a")
+
+    authorizer.permissions = [ACLEntry("user", Operation.Write, re.compile("Subject:b"))]
+
+    assert not authorizer.check_authorization(user, Operation.Read, "Subject:a")
+    assert authorizer.check_authorization(user, Operation.Write, "Subject:b")
+    assert authorizer.check_authorization_any(user, Operation.Read, ["Subject:a", "Subject:b"])
@@ -0,0 +1,265 @@
+"""
+Differential tests of the compiled Avro encoders and decoders against `avro.io`
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from avro.io import BinaryDecoder, BinaryEncoder, DatumReader, DatumWriter
+from karapace.avro_compiler import compile_decoder, compile_encoder
+from karapace.serialization import AvroCodec, CompiledAvroCodec
+from typing import Any
+
+import avro.errors
+import avro.schema
+import datetime
+import decimal
+import io
+import json
+import pytest
+import random
+import uuid
+
+UTC = datetime.timezone.utc
+
+
+def _parse(schema: Any) -> avro.schema.Schema:
+    return avro.schema.parse(json.dumps(schema))
+
+
+def _avro_io_encode(schema: avro.schema.Schema, datum: Any) -> bytes:
+    bio = io.BytesIO()
+    DatumWriter(schema).write(datum, BinaryEncoder(bio))
+    return bio.getvalue()
+
+
+def _avro_io_decode(schema: avro.schema.Schema, data: bytes) -> Any:
+    return DatumReader(schema).read(BinaryDecoder(io.BytesIO(data)))
+
+
+def _assert_same_as_avro_io(schema: avro.schema.Schema, datum: Any) -> None:
+    encoded = compile_encoder(schema)(datum)
+    assert encoded == _avro_io_encode(schema, datum)
+    assert compile_decoder(schema)(encoded, 0) == (_avro_io_decode(schema, encoded), len(encoded))
+
+
+RECORD_SCHEMA = {
+    "type": "record",
+    "name": "Record",
+    "namespace": "io.aiven",
+    "fields": [
+        {"name": "null", "type": "null"},
+        {"name": "boolean", "type": "boolean"},
+        {"name": "int", "type": "int"},
+        {"name": "long", "type": "long"},
+        {"name": "float", "type": "float"},
+        {"name": "double", "type": "double"},
+        {"name": "bytes", "type": "bytes"},
+        {"name": "string", "type": "string"},
+        {"name": "enum", "type": {"type": "enum", "name": "Suit", "symbols": ["SPADES", "HEARTS", "DIAMONDS", "CLUBS"]}},
+        {"name": "fixed", "type": {"type": "fixed", "name": "Hash", "size": 4}},
+        {"name": "array", "type": {"type": "array", "items": ["null", "long", "string"]}},
+        {"name": "map", "type": {"type": "map", "values": {"type": "array", "items": "Suit"}}},
+        {
+            "name": "nested",
+            "type": [
+                "null",
+                {
+                    "type": "record",
+                    "name": "Nested",
+                    "fields": [{"name": "hash", "type": "Hash"}, {"name": "value", "type": ["double", "string"]}],
+                },
+            ],
+        },
+        {"name": "union", "type": ["null", "boolean", "int", "bytes", "Nested", {"type": "map", "values": "float"}]},
+    ],
+}
+
+LINKED_LIST_SCHEMA = {
+    "type": "record",
+    "name": "Node",
+    "fields": [{"name": "value", "type": "int"}, {"name": "next", "type": ["null", "Node"]}],
+}
+
+
+def _random_datum(  # pylint: disable=too-many-return-statements
+    rng: random.Random, schema: avro.schema.Schema, depth: int = 0
+) -> Any:
+    if isinstance(schema, avro.schema.UnionSchema):
+        branches = [branch for branch in schema.schemas if depth < 3 or branch.type != "record"]
+        return _random_datum(rng, rng.choice(branches), depth)
+    if isinstance(schema, avro.schema.RecordSchema):
+        return {field.name: _random_datum(rng, field.type, depth + 1) for field in schema.fields}
+    if isinstance(schema, avro.schema.ArraySchema):
+        return [_random_datum(rng, schema.items, depth + 1) for _ in range(rng.randrange(4))]
+    if isinstance(schema, avro.schema.MapSchema):
+        # Not empty, avro.io would validate an empty map as a record of the same union
+        return {f"key-{i}": _random_datum(rng, schema.values, depth + 1) for i in range(1 + rng.randrange(3))}
+    if isinstance(schema, avro.schema.EnumSchema):
+        return rng.choice(schema.symbols)
+    if isinstance(schema, avro.schema.FixedSchema):
+        return rng.randbytes(schema.size)
+    if schema.type == "null":
+        return None
+    if schema.type == "boolean":
+        return rng.random() < 0.5
+    if schema.type == "int":
+        return rng.randint(-(2**31), 2**31 - 1)
+    if schema.type == "long":
+        return rng.choice([0, -1, 63, -64, 64, rng.randint(-(2**63), 2**63 - 1)])
+    if schema.type in ("float", "double"):
+        return rng.uniform(-1e6, 1e6)
+    if schema.type == "bytes":
+        return rng.randbytes(rng.randrange(20))
+    if schema.type == "string":
+        return "".join(rng.choice("abcé漢🙂") for _ in range(rng.randrange(20)))
+    raise ValueError(schema.type)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_records_match_avro_io(seed: int) -> None:
+    rng = random.Random(seed)
+    schema = _parse(RECORD_SCHEMA)
+    _assert_same_as_avro_io(schema, _random_datum(rng, schema))
+
+
+def test_recursive_record_matches_avro_io() -> None:
+    schema = _parse(LINKED_LIST_SCHEMA)
+    _assert_same_as_avro_io(schema, {"value": 1, "next": {"value": 2, "next": {"value": 3, "next": None}}})
+
+
+@pytest.mark.parametrize(
+    "schema,datum",
+    [
+        ({"type": "int", "logicalType": "date"}, datetime.date(2024, 2, 29)),
+        ({"type": "int", "logicalType": "date"}, datetime.date(1900, 1, 1)),
+        ({"type": "int", "logicalType": "time-millis"}, datetime.time(23, 59, 59, 999000)),
+        ({"type": "long", "logicalType": "time-micros"}, datetime.time(12, 30, 1, 123456)),
+        ({"type": "long", "logicalType": "timestamp-millis"}, datetime.datetime(2024, 5, 6, 7, 8, 9, 10000, tzinfo=UTC)),
+        ({"type": "long", "logicalType": "timestamp-micros"}, datetime.datetime(1969, 12, 31, 23, 59, 59, 1, tzinfo=UTC)),
+        ({"type": "string", "logicalType": "uuid"}, str(uuid.UUID(int=42))),
+        ({"type": "bytes", "logicalType": "decimal", "precision": 10, "scale": 3}, decimal.Decimal("1234.567")),
+        ({"type": "bytes", "logicalType": "decimal", "precision": 10, "scale": 3}, decimal.Decimal("-0.5")),
+        (
+            {"type": "fixed", "name": "Money", "size": 8, "logicalType": "decimal", "precision": 12, "scale": 2},
+            decimal.Decimal("-99.99"),
+        ),
+        (
+            {"type": "fixed", "name": "Money", "size": 8, "logicalType": "decimal", "precision": 12, "scale": 2},
+            decimal.Decimal("1000000.01"),
+        ),
+        # Unions using the last valid branch, as avro.io does
+        (["int", "long"], 1),
+        (["float", "double"], 1.5),
+        ({"type": "array", "items": []}, []),
+        ({"type": "map", "values": "string"}, {}),
+    ],
+)
+def test_values_match_avro_io(schema: Any, datum: Any) -> None:
+    _assert_same_as_avro_io(_parse(schema), datum)
+
+
+TAGGED_UNION_SCHEMA = {
+    "type": "record",
+    "name": "Outer",
+    "fields": [
+        {
+            "name": "attr",
+            "type": [
+                "null",
+                "string",
+                {"type": "record", "name": "Inner", "fields": [{"name": "attr", "type": "string"}]},
+                {"type": "map", "values": "string"},
+            ],
+        }
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "datum",
+    [
+        {"attr": {"string": "sample"}},
+        {"attr": {"Inner": {"attr": "sample"}}},
+        {"attr": {"attr": "sample"}},
+        {"attr": {"map": {"k": "v"}}},
+        {"attr": {"k": "v"}},
+        {"attr": None},
+    ],
+)
+def test_tagged_unions_are_encoded_as_the_avro_codec_does(datum: Any) -> None:
+    schema = _parse(TAGGED_UNION_SCHEMA)
+    expected = io.BytesIO()
+    AvroCodec(schema).write(expected, datum)
+
+    bio = io.BytesIO()
+    CompiledAvroCodec(schema).write(bio, datum)
+    assert bio.getvalue() == expected.getvalue()
+
+
+@pytest.mark.parametrize(
+    "datum",
+    [
+        # Not valid as is, nor once the tagged unions are flattened
+        {"attr": {"attr": {"string": "sample"}}},
+        {"attr": {"int": 1}},
+    ],
+)
+def test_tagged_unions_are_rejected_as_by_the_avro_codec(datum: Any) -> None:
+    schema = _parse(TAGGED_UNION_SCHEMA)
+
+    with pytest.raises(avro.errors.AvroTypeException):
+        AvroCodec(schema).write(io.BytesIO(), datum)
+    with pytest.raises(avro.errors.AvroTypeException):
+        CompiledAvroCodec(schema).write(io.BytesIO(), datum)
+
+
+@pytest.mark.parametrize(
+    "schema,datum",
+    [
+        ("int", 2**31),
+        ("long", "1"),
+        ("string", b"bytes"),
+        ({"type": "enum", "name": "E", "symbols": ["A"]}, "B"),
+        ({"type": "fixed", "name": "F", "size": 2}, b"\x00"),
+        ({"type": "array", "items": "int"}, (1, 2)),
+        ({"type": "map", "values": "int"}, {1: 1}),
+        ({"type": "record", "name": "R", "fields": [{"name": "a", "type": "int"}]}, {"a": 1, "b": 2}),
+        ({"type": "record", "name": "R", "fields": [{"name": "a", "type": "int"}]}, {}),
+        (["null", "int"], "1"),
+        (["null", "int"], {"string": "1"}),
+        ({"type": "int", "logicalType": "date"}, 1),
+        ({"type": "long", "logicalType": "timestamp-millis"}, datetime.datetime(2024, 1, 1)),
+    ],
+)
+def test_invalid_values_are_rejected_as_by_avro_io(schema: Any, datum: Any) -> None:
+    parsed = _parse(schema)
+    with pytest.raises(avro.errors.AvroTypeException):
+        _avro_io_encode(parsed, datum)
+    with pytest.raises(avro.errors.AvroTypeException):
+        compile_encoder(parsed)(datum)
+
+
+def test_truncated_data_is_rejected() -> None:
+    schema = _parse(RECORD_SCHEMA)
+    encoded = compile_encoder(schema)(_random_datum(random.Random(0), schema))
+    decoder = compile_decoder(schema)
+
+    for end in range(len(encoded)):
+        with pytest.raises(avro.errors.InvalidAvroBinaryEncoding):
+            decoder(encoded[:end], 0)
+
+
+def test_invalid_union_and_enum_indexes_are_rejected() -> None:
+    with pytest.raises(avro.errors.SchemaResolutionException):
+        compile_decoder(_parse(["null", "int"]))(b"\x04", 0)
+    with pytest.raises(avro.errors.SchemaResolutionException):
+        compile_decoder(_parse({"type": "enum", "name": "E", "symbols": ["A"]}))(b"\x02", 0)
+
+
+def test_decoding_starts_at_the_given_position() -> None:
+    schema = _parse(LINKED_LIST_SCHEMA)
+    encoded = compile_encoder(schema)({"value": 5, "next": None})
+
+    assert compile_decoder(schema)(b"\xff\xff" + encoded + b"\x00", 2) == ({"value": 5, "next": None}, 2 + len(encoded))
@@ -7,6 +7,7 @@ from __future__ import annotations
 from collections import defaultdict
 from collections.abc import Iterable, Sequence
 from confluent_kafka.cimpl import KafkaError
+from contextlib import AbstractContextManager
 from karapace.config import DEFAULTS
 from karapace.constants import DEFAULT_SCHEMA_TOPIC
 from karapace.in_memory_database import InMemoryDatabase, KarapaceDatabase, Subject, SubjectData
@@ -16,6 +17,7 @@ from karapace.offset_watcher import OffsetWatcher
 from karapace.schema_models import SchemaVersion, TypedSchema
 from karapace.schema_reader import KafkaSchemaReader
 from karapace.schema_references import Reference, Referents
+from karapace.schema_type import SchemaType
 from karapace.typing import SchemaId, Version
 from pathlib import Path
 from typing import Final
@@ -32,6 +34,162 @@ class TestFindSchemas:
         assert database.find_schemas(include_deleted=True, latest_only=True) == expected
 
 
+def _avro_schema(name: str) -> TypedSchema:
+    return TypedSchema(schema_type=SchemaType.AVRO, schema_str=f'{{"type": "record", "name": "{name}", "fields": []}}')
+
+
+class TestGetSchemaId:
+    def test_new_schema_gets_next_id(self) -> None:
+        database = InMemoryDatabase()
+        database.insert_schema_version(
+            subject=Subject("subject"),
+            schema_id=SchemaId(1),
+            version=Version(1),
+            deleted=False,
+            schema=_avro_schema("first"),
+            references=None,
+        )
+        assert database.get_schema_id(_avro_schema("second")) == SchemaId(2)
+
+    def test_existing_schema_reuses_id_across_subjects(self) -> None:
+        database = InMemoryDatabase()
+        for schema_id, name in enumerate(("first", "second", "third"), start=1):
+            database.insert_schema_version(
+                subject=Subject(f"subject-{name}"),
+                schema_id=SchemaId(schema_id),
+                version=Version(1),
+                deleted=False,
+                schema=_avro_schema(name),
+                references=None,
+            )
+        assert database.get_schema_id(_avro_schema("second")) == SchemaId(2)
+
+    def test_same_schema_string_with_different_type_gets_new_id(self) -> None:
+        database = InMemoryDatabase()
+        database.insert_schema_version(
+            subject=Subject("subject"),
+            schema_id=SchemaId(1),
+            version=Version(1),
+            deleted=False,
+            schema=_avro_schema("first"),
+            references=None,
+        )
+        json_schema = TypedSchema(schema_type=SchemaType.JSONSCHEMA, schema_str=_avro_schema("first").schema_str)
+        assert database.get_schema_id(json_schema) == SchemaId(2)
+
+    def test_schema_id_is_kept_after_hard_delete(self) -> None:
+        database = InMemoryDatabase()
+        subject = Subject("subject")
+        database.insert_schema_version(
+            subject=subject,
+            schema_id=SchemaId(1),
+            version=Version(1),
+            deleted=True,
+            schema=_avro_schema("first"),
+            references=None,
+        )
+        database.delete_subject_schema(subject=subject, version=Version(1))
+        database.delete_subject_hard(subject=subject)
+        assert database.get_schema_id(_avro_schema("first")) == SchemaId(1)
+
+    def test_overwritten_schema_id_is_not_reused_for_old_content(self) -> None:
+        database = InMemoryDatabase()
+        subject = Subject("subject")
+        database.insert_schema_version(
+            subject=subject,
+            schema_id=SchemaId(1),
+            version=Version(1),
+            deleted=False,
+            schema=_avro_schema("first"),
+            references=None,
+        )
+        database.insert_schema_version(
+            subject=subject,
+            schema_id=SchemaId(1),
+            version=Version(1),
+            deleted=False,
+            schema=_avro_schema("second"),
+            references=None,
+        )
+        assert database.get_schema_id(_avro_schema("second")) == SchemaId(1)
+        assert database.get_schema_id(_avro_schema("first")) == SchemaId(2)
+
+
+class TestSchemaIdReverseIndex:
+    @staticmethod
+    def _database_with_shared_schema() -> InMemoryDatabase:
+        database = InMemoryDatabase()
+        for subject in ("subject-1", "subject-2"):
+            database.insert_schema_version(
+                subject=Subject(subject),
+                schema_id=SchemaId(1),
+                version=Version(1),
+                deleted=False,
+                schema=_avro_schema("shared"),
+                references=None,
+            )
+        database.insert_schema_version(
+            subject=Subject("subject-2"),
+            schema_id=SchemaId(2),
+            version=Version(2),
+            deleted=False,
+            schema=_avro_schema("other"),
+            references=None,
+        )
+        return database
+
+    def test_subjects_for_schema(self) -> None:
+        database = self._database_with_shared_schema()
+        assert database.subjects_for_schema(SchemaId(1)) == [Subject("subject-1"), Subject("subject-2")]
+        assert database.subjects_for_schema(SchemaId(2)) == [Subject("subject-2")]
+        assert database.subjects_for_schema(SchemaId(3)) == []
+
+    def test_soft_deleted_versions(self) -> None:
+        database = self._database_with_shared_schema()
+        database.delete_subject(subject=Subject("subject-1"), version=Version(1))
+
+        assert database.subjects_for_schema(SchemaId(1)) == [Subject("subject-2")]
+        live_versions = database.find_schema_versions_by_schema_id(schema_id=SchemaId(1), include_deleted=False)
+        assert [(sv.subject, sv.version) for sv in live_versions] == [(Subject("subject-2"), Version(1))]
+        all_versions = database.find_schema_versions_by_schema_id(schema_id=SchemaId(1), include_deleted=True)
+        assert [(sv.subject, sv.version) for sv in all_versions] == [
+            (Subject("subject-1"), Version(1)),
+            (Subject("subject-2"), Version(1)),
+        ]
+
+    def test_hard_deleted_versions(self) -> None:
+        database = self._database_with_shared_schema()
+        database.delete_subject_schema(subject=Subject("subject-2"), version=Version(1))
+        assert database.find_schema_versions_by_schema_id(schema_id=SchemaId(1), include_deleted=True) == [
+            database.subjects[Subject("subject-1")].schemas[Version(1)]
+        ]
+
+        database.delete_subject_schema(subject=Subject("subject-1"), version=Version(1))
+        database.delete_subject_hard(subject=Subject("subject-1"))
+        database.delete_subject_hard(subject=Subject("subject-2"))
+        assert database.find_schema_versions_by_schema_id(schema_id=SchemaId(1), include_deleted=True) == []
+        assert database.find_schema_versions_by_schema_id(schema_id=SchemaId(2), include_deleted=True) == []
+
+    def test_updated_version_moves_to_new_schema_id(self) -> None:
+        database = self._database_with_shared_schema()
+        database.insert_schema_version(
+            subject=Subject("subject-1"),
+            schema_id=SchemaId(2),
+            version=Version(1),
+            deleted=False,
+            schema=_avro_schema("other"),
+            references=None,
+        )
+        assert database.subjects_for_schema(SchemaId(1)) == [Subject("subject-2")]
+        # Subjects are listed in the order of the subjects, not in the order they started to use the schema id
+        assert database.subjects_for_schema(SchemaId(2)) == [Subject("subject-1"), Subject("subject-2")]
+        versions = database.find_schema_versions_by_schema_id(schema_id=SchemaId(2), include_deleted=False)
+        assert [(sv.subject, sv.version) for sv in versions] == [
+            (Subject("subject-1"), Version(1)),
+            (Subject("subject-2"), Version(2)),
+        ]
+
+
 class AlwaysFineKafkaMessage:
     def __init__(
         self,
@@ -86,6 +244,9 @@ class WrappedInMemoryDatabase(KarapaceDatabase):
         self.db = InMemoryDatabase()
         self.timestamp = -1
 
+    def bulk_load(self) -> AbstractContextManager[None]:
+        return self.db.bulk_load()
+
     def get_schema_id(self, new_schema: TypedSchema) -> SchemaId:
         return self.db.get_schema_id(new_schema)
 
@@ -125,6 +286,9 @@ class WrappedInMemoryDatabase(KarapaceDatabase):
             subject=subject, schema_id=schema_id, version=version, deleted=deleted, schema=schema, references=references
         )
 
+    def insert_schema(self, *, schema_id: SchemaId, schema: TypedSchema) -> None:
+        return self.db.insert_schema(schema_id=schema_id, schema=schema)
+
     def insert_subject(self, *, subject: Subject) -> None:
         return self.db.insert_subject(subject=subject)
 
@@ -0,0 +1,122 @@
+"""
+Differential tests of the compiled JSON Schema validators against `jsonschema`
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from jsonschema import Draft7Validator
+from karapace.jsonschema_compiler import compile_validator
+from karapace.schema_models import parse_jsonschema_definition
+from tests.schemas import json_schemas
+from typing import Any, Callable
+
+import json
+import pytest
+
+INSTANCES: list[Any] = [
+    None,
+    True,
+    False,
+    0,
+    1,
+    -1,
+    1.0,
+    1.5,
+    13,
+    17,
+    29,
+    31,
+    37,
+    float("nan"),
+    "",
+    "a",
+    "aaaaa",
+    "A",
+    "B",
+    "foo",
+    "1970-01-01",
+    [],
+    [1],
+    [1, 2],
+    [1, 1],
+    [1, True],
+    [1, 1.0],
+    [0, False],
+    [[1], [True]],
+    [{"a": 0}, {"a": False}],
+    [1, "a"],
+    [{"a": 1}, {"a": 1}],
+    list(range(70)),
+    {},
+    {"a": 1},
+    {"a": True},
+    {"a": "x"},
+    {"a": 1, "b": 2},
+    {"a": 1.5, "b": 2, "c": 3},
+    {"a": {"a": {"a": None}}},
+    {"x-1": 1, "x-2": "2"},
+    {f"field_{i}": i for i in range(50)},
+]
+
+KEYWORD_SCHEMAS: list[Any] = [
+    {"definitions": {"positive": {"type": "integer", "exclusiveMinimum": 0}}, "$ref": "#/definitions/positive"},
+    {"type": "object", "properties": {"a": {"$ref": "#"}}, "additionalProperties": False},
+    {"type": "object", "patternProperties": {"^x-": {"type": "integer"}}, "additionalProperties": {"type": "string"}},
+    {"type": "object", "propertyNames": {"maxLength": 1}},
+    {"dependencies": {"a": ["b"], "b": {"properties": {"c": {"type": "integer"}}}}},
+    {"if": {"type": "integer"}, "then": {"minimum": 10}, "else": {"type": "string"}},
+    {"if": {"type": "integer"}, "then": {"minimum": 10}},
+    {"type": "array", "contains": {"type": "string"}},
+    {"type": "array", "uniqueItems": True},
+    {"type": "array", "items": [{"type": "integer"}], "additionalItems": {"type": "string"}},
+    {"const": 1},
+    {"const": {"a": 1}},
+    {"const": True},
+    {"const": [1.0]},
+    {"enum": [0, {"a": False}]},
+    {"enum": [1, "a", None, [1]]},
+    {"multipleOf": 0.5},
+    {"multipleOf": 3},
+    {"allOf": [{"type": "object"}, {"required": ["a"]}]},
+    {"anyOf": [{"type": "string", "minLength": 2}, {"type": "boolean"}]},
+    {"oneOf": [{"type": "number"}, {"type": "integer"}]},
+    {"not": {"type": ["object", "array"]}},
+    {"type": "string", "format": "date", "pattern": "^[0-9-]+$"},
+    {"type": "object", "properties": {f"field_{i}": {"type": "integer", "minimum": 0} for i in range(50)}},
+    {"maximum": 13, "minimum": 1, "exclusiveMaximum": 31},
+]
+
+SCHEMAS: list[Draft7Validator] = [value for value in vars(json_schemas).values() if isinstance(value, Draft7Validator)] + [
+    parse_jsonschema_definition(json.dumps(schema)) for schema in KEYWORD_SCHEMAS
+]
+
+
+def _outcome(is_valid: Callable[[Any], bool], instance: Any) -> bool | type[Exception]:
+    try:
+        return is_valid(instance)
+    except Exception as e:  # pylint: disable=broad-except
+        # `jsonschema` fails too, e.g. on NaN with a float `multipleOf`
+        return type(e)
+
+
+@pytest.mark.parametrize("validator", SCHEMAS, ids=lambda validator: json.dumps(validator.schema)[:60])
+def test_compiled_validator_matches_jsonschema(validator: Draft7Validator) -> None:
+    is_valid = compile_validator(validator)
+
+    assert is_valid is not None
+    for instance in INSTANCES:
+        assert _outcome(is_valid, instance) == _outcome(validator.is_valid, instance), instance
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        {"$ref": "http://example.com/schema.json"},
+        {"properties": {"a": {"$id": "http://example.com/a.json", "type": "integer"}}},
+        {"$ref": "#/definitions/missing"},
+    ],
+)
+def test_unsupported_schemas_are_not_compiled(schema: Any) -> None:
+    assert compile_validator(Draft7Validator(schema)) is None
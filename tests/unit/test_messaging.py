@@ -0,0 +1,62 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future
+from confluent_kafka import Message
+from confluent_kafka.error import KafkaError
+from karapace.config import DEFAULTS
+from karapace.kafka.producer import _on_delivery_callback, AsyncKafkaProducer
+from karapace.key_format import KeyFormatter
+from karapace.messaging import KarapaceProducer
+from karapace.offset_watcher import OffsetWatcher
+from unittest.mock import AsyncMock, Mock
+
+import asyncio
+import pytest
+
+
+def _karapace_producer(kafka_producer: AsyncKafkaProducer) -> KarapaceProducer:
+    producer = KarapaceProducer(config=DEFAULTS, offset_watcher=OffsetWatcher(), key_formatter=KeyFormatter())
+    producer._producer = kafka_producer  # pylint: disable=protected-access
+    return producer
+
+
+def test_delivery_report_of_a_cancelled_send_is_ignored() -> None:
+    delivery: Future[Message] = Future()
+    delivery.cancel()
+
+    _on_delivery_callback(delivery, None, Mock(spec=Message))
+    _on_delivery_callback(delivery, KafkaError(KafkaError._MSG_TIMED_OUT), None)  # pylint: disable=protected-access
+
+    assert delivery.cancelled()
+
+
+async def test_delivery_report_after_the_send_timed_out() -> None:
+    loop = asyncio.get_running_loop()
+    delivery: Future[Message] = Future()
+    kafka_producer = AsyncMock(spec=AsyncKafkaProducer)
+    kafka_producer.send.return_value = asyncio.wrap_future(delivery, loop=loop)
+    producer = _karapace_producer(kafka_producer)
+    producer._kafka_timeout = 0.01  # pylint: disable=protected-access
+
+    with pytest.raises(asyncio.TimeoutError):
+        await producer._produce(b"key", b"value")  # pylint: disable=protected-access
+    assert not delivery.cancelled()
+
+    # The poll-thread reports the delivery once the send timed out
+    message = Mock(spec=Message)
+    await loop.run_in_executor(None, _on_delivery_callback, delivery, None, message)
+    assert delivery.result() is message
+
+
+async def test_close_flushes_the_pending_sends() -> None:
+    kafka_producer = AsyncMock(spec=AsyncKafkaProducer)
+    producer = _karapace_producer(kafka_producer)
+
+    await producer.close()
+
+    kafka_producer.flush.assert_awaited_once_with(timeout=10)
+    kafka_producer.stop.assert_awaited_once_with()
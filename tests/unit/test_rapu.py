@@ -3,12 +3,15 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 from _pytest.logging import LogCaptureFixture
-from aiohttp.client_exceptions import ClientConnectionError
+from aiohttp.client_exceptions import ClientConnectionError, ClientPayloadError
+from aiohttp.test_utils import TestClient, TestServer
 from aiohttp.web import Request
+from collections.abc import Iterator
 from karapace.config import DEFAULTS
 from karapace.karapace import KarapaceBase
-from karapace.rapu import HTTPRequest, REST_ACCEPT_RE, REST_CONTENT_TYPE_RE
+from karapace.rapu import etag_matches, HTTPRequest, HTTPResponse, JSONArrayStream, REST_ACCEPT_RE, REST_CONTENT_TYPE_RE
 from karapace.statsd import StatsClient
+from karapace.utils import json_encode
 from unittest.mock import Mock
 
 import logging
@@ -198,3 +201,65 @@ async def test_close_by_app(caplog: LogCaptureFixture) -> None:
         assert log.name == "karapace"
         assert log.levelname == "WARNING"
         assert log.message == "=======> Received shutdown signal, closing Application <======="
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "matches"),
+    [
+        (None, False),
+        ("", False),
+        ('W/"1-a"', True),
+        ('"1-a"', True),
+        ('"0-a", W/"1-a"', True),
+        ('"1-b"', False),
+    ],
+)
+def test_etag_matches(if_none_match: str, matches: bool) -> None:
+    assert etag_matches(if_none_match, 'W/"1-a"') is matches
+
+
+def test_json_array_stream_chunks() -> None:
+    items = [{"subject": f"subject-{i}", "id": i} for i in range(100)]
+
+    chunks = list(JSONArrayStream(items, chunk_size=256).chunks())
+
+    assert len(chunks) > 1
+    assert all(len(chunk) < 256 + 64 for chunk in chunks)
+    assert b"".join(chunks) == json_encode(items, sort_keys=True, binary=True)
+    assert list(JSONArrayStream(iter([])).chunks()) == [b"[]"]
+
+
+async def test_json_array_stream_response() -> None:
+    app = KarapaceBase(config=DEFAULTS)
+
+    async def stream() -> None:
+        raise HTTPResponse(body=JSONArrayStream(iter(range(1000)), chunk_size=128))
+
+    app.route("/items", callback=stream, method="GET")
+
+    async with TestClient(TestServer(app.app)) as client:
+        response = await client.get("/items")
+        assert response.status == 200
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        assert response.headers["Content-Type"] == "application/json"
+        assert "etag" not in response.headers
+        assert await response.json() == list(range(1000))
+
+
+async def test_json_array_stream_failure_drops_the_connection() -> None:
+    app = KarapaceBase(config=DEFAULTS)
+
+    def items() -> Iterator[int]:
+        yield from range(100)
+        raise ValueError("failed")
+
+    async def stream() -> None:
+        raise HTTPResponse(body=JSONArrayStream(items(), chunk_size=16))
+
+    app.route("/items", callback=stream, method="GET")
+
+    async with TestClient(TestServer(app.app)) as client:
+        response = await client.get("/items")
+        assert response.status == 200
+        with pytest.raises(ClientPayloadError):
+            await response.read()
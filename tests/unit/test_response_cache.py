@@ -0,0 +1,57 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.response_cache import response_tags, ResponseCache
+from karapace.typing import SchemaId, Subject
+
+SUBJECT_TAGS = response_tags(subjects=[Subject("subject")])
+
+
+def test_responses_are_served_until_their_tags_are_invalidated() -> None:
+    cache = ResponseCache(maxsize=10)
+    cache.put("subject", b"subject", cache.tag_versions(SUBJECT_TAGS))
+    cache.put("schema", b"schema", cache.tag_versions(response_tags(schema_ids=[SchemaId(1)])))
+
+    assert cache.get("subject") == b"subject"
+    cache.invalidate(response_tags(subjects=[Subject("other")], schema_ids=[SchemaId(2)]))
+    assert cache.get("subject") == b"subject"
+
+    cache.invalidate(SUBJECT_TAGS)
+
+    assert cache.get("subject") is None
+    assert cache.get("schema") == b"schema"
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert len(cache) == 1
+
+
+def test_response_built_during_an_invalidation_is_not_served() -> None:
+    cache = ResponseCache(maxsize=10)
+
+    tag_versions = cache.tag_versions(SUBJECT_TAGS)
+    cache.invalidate(SUBJECT_TAGS)
+    cache.put("subject", b"stale", tag_versions)
+
+    assert cache.get("subject") is None
+    cache.put("subject", b"fresh", cache.tag_versions(SUBJECT_TAGS))
+    assert cache.get("subject") == b"fresh"
+
+
+def test_least_recently_used_responses_are_evicted() -> None:
+    cache = ResponseCache(maxsize=2)
+    for key in ["a", "b"]:
+        cache.put(key, key.encode(), ())
+    assert cache.get("a") == b"a"
+    cache.put("c", b"c", ())
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a"
+
+
+def test_disabled_cache_stores_nothing() -> None:
+    cache = ResponseCache(maxsize=0)
+    cache.put("subject", b"subject", cache.tag_versions(SUBJECT_TAGS))
+    cache.invalidate(SUBJECT_TAGS)
+
+    assert cache.get("subject") is None
+    assert not cache.enabled
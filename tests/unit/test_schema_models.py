@@ -6,8 +6,8 @@ See LICENSE for details
 """
 
 from avro.schema import Schema as AvroSchema
-from karapace.errors import InvalidVersion, VersionNotFoundException
-from karapace.schema_models import parse_avro_schema_definition, SchemaVersion, TypedSchema, Versioner
+from karapace.errors import InvalidSchema, InvalidVersion, VersionNotFoundException
+from karapace.schema_models import parse_avro_schema_definition, ParsedSchemaCache, SchemaVersion, TypedSchema, Versioner
 from karapace.schema_type import SchemaType
 from karapace.typing import Version, VersionTag
 from typing import Any, Callable, Optional
@@ -171,3 +171,62 @@ class TestVersioner:
         """
         with pytest.raises(InvalidVersion):
             Versioner.validate_tag(tag=tag)
+
+
+class TestParsedSchemaCache:
+    @staticmethod
+    def _schema(name: str) -> TypedSchema:
+        return TypedSchema(schema_type=SchemaType.AVRO, schema_str=f'{{"type": "record", "name": "{name}", "fields": []}}')
+
+    def test_parse_is_cached(self) -> None:
+        cache = ParsedSchemaCache(maxsize=10)
+        first = cache.parse(self._schema("Record"))
+        second = cache.parse(self._schema("Record"))
+
+        assert first is second
+        assert isinstance(first.schema, AvroSchema)
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 0)
+
+    def test_parse_options_are_cached_separately(self) -> None:
+        cache = ParsedSchemaCache(maxsize=10)
+        schema = self._schema("Record")
+
+        assert cache.parse(schema) is not cache.parse(schema, normalize=True)
+        assert cache.parse(schema) is not cache.parse(schema, validate=True)
+        assert cache.misses == 3
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = ParsedSchemaCache(maxsize=2)
+        cache.parse(self._schema("First"))
+        cache.parse(self._schema("Second"))
+        cache.parse(self._schema("First"))
+        cache.parse(self._schema("Third"))
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        cache.parse(self._schema("First"))
+        assert cache.hits == 2
+
+    def test_disabled_cache(self) -> None:
+        cache = ParsedSchemaCache(maxsize=0)
+        assert cache.parse(self._schema("Record")) is not cache.parse(self._schema("Record"))
+        assert len(cache) == 0
+
+    def test_invalid_schema_is_not_cached(self) -> None:
+        cache = ParsedSchemaCache(maxsize=10)
+        schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str='{"type": "record", "name": "1-invalid", "fields": []}')
+
+        with pytest.raises(InvalidSchema):
+            cache.parse(schema, validate=True)
+        assert len(cache) == 0
+
+    def test_typed_schema_uses_cache(self) -> None:
+        cache = ParsedSchemaCache(maxsize=10)
+        schema = TypedSchema(
+            schema_type=SchemaType.AVRO,
+            schema_str='{"type": "record", "name": "Record", "fields": []}',
+            parsed_schema_cache=cache,
+        )
+
+        assert schema.schema is schema.schema
+        assert (cache.hits, cache.misses) == (1, 1)
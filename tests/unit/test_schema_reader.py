@@ -9,12 +9,13 @@ from _pytest.logging import LogCaptureFixture
 from concurrent.futures import Future, ThreadPoolExecutor
 from confluent_kafka import Message
 from dataclasses import dataclass
-from karapace.config import DEFAULTS
-from karapace.errors import CorruptKafkaRecordException, ShutdownException
+from karapace.config import DEFAULTS, set_config_defaults
+from karapace.errors import CorruptKafkaRecordException, InvalidReferences, ShutdownException
 from karapace.in_memory_database import InMemoryDatabase
 from karapace.kafka.consumer import KafkaConsumer
 from karapace.key_format import KeyFormatter
 from karapace.offset_watcher import OffsetWatcher
+from karapace.response_cache import response_tags, ResponseCache
 from karapace.schema_reader import (
     KafkaSchemaReader,
     MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP,
@@ -23,14 +24,16 @@ from karapace.schema_reader import (
     OFFSET_EMPTY,
     OFFSET_UNINITIALIZED,
 )
+from karapace.schema_references import Reference
 from karapace.schema_type import SchemaType
-from karapace.typing import SchemaId, Version
+from karapace.typing import SchemaId, Subject, Version
 from pytest import MonkeyPatch
 from tests.base_testcase import BaseTestCase
 from tests.utils import schema_protobuf_invalid_because_corrupted, schema_protobuf_with_invalid_ref
 from typing import Callable, Optional
 from unittest.mock import Mock
 
+import asyncio
 import confluent_kafka
 import json
 import logging
@@ -88,6 +91,24 @@ def test_offset_watcher() -> None:
     assert consumed_cnt == 100, "Did not consume expected amount of records"
 
 
+async def test_offset_watcher_async() -> None:
+    watcher = OffsetWatcher()
+    watcher.offset_seen(new_offset=0)
+    assert await watcher.wait_for_offset_async(expected_offset=0, timeout=0.1)
+
+    loop = asyncio.get_running_loop()
+    waiting = asyncio.create_task(watcher.wait_for_offset_async(expected_offset=5, timeout=5))
+    await asyncio.sleep(0)
+    # The reader thread reports the seen offsets
+    await loop.run_in_executor(None, watcher.offset_seen, 4)
+    assert not waiting.done()
+    await loop.run_in_executor(None, watcher.offset_seen, 5)
+    assert await waiting
+
+    assert not await watcher.wait_for_offset_async(expected_offset=10, timeout=0.1)
+    assert watcher._async_waiters == []  # pylint: disable=protected-access
+
+
 @dataclass
 class ReadinessTestCase(BaseTestCase):
     cur_offset: int
@@ -662,3 +683,222 @@ def test_message_error_handling_with_invalid_reference_schema_protobuf(
 
         assert warn_records[1].name == "karapace.schema_reader"
         assert warn_records[1].message == "Invalid Protobuf references"
+
+
+def _protobuf_schema_message(
+    subject: str, schema_id: int, schema: str, references: list[str], deleted: bool = False
+) -> tuple[dict, dict]:
+    key = {"keytype": "SCHEMA", "subject": subject, "version": 1, "magic": 1}
+    value = {
+        "schemaType": "PROTOBUF",
+        "subject": subject,
+        "version": 1,
+        "id": schema_id,
+        "deleted": deleted,
+        "schema": schema,
+        "references": [{"name": f"{reference}.proto", "subject": reference, "version": 1} for reference in references],
+    }
+    return key, value
+
+
+def test_referenced_schemas_are_resolved_once_and_invalidated_on_delete() -> None:
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    base_schema = 'syntax = "proto3";\n\nmessage Base {\n  int32 value = 1;\n}\n'
+    schemas = {
+        "base": (1, base_schema, []),
+        "left": (2, 'syntax = "proto3";\n\nimport "base.proto";\n\nmessage Left {\n  Base base = 1;\n}\n', ["base"]),
+        "right": (3, 'syntax = "proto3";\n\nimport "base.proto";\n\nmessage Right {\n  Base base = 1;\n}\n', ["base"]),
+    }
+    for subject, (schema_id, schema, references) in schemas.items():
+        schema_reader.handle_msg(*_protobuf_schema_message(subject, schema_id, schema, references))
+
+    resolve_and_validate = Mock(wraps=schema_reader._resolve_and_validate)  # pylint: disable=protected-access
+    schema_reader._resolve_and_validate = resolve_and_validate  # pylint: disable=protected-access
+    references = [
+        Reference(name="left.proto", subject=Subject("left"), version=Version(1)),
+        Reference(name="right.proto", subject=Subject("right"), version=Version(1)),
+    ]
+
+    _, dependencies = schema_reader.resolve_references(references)
+    assert set(dependencies) == {"left.proto", "right.proto"}
+    # The shared base schema has been resolved when storing the referencing schemas
+    assert resolve_and_validate.call_count == 2
+
+    schema_reader.resolve_references(references)
+    assert resolve_and_validate.call_count == 2
+
+    # Soft deleting the referenced schema invalidates the referencing schemas
+    schema_reader.handle_msg(*_protobuf_schema_message("base", 1, base_schema, [], deleted=True))
+    with pytest.raises(InvalidReferences):
+        schema_reader.resolve_references(references)
+
+
+def _schema_record(offset: int, subject: str, schema_id: int) -> Mock:
+    record = Mock(spec=confluent_kafka.Message)
+    record.error.return_value = None
+    record.key.return_value = json.dumps({"keytype": "SCHEMA", "subject": subject, "version": 1, "magic": 1})
+    record.value.return_value = json.dumps(
+        {"subject": subject, "version": 1, "id": schema_id, "deleted": False, "schema": '"int"'}
+    )
+    record.offset.return_value = offset
+    return record
+
+
+def test_startup_replay_defers_gauges_and_record_logs(caplog: LogCaptureFixture) -> None:
+    consumer_mock = Mock(spec=KafkaConsumer)
+    consumer_mock.consume.side_effect = [[_schema_record(1, "first", 1)], [_schema_record(2, "second", 2)], []]
+    # Return tuple (beginning, end), end offset is the next upcoming record offset
+    consumer_mock.get_watermark_offsets.return_value = (0, 3)
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    schema_reader.consumer = consumer_mock
+    schema_reader.offset = 0
+    schema_reader.stats = Mock()
+
+    with caplog.at_level(logging.INFO, logger="karapace.in_memory_database"):
+        schema_reader.handle_messages()
+        schema_reader.handle_messages()
+    assert schema_reader.ready() is False
+    assert schema_reader.database.find_subjects(include_deleted=False) == ["first", "second"]
+    assert not [record for record in caplog.records if record.message.startswith("Adding entry")]
+    schema_reader.stats.gauge.assert_not_called()
+
+    schema_reader.handle_messages()
+    assert schema_reader.ready() is True
+    schema_reader.stats.gauge.assert_any_call(metric="karapace_schema_reader_subjects", value=2)
+
+
+def _raw_record(offset: int, key: bytes, value: bytes | None) -> Mock:
+    record = Mock(spec=confluent_kafka.Message)
+    record.error.return_value = None
+    record.key.return_value = key
+    record.value.return_value = value
+    record.offset.return_value = offset
+    return record
+
+
+def _replay(config: dict, records: list[Mock]) -> KafkaSchemaReader:
+    schema_reader = KafkaSchemaReader(
+        config=set_config_defaults(config),
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    schema_reader.offset = 0
+    schema_reader.consume_messages(records, watch_offsets=False)
+    schema_reader._shutdown_parse_executor()  # pylint: disable=protected-access
+    return schema_reader
+
+
+def test_parse_workers_apply_records_in_offset_order() -> None:
+    def schema_key(subject: str, version: int) -> bytes:
+        return json.dumps({"keytype": "SCHEMA", "subject": subject, "version": version, "magic": 1}).encode()
+
+    def schema_value(subject: str, version: int, schema_id: int, schema: str, **extra: object) -> bytes:
+        value = {"subject": subject, "version": version, "id": schema_id, "deleted": False, "schema": schema}
+        return json.dumps({**value, **extra}).encode()
+
+    records = [
+        _raw_record(1, schema_key("avro", 1), schema_value("avro", 1, 1, '{"type": "int" }')),
+        _raw_record(2, b"not json", b"{}"),
+        _raw_record(3, schema_key("avro", 2), schema_value("avro", 2, 2, '{ "name": "R", "type": "record", "fields": []}')),
+        _raw_record(4, schema_key("invalid", 1), schema_value("invalid", 1, 3, "not json")),
+        _raw_record(
+            5,
+            schema_key("referenced", 1),
+            schema_value(
+                "referenced", 1, 4, 'syntax = "proto3";\nmessage Referenced { string name = 1; }', schemaType="PROTOBUF"
+            ),
+        ),
+        _raw_record(
+            6,
+            schema_key("referencing", 1),
+            schema_value(
+                "referencing",
+                1,
+                5,
+                'syntax = "proto3";\nimport "referenced.proto";\nmessage Referencing { Referenced referenced = 1; }',
+                schemaType="PROTOBUF",
+                references=[{"name": "referenced.proto", "subject": "referenced", "version": 1}],
+            ),
+        ),
+        _raw_record(
+            7,
+            json.dumps({"keytype": "DELETE_SUBJECT", "subject": "avro", "magic": 0}).encode(),
+            b'{"subject": "avro", "version": 1}',
+        ),
+        _raw_record(
+            8,
+            json.dumps({"keytype": "CONFIG", "subject": "avro", "magic": 0}).encode(),
+            b'{"compatibilityLevel": "FULL"}',
+        ),
+    ]
+
+    serial = _replay({}, records)
+    parallel = _replay({"schema_reader_parse_workers": 2, "schema_reader_parse_pool": "thread"}, records)
+
+    assert parallel.offset == serial.offset == 8
+    assert parallel.database.find_subjects(include_deleted=True) == ["avro", "referenced", "referencing"]
+    for subject in serial.database.find_subjects(include_deleted=True):
+        assert parallel.database.find_subject_schemas(subject=subject, include_deleted=True) == (
+            serial.database.find_subject_schemas(subject=subject, include_deleted=True)
+        )
+        assert parallel.database.get_subject_compatibility(subject=subject) == (
+            serial.database.get_subject_compatibility(subject=subject)
+        )
+    assert parallel.database.get_referenced_by(Subject("referenced"), Version(1)) == [5]
+
+
+def test_applied_records_invalidate_the_responses_of_their_subjects_and_schema_ids() -> None:
+    response_cache = ResponseCache(maxsize=10)
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+        response_cache=response_cache,
+    )
+
+    def schema_message(subject: str, version: int, schema_id: int) -> tuple[dict, dict]:
+        key = {"keytype": "SCHEMA", "subject": subject, "version": version, "magic": 1}
+        return key, {"subject": subject, "version": version, "id": schema_id, "deleted": False, "schema": '"int"'}
+
+    def cache_responses() -> None:
+        for key, tags in [
+            ("a", response_tags(subjects=[Subject("a")])),
+            ("b", response_tags(subjects=[Subject("b")])),
+            ("id-1", response_tags(schema_ids=[SchemaId(1)])),
+            ("id-2", response_tags(schema_ids=[SchemaId(2)])),
+        ]:
+            response_cache.put(key, b"response", response_cache.tag_versions(tags))
+
+    def cached() -> set[str]:
+        return {key for key in ["a", "b", "id-1", "id-2"] if response_cache.get(key) is not None}
+
+    schema_reader.handle_msg(*schema_message("a", 1, 1))
+    schema_reader.handle_msg(*schema_message("b", 1, 2))
+    cache_responses()
+
+    schema_reader.handle_msg(*schema_message("a", 2, 1))
+    assert cached() == {"b", "id-2"}
+
+    cache_responses()
+    schema_reader.handle_msg({"keytype": "DELETE_SUBJECT", "subject": "b", "magic": 0}, {"subject": "b", "version": 1})
+    assert cached() == {"a", "id-1"}
+
+    cache_responses()
+    schema_reader.handle_msg({"keytype": "SCHEMA", "subject": "a", "version": 1, "magic": 1}, None)
+    assert cached() == {"b", "id-2"}
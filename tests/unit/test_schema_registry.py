@@ -0,0 +1,165 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from karapace.config import set_config_defaults
+from karapace.errors import InvalidReferences, SchemaTooLargeException
+from karapace.messaging import KarapaceProducer
+from karapace.schema_models import SchemaType, TypedSchema, ValidatedTypedSchema
+from karapace.schema_registry import KarapaceSchemaRegistry
+from karapace.typing import SchemaId, Subject, Version
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import asyncio
+
+
+def _avro_schema(name: str) -> ValidatedTypedSchema:
+    return ValidatedTypedSchema.parse(SchemaType.AVRO, f'{{"type": "record", "name": "{name}", "fields": []}}')
+
+
+def _group_commit_registry(errors: list[Exception | None] | None = None) -> KarapaceSchemaRegistry:
+    registry = KarapaceSchemaRegistry(config=set_config_defaults({"schema_write_group_commit_ms": 50}))
+
+    async def send_messages(messages: list[tuple[dict[str, Any], dict[str, Any] | None]]) -> list[Exception | None]:
+        # Stand-in for the schema reader consuming the written messages
+        results = errors if errors is not None else [None] * len(messages)
+        for (_, value), error in zip(messages, results):
+            if error is None and value is not None:
+                registry.database.insert_schema_version(
+                    subject=value["subject"],
+                    schema_id=value["id"],
+                    version=Version(value["version"]),
+                    deleted=value["deleted"],
+                    schema=TypedSchema(schema_type=SchemaType.AVRO, schema_str=value["schema"]),
+                    references=None,
+                )
+        return results
+
+    registry.producer = Mock(spec=KarapaceProducer)
+    registry.producer.send_messages = AsyncMock(side_effect=send_messages)
+    return registry
+
+
+async def test_concurrent_registrations_share_a_single_write() -> None:
+    registry = _group_commit_registry()
+
+    schema_ids = await asyncio.gather(
+        *(registry.write_new_schema_local(Subject(f"subject-{i}"), _avro_schema(f"Record{i}"), None) for i in range(3))
+    )
+
+    assert sorted(schema_ids) == [1, 2, 3]
+    registry.producer.send_messages.assert_awaited_once()
+    for i, schema_id in enumerate(schema_ids):
+        schema_version = registry.database.find_subject_schemas(subject=Subject(f"subject-{i}"), include_deleted=False)
+        assert {version: sv.schema_id for version, sv in schema_version.items()} == {Version(1): schema_id}
+
+
+async def test_same_schema_in_one_group_gets_one_id() -> None:
+    registry = _group_commit_registry()
+
+    schema_ids = await asyncio.gather(
+        registry.write_new_schema_local(Subject("subject-1"), _avro_schema("Record"), None),
+        registry.write_new_schema_local(Subject("subject-2"), _avro_schema("Record"), None),
+    )
+
+    assert schema_ids == [1, 1]
+    registry.producer.send_messages.assert_awaited_once()
+
+
+async def test_registrations_to_the_same_subject_are_written_in_order() -> None:
+    registry = _group_commit_registry()
+
+    schema_ids = await asyncio.gather(
+        registry.write_new_schema_local(Subject("subject"), _avro_schema("Record"), None),
+        registry.write_new_schema_local(Subject("subject"), _avro_schema("Record"), None),
+    )
+
+    # The second registration waits for the first one to be visible and finds the schema
+    assert schema_ids == [1, 1]
+    registry.producer.send_messages.assert_awaited_once()
+    assert list(registry.database.find_subject_schemas(subject=Subject("subject"), include_deleted=False)) == [Version(1)]
+
+
+async def test_errors_are_reported_per_registration() -> None:
+    registry = _group_commit_registry(errors=[None, SchemaTooLargeException()])
+
+    results = await asyncio.gather(
+        registry.write_new_schema_local(Subject("subject-1"), _avro_schema("Record1"), None),
+        registry.write_new_schema_local(Subject("subject-2"), _avro_schema("Record2"), None),
+        return_exceptions=True,
+    )
+
+    assert results[0] == 1
+    assert isinstance(results[1], SchemaTooLargeException)
+    assert not registry.database.find_subject(subject=Subject("subject-2"))
+
+
+async def test_subject_delete_commits_pending_registrations() -> None:
+    registry = _group_commit_registry()
+    registry.send_delete_subject_message = AsyncMock()
+
+    registration = asyncio.create_task(registry.write_new_schema_local(Subject("subject"), _avro_schema("Record"), None))
+    await asyncio.sleep(0)
+    assert registry.database.find_subject(subject=Subject("subject")) is None
+
+    await registry.subject_delete_local(Subject("subject"), permanent=False)
+
+    assert await registration == 1
+    registry.send_delete_subject_message.assert_awaited_once_with(Subject("subject"), Version(1))
+
+
+async def test_batch_is_written_with_a_single_flush() -> None:
+    registry = _group_commit_registry()
+
+    results = await registry.write_new_schemas_local(
+        [
+            (Subject("subject-1"), _avro_schema("Record1"), None),
+            (Subject("subject-2"), _avro_schema("Record2"), None),
+            (Subject("subject-3"), _avro_schema("Record1"), None),
+        ]
+    )
+
+    assert results == [1, 2, 1]
+    registry.producer.send_messages.assert_awaited_once()
+
+
+async def test_batch_registers_a_subject_again_after_flushing() -> None:
+    registry = _group_commit_registry()
+
+    results = await registry.write_new_schemas_local(
+        [
+            (Subject("subject"), _avro_schema("Record"), None),
+            (Subject("subject"), _avro_schema("Record"), None),
+        ]
+    )
+
+    assert results == [1, 1]
+    registry.producer.send_messages.assert_awaited_once()
+    assert list(registry.database.find_subject_schemas(subject=Subject("subject"), include_deleted=False)) == [Version(1)]
+
+
+async def test_batch_reports_unexpected_errors_per_entry() -> None:
+    registry = _group_commit_registry()
+    prepare_new_schema = registry._prepare_new_schema  # pylint: disable=protected-access
+    error = InvalidReferences()
+
+    def prepare(subject: Subject, new_schema: ValidatedTypedSchema) -> tuple[SchemaId, Version | None]:
+        if subject == "subject-2":
+            raise error
+        return prepare_new_schema(subject, new_schema)
+
+    registry._prepare_new_schema = prepare  # pylint: disable=protected-access
+    results = await registry.write_new_schemas_local(
+        [
+            (Subject("subject-1"), _avro_schema("Record1"), None),
+            (Subject("subject-2"), _avro_schema("Record2"), None),
+            (Subject("subject-3"), _avro_schema("Record3"), None),
+        ]
+    )
+
+    assert results == [1, error, 2]
+    registry.producer.send_messages.assert_awaited_once()
+    assert registry.database.find_subject(subject=Subject("subject-2")) is None
@@ -2,16 +2,25 @@
 Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
+from __future__ import annotations
+
 from aiohttp.test_utils import TestClient, TestServer
 from karapace.config import DEFAULTS, set_config_defaults
+from karapace.messaging import KarapaceProducer
 from karapace.rapu import HTTPResponse
+from karapace.response_cache import response_tags, ResponseCache
+from karapace.schema_models import SchemaType, SchemaVersion, TypedSchema
 from karapace.schema_reader import KafkaSchemaReader
 from karapace.schema_registry import KarapaceSchemaRegistry
 from karapace.schema_registry_apis import KarapaceSchemaRegistryController
+from karapace.typing import JsonObject, SchemaId, Subject, Version
+from karapace.utils import json_encode
+from typing import Any
 from unittest.mock import ANY, AsyncMock, Mock, patch, PropertyMock
 
 import asyncio
 import pytest
+import sys
 
 
 async def test_validate_schema_request_body() -> None:
@@ -63,3 +72,292 @@ async def test_forward_when_not_ready() -> None:
             mock_forward_func.assert_called_once_with(
                 request=ANY, body=None, url="http://primary-url/schemas/ids/1", content_type="application/json", method="GET"
             )
+
+
+async def test_batch_rounds_order_entries_after_their_references() -> None:
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+    entries = [
+        {"subject": "c", "references": [{"name": "b.proto", "subject": "b", "version": -1}]},
+        {"subject": "b", "references": [{"name": "a.proto", "subject": "a", "version": 1}]},
+        {"subject": "a"},
+        {"subject": "unrelated", "references": [{"name": "x.proto", "subject": "registered-before", "version": 1}]},
+    ]
+    results: list[JsonObject | None] = [None] * len(entries)
+
+    dependencies = controller._batch_dependencies(entries)  # pylint: disable=protected-access
+    assert dependencies == [[1], [2], [], []]
+    assert controller._batch_rounds(entries, dependencies, results) == [[2, 3], [1], [0]]  # pylint: disable=protected-access
+    assert results == [None] * len(entries)
+
+
+async def test_batch_rounds_reject_circular_references() -> None:
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+    entries = [
+        {"subject": "a", "references": [{"name": "b.proto", "subject": "b", "version": -1}]},
+        {"subject": "b", "references": [{"name": "a.proto", "subject": "a", "version": -1}]},
+        {"subject": "c"},
+    ]
+    results: list[JsonObject | None] = [None] * len(entries)
+
+    dependencies = controller._batch_dependencies(entries)  # pylint: disable=protected-access
+    assert controller._batch_rounds(entries, dependencies, results) == [[2]]  # pylint: disable=protected-access
+    assert [(result or {}).get("error_code") for result in results] == [42201, 42201, None]
+
+
+async def test_batch_rounds_order_a_long_chain_of_references() -> None:
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+    chain_length = sys.getrecursionlimit() * 2
+    entries: list[dict[str, Any]] = [{"subject": "s-0"}]
+    for i in range(1, chain_length):
+        entries.append(
+            {"subject": f"s-{i}", "references": [{"name": f"{i - 1}.proto", "subject": f"s-{i - 1}", "version": -1}]}
+        )
+    entries.reverse()
+    results: list[JsonObject | None] = [None] * len(entries)
+
+    dependencies = controller._batch_dependencies(entries)  # pylint: disable=protected-access
+    rounds = controller._batch_rounds(entries, dependencies, results)  # pylint: disable=protected-access
+
+    assert rounds == [[index] for index in reversed(range(chain_length))]
+    assert results == [None] * len(entries)
+
+
+def _batch_registry() -> KarapaceSchemaRegistry:
+    registry = KarapaceSchemaRegistry(config=set_config_defaults(DEFAULTS))
+    registry.schema_reader.ready = Mock(return_value=True)
+    registry.get_master = AsyncMock(return_value=(True, None))
+    registry.start = AsyncMock()
+    registry.close = AsyncMock()
+
+    async def send_messages(messages: list[tuple[dict[str, Any], dict[str, Any] | None]]) -> list[Exception | None]:
+        # Stand-in for the schema reader consuming the written messages
+        for _, value in messages:
+            assert value is not None
+            registry.database.insert_schema_version(
+                subject=value["subject"],
+                schema_id=value["id"],
+                version=Version(value["version"]),
+                deleted=value["deleted"],
+                schema=TypedSchema(schema_type=SchemaType(value.get("schemaType", "AVRO")), schema_str=value["schema"]),
+                references=None,
+            )
+        return [None] * len(messages)
+
+    registry.producer = Mock(spec=KarapaceProducer)
+    registry.producer.send_messages = AsyncMock(side_effect=send_messages)
+    return registry
+
+
+def _record(name: str) -> str:
+    return json_encode({"type": "record", "name": name, "fields": []})
+
+
+BASE_PROTO = """\
+syntax = "proto3";
+package base;
+
+message Base {
+  string name = 1;
+}
+"""
+
+DEPENDENT_PROTO = """\
+syntax = "proto3";
+package dependent;
+
+import "base.proto";
+
+message Dependent {
+  base.Base base = 1;
+}
+"""
+
+DEPENDENT_ENTRY = {
+    "subject": "dependent",
+    "schemaType": "PROTOBUF",
+    "schema": DEPENDENT_PROTO,
+    "references": [{"name": "base.proto", "subject": "base", "version": 1}],
+}
+
+
+async def _post_batch(registry: KarapaceSchemaRegistry, entries: list[dict[str, Any]]) -> tuple[int, Any]:
+    with patch("karapace.schema_registry_apis.KarapaceSchemaRegistry", return_value=registry):
+        controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+        async with TestClient(TestServer(controller.app)) as client:
+            response = await client.post("/subjects", json={"schemas": entries})
+            return response.status, await response.json()
+
+
+async def test_subjects_batch_post_reports_errors_per_entry_in_order() -> None:
+    registry = _batch_registry()
+
+    status, results = await _post_batch(
+        registry,
+        [
+            {"subject": "first", "schema": _record("First")},
+            {"subject": "bad\x01subject", "schema": _record("Bad")},
+            {"subject": "bad-body", "schema": _record("Bad"), "unexpected": True},
+            {**DEPENDENT_ENTRY, "subject": "bad-references"},
+            {"subject": "invalid", "schema": "{"},
+            {"subject": "second", "schema": _record("Second")},
+            {"subject": "again", "schema": _record("First")},
+        ],
+    )
+
+    assert status == 200
+    assert len(results) == 7
+    assert results[0] == {"id": 1}
+    assert results[1]["error_code"] == 42208
+    assert results[2]["error_code"] == 422
+    assert results[3]["error_code"] == 42201
+    assert results[4]["error_code"] == 42201
+    assert results[5] == {"id": 2}
+    assert results[6] == {"id": 1}
+    registry.producer.send_messages.assert_awaited_once()
+
+
+async def test_subjects_batch_post_registers_references_of_the_same_batch_first() -> None:
+    registry = _batch_registry()
+
+    status, results = await _post_batch(
+        registry,
+        [DEPENDENT_ENTRY, {"subject": "base", "schemaType": "PROTOBUF", "schema": BASE_PROTO}],
+    )
+
+    assert status == 200
+    assert results == [{"id": 2}, {"id": 1}]
+    assert registry.producer.send_messages.await_count == 2
+    assert registry.database.find_subjects(include_deleted=False) == [Subject("base"), Subject("dependent")]
+
+
+async def test_subjects_batch_post_fails_the_entries_referencing_a_failed_entry() -> None:
+    registry = _batch_registry()
+
+    status, results = await _post_batch(
+        registry,
+        [DEPENDENT_ENTRY, {"subject": "base", "schemaType": "PROTOBUF", "schema": "syntax = "}],
+    )
+
+    assert status == 200
+    assert results[0] == {
+        "error_code": 42201,
+        "message": "Referenced schema of subject base was not registered",
+    }
+    assert results[1]["error_code"] == 42201
+    registry.producer.send_messages.assert_not_awaited()
+
+
+async def test_subjects_batch_post_forwards_to_the_primary() -> None:
+    registry = _batch_registry()
+    registry.get_master.return_value = (False, "http://primary-url")
+    entries = [{"subject": "subject", "schema": _record("Record")}]
+
+    with patch("karapace.schema_registry_apis.KarapaceSchemaRegistry", return_value=registry):
+        controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+        forward = AsyncMock(side_effect=HTTPResponse([{"id": 10}]))
+        controller._forward_request_remote = forward  # pylint: disable=protected-access
+        async with TestClient(TestServer(controller.app)) as client:
+            response = await client.post("/subjects", json={"schemas": entries})
+            assert response.status == 200
+            assert await response.json() == [{"id": 10}]
+
+    forward.assert_awaited_once_with(
+        request=ANY, body={"schemas": entries}, url="http://primary-url/subjects", content_type=ANY, method="POST"
+    )
+    registry.producer.send_messages.assert_not_awaited()
+
+
+async def test_cacheable_routes_are_not_modified_until_the_state_changes() -> None:
+    with patch("karapace.schema_registry_apis.KarapaceSchemaRegistry") as schema_registry_class:
+        schema_registry = AsyncMock(spec=KarapaceSchemaRegistry)
+        schema_registry.schema_reader = Mock(offset=10, ready=Mock(return_value=True))
+        schema_registry.database = Mock(find_subjects=Mock(return_value=["subject"]))
+        schema_registry_class.return_value = schema_registry
+        controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+
+        async with TestClient(TestServer(controller.app)) as client:
+            response = await client.get("/subjects")
+            assert response.status == 200
+            assert await response.json() == ["subject"]
+            etag = response.headers["etag"]
+            assert etag.startswith('W/"10-')
+
+            response = await client.get("/subjects", headers={"If-None-Match": etag})
+            assert response.status == 304
+            assert response.headers["etag"] == etag
+            assert await response.read() == b""
+            assert schema_registry.database.find_subjects.call_count == 1
+
+            response = await client.get("/subjects?deleted=true", headers={"If-None-Match": etag})
+            assert response.status == 200
+            assert response.headers["etag"] != etag
+
+            schema_registry.schema_reader.offset = 11
+            response = await client.get("/subjects", headers={"If-None-Match": etag})
+            assert response.status == 200
+            assert response.headers["etag"].startswith('W/"11-')
+            assert schema_registry.database.find_subjects.call_count == 3
+
+
+async def test_schemas_list_is_streamed() -> None:
+    with patch("karapace.schema_registry_apis.KarapaceSchemaRegistry") as schema_registry_class:
+        schema_registry = AsyncMock(spec=KarapaceSchemaRegistry)
+        schema_registry.schema_reader = Mock(offset=10, ready=Mock(return_value=True))
+        schema = TypedSchema(schema_type=SchemaType.JSONSCHEMA, schema_str='{"type": "string"}')
+        schema_registry.schemas_list.return_value = {
+            Subject(f"subject-{i}"): [
+                SchemaVersion(
+                    subject=Subject(f"subject-{i}"),
+                    version=Version(1),
+                    deleted=False,
+                    schema_id=SchemaId(i),
+                    schema=schema,
+                    references=None,
+                )
+            ]
+            for i in range(1000)
+        }
+        schema_registry_class.return_value = schema_registry
+        controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+
+        async with TestClient(TestServer(controller.app)) as client:
+            response = await client.get("/schemas")
+            assert response.status == 200
+            assert response.headers["Transfer-Encoding"] == "chunked"
+            assert response.headers["etag"].startswith('W/"10-')
+            assert await response.json() == [
+                {
+                    "subject": f"subject-{i}",
+                    "version": 1,
+                    "id": i,
+                    "schemaType": "JSON",
+                    "schema": schema.schema_str,
+                }
+                for i in range(1000)
+            ]
+
+
+async def test_schema_responses_are_served_from_the_response_cache() -> None:
+    with patch("karapace.schema_registry_apis.KarapaceSchemaRegistry") as schema_registry_class:
+        schema_registry = AsyncMock(spec=KarapaceSchemaRegistry)
+        schema_registry.schema_reader = Mock(offset=10, ready=Mock(return_value=True))
+        schema_registry.response_cache = ResponseCache(maxsize=10)
+        schema_registry.schemas_get = Mock(return_value=TypedSchema(schema_type=SchemaType.AVRO, schema_str='"int"'))
+        schema_registry_class.return_value = schema_registry
+        controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+
+        async with TestClient(TestServer(controller.app)) as client:
+            for _ in range(2):
+                response = await client.get("/schemas/ids/1")
+                assert response.status == 200
+                assert await response.json() == {"schema": '"int"'}
+            assert schema_registry.schemas_get.call_count == 1
+
+            schema_registry.response_cache.invalidate(response_tags(schema_ids=[SchemaId(1)]))
+            response = await client.get("/schemas/ids/1")
+            assert await response.json() == {"schema": '"int"'}
+            assert schema_registry.schemas_get.call_count == 2
+
+            response = await client.get("/schemas/ids/1?fetchMaxId=true")
+            assert response.status == 200
+            assert schema_registry.schemas_get.call_count == 3
@@ -0,0 +1,142 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from karapace.errors import InvalidSnapshot
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.key_format import KeyMode
+from karapace.schema_models import ParsedSchemaCache, SchemaType, TypedSchema
+from karapace.schema_references import Reference
+from karapace.schema_snapshot import create_snapshot, read_snapshot, restore_snapshot, write_snapshot
+from karapace.typing import SchemaId, Subject, Version
+from pathlib import Path
+
+import pytest
+
+REFERENCED_PROTO = """\
+syntax = "proto3";
+
+message Referenced {
+  string name = 1;
+}
+"""
+
+REFERENCING_PROTO = """\
+syntax = "proto3";
+
+import "referenced.proto";
+
+message Referencing {
+  Referenced referenced = 1;
+}
+"""
+
+
+def _populated_database() -> InMemoryDatabase:
+    database = InMemoryDatabase()
+    avro_schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str='{"type": "record", "name": "R", "fields": []}')
+    database.insert_schema_version(
+        subject=Subject("avro"),
+        schema_id=SchemaId(1),
+        version=Version(1),
+        deleted=False,
+        schema=avro_schema,
+        references=None,
+    )
+    database.insert_schema_version(
+        subject=Subject("avro-copy"),
+        schema_id=SchemaId(1),
+        version=Version(1),
+        deleted=True,
+        schema=avro_schema,
+        references=None,
+    )
+    database.set_subject_compatibility(subject=Subject("avro"), compatibility="FULL")
+    database.insert_subject(subject=Subject("config-only"))
+
+    referenced = TypedSchema(schema_type=SchemaType.PROTOBUF, schema_str=REFERENCED_PROTO)
+    database.insert_schema_version(
+        subject=Subject("referenced"),
+        schema_id=SchemaId(2),
+        version=Version(1),
+        deleted=False,
+        schema=referenced,
+        references=None,
+    )
+    references = [Reference(name="referenced.proto", subject=Subject("referenced"), version=Version(1))]
+    referencing = TypedSchema(schema_type=SchemaType.PROTOBUF, schema_str=REFERENCING_PROTO, references=references)
+    database.insert_schema_version(
+        subject=Subject("referencing"),
+        schema_id=SchemaId(3),
+        version=Version(1),
+        deleted=False,
+        schema=referencing,
+        references=references,
+    )
+    database.insert_referenced_by(subject=Subject("referenced"), version=Version(1), schema_id=SchemaId(3))
+    database.global_schema_id = SchemaId(5)
+    return database
+
+
+def _snapshot_file(tmp_path: Path, database: InMemoryDatabase) -> Path:
+    path = tmp_path / "snapshot"
+    snapshot = create_snapshot(
+        database, topic_name="_schemas", offset=42, compatibility="BACKWARD", keymode=KeyMode.CANONICAL
+    )
+    write_snapshot(path, snapshot)
+    return path
+
+
+def test_snapshot_roundtrip(tmp_path: Path) -> None:
+    original = _populated_database()
+    snapshot = read_snapshot(_snapshot_file(tmp_path, original))
+    assert (snapshot.topic_name, snapshot.offset, snapshot.compatibility, snapshot.keymode) == (
+        "_schemas",
+        42,
+        "BACKWARD",
+        KeyMode.CANONICAL,
+    )
+
+    restored = InMemoryDatabase()
+    restore_snapshot(snapshot, restored, ParsedSchemaCache(maxsize=10))
+
+    assert restored.global_schema_id == 5
+    assert restored.find_subjects(include_deleted=True) == original.find_subjects(include_deleted=True)
+    assert restored.get_subject_compatibility(subject=Subject("avro")) == "FULL"
+    for subject in original.find_subjects(include_deleted=True):
+        assert restored.find_subject_schemas(subject=subject, include_deleted=True) == original.find_subject_schemas(
+            subject=subject, include_deleted=True
+        )
+    assert restored.get_referenced_by(Subject("referenced"), Version(1)) == [3]
+    assert restored.get_schema_id(original.find_schema(schema_id=SchemaId(3))) == 3
+    schema_versions = restored.find_schema_versions_by_schema_id(schema_id=SchemaId(1), include_deleted=True)
+    assert [schema_version.subject for schema_version in schema_versions] == ["avro", "avro-copy"]
+    referencing = restored.find_schema(schema_id=SchemaId(3))
+    assert referencing is not None and referencing.dependencies is not None
+    assert referencing.dependencies["referenced.proto"].get_schema().schema_str == str(
+        original.find_schema(schema_id=SchemaId(2))
+    )
+
+
+def test_snapshot_with_wrong_checksum_is_rejected(tmp_path: Path) -> None:
+    path = _snapshot_file(tmp_path, _populated_database())
+    path.write_bytes(path.read_bytes().replace(b'"FULL"', b'"NONE"'))
+
+    with pytest.raises(InvalidSnapshot, match="checksum"):
+        read_snapshot(path)
+
+
+@pytest.mark.parametrize("content", [b"", b"not json\n{}", b'{"format": 0, "checksum": ""}\n{}'])
+def test_corrupt_snapshot_is_rejected(tmp_path: Path, content: bytes) -> None:
+    path = tmp_path / "snapshot"
+    path.write_bytes(content)
+
+    with pytest.raises(InvalidSnapshot):
+        read_snapshot(path)
+
+
+def test_missing_snapshot_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(InvalidSnapshot):
+        read_snapshot(tmp_path / "missing")
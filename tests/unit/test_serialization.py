@@ -6,19 +6,23 @@ from karapace.client import Path
 from karapace.config import DEFAULTS, read_config
 from karapace.schema_models import SchemaType, ValidatedTypedSchema, Versioner
 from karapace.serialization import (
+    AvroCodec,
+    CompiledAvroCodec,
     flatten_unions,
     get_subject_name,
     HEADER_FORMAT,
+    HEADER_SIZE,
     InvalidMessageHeader,
     InvalidMessageSchema,
     InvalidPayload,
+    SchemaRegistryClient,
     SchemaRegistrySerializer,
     START_BYTE,
     write_value,
 )
-from karapace.typing import NameStrategy, Subject, SubjectType
+from karapace.typing import NameStrategy, SchemaId, Subject, SubjectType
 from tests.utils import schema_avro_json, test_objects_avro
-from unittest.mock import call, Mock
+from unittest.mock import AsyncMock, call, Mock
 
 import asyncio
 import avro
@@ -134,10 +138,50 @@ async def test_happy_flow(default_config_path: Path):
         assert o == await serializer.deserialize(await serializer.serialize(schema, o))
     assert len(serializer.ids_to_schemas) == 1
     assert 1 in serializer.ids_to_schemas
+    assert list(serializer.ids_to_avro_codecs) == [1]
 
     assert mock_registry_client.method_calls == [call.get_schema("top"), call.get_schema_for_id(1)]
 
 
+async def test_happy_flow_with_compiled_avro_codec(default_config_path: Path):
+    mock_registry_client = Mock()
+    get_latest_schema_future = asyncio.Future()
+    get_latest_schema_future.set_result((1, ValidatedTypedSchema.parse(SchemaType.AVRO, schema_avro_json), Versioner.V(1)))
+    mock_registry_client.get_schema.return_value = get_latest_schema_future
+
+    serializer = await make_ser_deser(default_config_path, mock_registry_client)
+    serializer.config["avro_compiled_codec"] = True
+    schema = await serializer.get_schema_for_subject(Subject("top"))
+    serializer.ids_to_subjects[1] = [Subject("top")]
+    for o in test_objects_avro:
+        encoded = await serializer.serialize(schema, o)
+        bio = io.BytesIO()
+        write_value(DEFAULTS, schema, bio, o)
+        assert encoded[HEADER_SIZE:] == bio.getvalue()
+        assert o == await serializer.deserialize(encoded)
+    assert isinstance(serializer.ids_to_avro_codecs[1], CompiledAvroCodec)
+
+
+async def test_happy_flow_with_json_schema(default_config_path: Path):
+    mock_registry_client = Mock()
+    get_latest_schema_future = asyncio.Future()
+    get_latest_schema_future.set_result((1, TYPED_JSON_SCHEMA, Versioner.V(1)))
+    mock_registry_client.get_schema.return_value = get_latest_schema_future
+
+    serializer = await make_ser_deser(default_config_path, mock_registry_client)
+    schema = await serializer.get_schema_for_subject(Subject("top"))
+    serializer.ids_to_subjects[1] = [Subject("top")]
+    for o in ({"attr1": "a", "attr2": None}, {}):
+        assert o == await serializer.deserialize(await serializer.serialize(schema, o))
+    assert list(serializer.ids_to_json_schema_validators) == [1]
+    assert not serializer.ids_to_avro_codecs
+
+    with pytest.raises(InvalidPayload):
+        await serializer.serialize(schema, {"attr1": 1})
+    with pytest.raises(InvalidPayload):
+        await serializer.deserialize(struct.pack(HEADER_FORMAT, START_BYTE, 1) + b'{"attr2": 2}')
+
+
 @pytest.mark.parametrize(
     ["record", "flattened_record"],
     [
@@ -152,6 +196,86 @@ def test_flatten_unions_record(record, flattened_record) -> None:
     assert flatten_unions(TYPED_AVRO_SCHEMA.schema, record) == flattened_record
 
 
+@pytest.mark.parametrize(
+    "record",
+    [
+        {"attr1": {"string": "sample data"}, "attr2": "sample data"},
+        {"attrArray": {"array": ["item1", "item2"]}, "attrMap": {"k1": "v1"}},
+        {"attrMap": {"map": {"k1": "v1", "k2": "v2"}}},
+        {"attrRecord": {"Record": {"attr1": "test"}}},
+        {"attrRecord": {"attr1": "test"}, "attr1": None},
+    ],
+)
+def test_avro_codec_writes_the_same_bytes_as_datum_writer(record) -> None:
+    expected = io.BytesIO()
+    avro.io.DatumWriter(TYPED_AVRO_SCHEMA.schema).write(
+        flatten_unions(TYPED_AVRO_SCHEMA.schema, record), avro.io.BinaryEncoder(expected)
+    )
+
+    codec = AvroCodec(TYPED_AVRO_SCHEMA.schema)
+    bio = io.BytesIO()
+    codec.write(bio, record)
+
+    assert bio.getvalue() == expected.getvalue()
+    bio.seek(0)
+    expected.seek(0)
+    reader = avro.io.DatumReader(TYPED_AVRO_SCHEMA.schema)
+    assert codec.read(bio) == reader.read(avro.io.BinaryDecoder(expected))
+
+
+MIXED_UNIONS_SCHEMA = avro.schema.parse(
+    json.dumps(
+        {
+            "type": "record",
+            "name": "Mixed",
+            "fields": [
+                {
+                    "name": "u",
+                    "type": [
+                        "null",
+                        {"type": "record", "name": "S", "fields": [{"name": "x", "type": ["int", "string"]}]},
+                    ],
+                },
+                {"name": "v", "type": {"type": "array", "items": ["null", "int"]}},
+            ],
+        }
+    )
+)
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {"u": {"x": 3}, "v": [1, None]},
+        {"u": {"S": {"x": {"int": 3}}}, "v": [{"int": 1}, None]},
+        # Untagged values next to tagged ones, as long as `flatten_unions` removes all the tags
+        {"u": {"S": {"x": 3}}, "v": [1, None, {"int": 2}]},
+    ],
+)
+def test_avro_codec_writes_the_data_valid_as_is_or_once_flattened(record) -> None:
+    expected = io.BytesIO()
+    data = record if avro.io.validate(MIXED_UNIONS_SCHEMA, record) else flatten_unions(MIXED_UNIONS_SCHEMA, record)
+    avro.io.DatumWriter(MIXED_UNIONS_SCHEMA).write(data, avro.io.BinaryEncoder(expected))
+
+    bio = io.BytesIO()
+    AvroCodec(MIXED_UNIONS_SCHEMA).write(bio, record)
+
+    assert bio.getvalue() == expected.getvalue()
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        # The tag of `x` is left by `flatten_unions` as `u` is not tagged
+        {"u": {"x": {"int": 3}}, "v": [1]},
+        {"u": {"x": 3}, "v": [{"string": "1"}]},
+    ],
+)
+def test_avro_codec_rejects_the_data_invalid_once_flattened(record) -> None:
+    with pytest.raises(avro.errors.AvroTypeException):
+        AvroCodec(MIXED_UNIONS_SCHEMA).write(io.BytesIO(), record)
+
+
 def test_flatten_unions_array() -> None:
     typed_schema = ValidatedTypedSchema.parse(
         SchemaType.AVRO,
@@ -440,3 +564,33 @@ def test_name_strategy_for_protobuf(expected_subject: Subject, strategy: NameStr
         get_subject_name(topic_name="foo", schema=TYPED_PROTOBUF_SCHEMA, subject_type=subject_type, naming_strategy=strategy)
         == expected_subject
     )
+
+
+async def test_registry_client_caches_lookups() -> None:
+    registry_client = SchemaRegistryClient()
+    await registry_client.client.close()
+    schema_by_id = {"schema": schema_avro_json, "subjects": ["top"]}
+    schema_by_subject = {"id": 1, "schema": schema_avro_json, "version": 1}
+
+    async def get(path: str, **_: object) -> Mock:
+        await asyncio.sleep(0)
+        return Mock(ok=True, json=Mock(return_value=schema_by_id if path.startswith("schemas/ids/") else schema_by_subject))
+
+    registry_client.client = Mock(get=Mock(side_effect=get), close=AsyncMock())
+
+    results = await asyncio.gather(*(registry_client.get_schema_for_id(SchemaId(1)) for _ in range(5)))
+    assert all(result == results[0] for result in results)
+    assert results[0][1] == ["top"]
+    assert registry_client.client.get.call_count == 1
+
+    await registry_client.get_schema_for_id(SchemaId(1), refresh=True)
+    assert registry_client.client.get.call_count == 2
+
+    for _ in range(2):
+        schema_id, _, version = await registry_client.get_schema(Subject("top"))
+        assert (schema_id, version) == (1, Versioner.V(1))
+    assert registry_client.client.get.call_count == 3
+    assert registry_client.schema_cache.cache_info().hits == 1
+    assert registry_client.schema_for_id_cache.cache_info().misses == 2
+
+    await registry_client.close()